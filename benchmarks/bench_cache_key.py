@@ -0,0 +1,119 @@
+"""
+Benchmark for search cache key canonicalization (SearchEngine._normalize_search_cache_key).
+
+Usage:
+    python -m benchmarks.bench_cache_key [--corpus FILE] [--queries 5000] [--distinct 800] [--aliases 0]
+
+Without --corpus, --queries synthetic Vietnamese/English search queries are drawn from a pool
+of --distinct ones, so repeats look like real traffic where each query is normalized on
+every cache get and set. --corpus points at a file with one query per line. --aliases N adds
+N extra synthetic phrase aliases to show how the per-alias loop scales with the table.
+
+Compares the previous canonicalizer (one re.sub per phrase alias, regexes rebuilt per call)
+with the compiled alternation, cold (memo cleared) and warm (bounded LRU), reports
+microseconds per key, and checks that both produce identical keys.
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+from src.tools import helpers
+from src.tools.constants import SEARCH_CACHE_PHRASE_ALIASES, SEARCH_CACHE_STOPWORDS, SEARCH_CACHE_TOKEN_ALIASES
+from src.tools.helpers import TextProcessor
+
+
+def legacy_canonicalize(aliases: Sequence[Tuple[str, str]]) -> Callable[[str], str]:
+    """TextProcessor.canonicalize_search_query as it was before the compiled alias matcher."""
+
+    def canonicalize(query: str) -> str:
+        lowered = (query or "").strip().lower()
+        lowered = lowered.replace("[force fallback]", " ")
+        lowered = TextProcessor.remove_diacritics(lowered)
+        for src, dst in aliases:
+            lowered = re.sub(rf"\b{re.escape(src)}\b", dst, lowered)
+        lowered = re.sub(r"[^a-z0-9_\s]", " ", lowered)
+        lowered = re.sub(r"\s+", " ", lowered).strip()
+        if not lowered:
+            return ""
+        tokens = []
+        for token in lowered.split(" "):
+            normalized_token = SEARCH_CACHE_TOKEN_ALIASES.get(token, token)
+            if not normalized_token or normalized_token in SEARCH_CACHE_STOPWORDS or len(normalized_token) <= 1:
+                continue
+            tokens.append(normalized_token)
+        if not tokens:
+            return lowered
+        return " ".join(sorted(set(tokens))[:32])
+
+    return canonicalize
+
+
+def synthetic_queries(count: int, distinct: int, seed: int = 3) -> List[str]:
+    rng = random.Random(seed)
+    words = [
+        "lịch", "thi đấu", "mới nhất", "cập nhật", "hiện tại", "khi nào", "kết thúc", "banner", "hsr",
+        "genshin", "giá vàng", "thời tiết", "hà nội", "bao giờ", "patch", "thời gian", "sự kiện", "tỉ số",
+        "weather", "score", "latest", "news", "của", "cho", "tôi",
+    ]
+    pool = [
+        ("general|" if rng.random() < 0.8 else "news|") + " ".join(rng.choice(words) for _ in range(rng.randint(2, 9)))
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def extra_aliases(count: int) -> List[Tuple[str, str]]:
+    return [(f"tu khoa {i} dai", f"alias{i}") for i in range(count)]
+
+
+def timed(fn: Callable[[str], str], queries: List[str]) -> Tuple[List[str], float]:
+    started = time.perf_counter()
+    keys = [fn(query) for query in queries]
+    return keys, time.perf_counter() - started
+
+
+def run(args) -> None:
+    if args.corpus:
+        queries = [line.strip() for line in Path(args.corpus).read_text(encoding="utf-8", errors="ignore").splitlines() if line.strip()]
+    else:
+        queries = synthetic_queries(args.queries, args.distinct)
+    aliases = list(SEARCH_CACHE_PHRASE_ALIASES) + extra_aliases(args.aliases)
+    print({"queries": len(queries), "distinct": len(set(queries)), "phrase_aliases": len(aliases)})
+
+    legacy_keys, legacy_s = timed(legacy_canonicalize(aliases), queries)
+
+    original = helpers._apply_phrase_aliases
+    helpers._apply_phrase_aliases = helpers._compile_phrase_aliases(aliases)
+    try:
+        helpers._canonicalize_search_query.cache_clear()
+        cold_keys, cold_s = timed(TextProcessor._canonicalize_uncached, queries)
+        helpers._canonicalize_search_query.cache_clear()
+        warm_keys, warm_s = timed(TextProcessor.canonicalize_search_query, queries)
+    finally:
+        helpers._apply_phrase_aliases = original
+        helpers._canonicalize_search_query.cache_clear()
+
+    for name, elapsed in (("legacy_per_alias", legacy_s), ("compiled_no_memo", cold_s), ("compiled_lru", warm_s)):
+        print({"canonicalizer": name, "elapsed_s": round(elapsed, 4), "us_per_key": round(elapsed * 1e6 / len(queries), 2)})
+    print({
+        "speedup_no_memo": round(legacy_s / cold_s, 1) if cold_s else float("inf"),
+        "speedup_lru": round(legacy_s / warm_s, 1) if warm_s else float("inf"),
+        "same_keys": legacy_keys == cold_keys == warm_keys,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search cache key canonicalization benchmark")
+    parser.add_argument("--corpus", type=str, default="")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=800)
+    parser.add_argument("--aliases", type=int, default=0)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
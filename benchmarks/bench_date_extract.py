@@ -0,0 +1,160 @@
+"""
+Benchmark for publication-date extraction on search snippets.
+
+Usage:
+    python -m benchmarks.bench_date_extract [--corpus FILE] [--snippets 2000] [--repeats 3]
+
+Without --corpus, --snippets labeled synthetic snippets are generated: Vietnamese and
+English filler around one date in a common format ("3 giờ trước", "dd/mm/yyyy", "Oct 5, 2026",
+"hôm qua", ISO, "ngày 5 tháng 10 năm 2026", "2 days ago"), headlines that pair a relative word
+with the real date ("giá vàng hôm nay 12/3/2021", "today in history: Oct 5, 2019"), plus
+distractors with no date at all ("patch 5.2", "tỉ số 3-1"). Accuracy is checked against the label: same calendar day for
+absolute dates, within two minutes for relative ones, and None for distractors.
+
+--corpus points at a text file with one real snippet per line (e.g. dumped search records).
+Real snippets have no labels, so the report gives how many snippets each method dated and
+how often the two agree on the day when both found one.
+
+Compares the previous whole-snippet dateparser.parse call with FastDateExtractor, cold
+(memo cleared) and warm (--repeats passes over the same snippets, as reranking does).
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import dateparser
+
+from src.tools import date_extractor
+from src.tools.date_extractor import FastDateExtractor
+
+# label: ("abs", datetime) | ("rel", seconds before now) | None
+Label = Optional[Tuple[str, object]]
+
+
+def synthetic_snippets(count: int, seed: int = 5) -> List[Tuple[str, Label]]:
+    rng = random.Random(seed)
+    words = ["bản cập nhật", "thông tin", "release", "review", "chi tiết", "analysis", "sự kiện", "players", "giá vàng", "thời tiết"]
+    now = datetime.now()
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+    def filler(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    out: List[Tuple[str, Label]] = []
+    for _ in range(count):
+        day = (now - timedelta(days=rng.randint(2, 700))).replace(hour=0, minute=0, second=0, microsecond=0)
+        amount = rng.randint(1, 20)
+        kind = rng.randrange(11)
+        if kind == 0:
+            span, label = f"{amount} giờ trước", ("rel", amount * 3600)
+        elif kind == 1:
+            span, label = f"{amount} days ago", ("rel", amount * 86400)
+        elif kind == 2:
+            span, label = rng.choice([("hôm qua", ("rel", 86400)), ("yesterday", ("rel", 86400))])
+        elif kind == 3:
+            span, label = day.strftime("%d/%m/%Y"), ("abs", day)
+        elif kind == 4:
+            span, label = f"{months[day.month - 1]} {day.day}, {day.year}", ("abs", day)
+        elif kind == 5:
+            span, label = day.strftime("%Y-%m-%d"), ("abs", day)
+        elif kind == 6:
+            span, label = f"ngày {day.day} tháng {day.month} năm {day.year}", ("abs", day)
+        elif kind == 7:
+            span, label = f"{day.day} {months[day.month - 1]} {day.year}", ("abs", day)
+        elif kind == 8:
+            span, label = rng.choice([
+                f"giá vàng hôm nay {day.day}/{day.month}/{day.year}: sjc tăng mạnh",
+                f"kết quả bóng đá hôm nay {day.day}/{day.month}/{day.year}",
+                f"thời tiết hôm nay, ngày {day.day} tháng {day.month} năm {day.year}",
+                f"today in history: {months[day.month - 1].lower()} {day.day}, {day.year}",
+            ]), ("abs", day)
+        else:
+            span, label = rng.choice(["patch 5.2 notes", "tỉ số 3-1 sau hiệp một", "phiên bản 2.7", "top 10 game"]), None
+        if rng.random() < 0.3:
+            out.append((span, label))
+        else:
+            out.append((f"{span} — {filler(rng.randint(5, 25))}", label))
+    return out
+
+
+def correct(parsed: Optional[datetime], label: Label, now: datetime) -> bool:
+    if label is None:
+        return parsed is None
+    if parsed is None:
+        return False
+    kind, value = label
+    if kind == "abs":
+        return parsed.date() == value.date()
+    return abs((now - parsed).total_seconds() - value) <= 120
+
+
+def legacy_parse(text: str) -> Optional[datetime]:
+    try:
+        return dateparser.parse(text, languages=['vi', 'en'])
+    except Exception:
+        return None
+
+
+def timed(fn, texts: List[str], repeats: int) -> Tuple[List[Optional[datetime]], float]:
+    started = time.perf_counter()
+    results: List[Optional[datetime]] = []
+    for _ in range(repeats):
+        results = [fn(text) for text in texts]
+    return results, time.perf_counter() - started
+
+
+def run(args) -> None:
+    if args.corpus:
+        texts = [line.strip() for line in Path(args.corpus).read_text(encoding="utf-8", errors="ignore").splitlines() if line.strip()]
+        labels: Optional[List[Label]] = None
+    else:
+        labeled = synthetic_snippets(args.snippets)
+        texts = [text for text, _ in labeled]
+        labels = [label for _, label in labeled]
+    print({"snippets": len(texts), "labeled": labels is not None, "repeats": args.repeats})
+
+    legacy_parse("hôm qua")  # dateparser loads its language data on first use; keep that out of the timing
+    legacy, legacy_s = timed(legacy_parse, texts, 1)
+
+    extractor = FastDateExtractor()
+    date_extractor._regex_spec.cache_clear()
+    fast, cold_s = timed(extractor.extract, texts, 1)
+    _, warm_s = timed(extractor.extract, texts, args.repeats)
+
+    now = datetime.now()
+    for name, results, elapsed, passes in (
+        ("dateparser_whole_text", legacy, legacy_s, 1),
+        ("fast_cold", fast, cold_s, 1),
+        ("fast_warm", fast, warm_s, args.repeats),
+    ):
+        report = {
+            "method": name,
+            "snippets_per_s": round(len(texts) * passes / elapsed) if elapsed else float("inf"),
+            "dated": sum(1 for parsed in results if parsed is not None),
+        }
+        if labels is not None:
+            report["accuracy"] = round(sum(correct(p, l, now) for p, l in zip(results, labels)) / len(texts), 4)
+        print(report)
+
+    both = [(a, b) for a, b in zip(legacy, fast) if a is not None and b is not None]
+    print({
+        "speedup_cold": round(legacy_s / cold_s, 1) if cold_s else float("inf"),
+        "both_dated": len(both),
+        "same_day_when_both": round(sum(a.date() == b.date() for a, b in both) / len(both), 4) if both else None,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Snippet date extraction benchmark")
+    parser.add_argument("--corpus", type=str, default="")
+    parser.add_argument("--snippets", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
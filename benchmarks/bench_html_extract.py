@@ -0,0 +1,161 @@
+"""
+Benchmark for deep-read HTML main-text extraction.
+
+Usage:
+    python -m benchmarks.bench_html_extract [--corpus DIR] [--pages 8] [--size-mb 2.0] [--max-chars 1800]
+
+--corpus points at a directory of saved pages (*.html / *.htm). Without it, synthetic
+news-style pages of --size-mb are generated: scripts, nav and header chrome, one article,
+then a long tail of related-story markup, which is where real pages spend their bytes.
+Layouts rotate between <main><article>, a long <main> followed by a sibling "related"
+<article>, and a long <main> with a small <article> nested near its end.
+
+Reports per-page parse time for the BeautifulSoup parser and the streaming lxml parser,
+how often the two disagree and how often the streaming parser came back empty, per layout,
+then async throughput for each backend/parser pair together with the worst event-loop
+stall seen by a 5 ms ticker while the pages were being extracted.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.tools.html_extractor import HtmlExtractor, extract_main_text
+
+
+LAYOUTS = ("main_article", "main_then_article", "article_nested_in_main")
+
+
+def synthetic_page(seed: int, size_bytes: int, layout: str = "main_article") -> str:
+    rng = random.Random(seed)
+    words = ["thị trường", "chính phủ", "market", "growth", "báo cáo", "update", "kinh tế", "analysis", "dữ liệu", "policy"]
+
+    def sentence() -> str:
+        return " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    head = (
+        "<html><head><title>News</title>"
+        + "<script>" + ("var x=1;" * 2000) + "</script>"
+        + "<style>" + (".a{color:red}" * 1000) + "</style></head><body>"
+        + "<nav>" + "".join(f"<a href='/c{i}'>Mục {i}</a>" for i in range(200)) + "</nav>"
+        + "<header><div class='logo'>Logo</div></header>"
+    )
+    body = "<h1>Tiêu đề bài viết</h1>" + "".join(f"<p>{sentence()} {sentence()}</p>" for _ in range(40))
+    teaser = f"<article class='teaser'><a href='/t{seed}'>{sentence()}</a></article>"
+    if layout == "main_then_article":
+        article = f"<main>{body}</main>{teaser}"
+    elif layout == "article_nested_in_main":
+        article = f"<main>{body}{teaser}</main>"
+    else:
+        article = f"<main><article>{body}<aside>Quảng cáo</aside></article></main>"
+
+    related: List[str] = []
+    length = len(head) + len(article)
+    while length < size_bytes:
+        block = f"<div class='related'><a href='/r{length}'>{sentence()}</a><span>{sentence()}</span></div>"
+        related.append(block)
+        length += len(block)
+    return head + article + "".join(related) + "<footer>All rights reserved</footer></body></html>"
+
+
+def load_corpus(args) -> List[str]:
+    if args.corpus:
+        paths = sorted(p for p in Path(args.corpus).iterdir() if p.suffix.lower() in {".html", ".htm"})
+        return [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    size_bytes = int(args.size_mb * 1024 * 1024)
+    return [synthetic_page(seed, size_bytes, LAYOUTS[seed % len(LAYOUTS)]) for seed in range(args.pages)]
+
+
+def page_layouts(args, count: int) -> List[str]:
+    if args.corpus:
+        return ["corpus"] * count
+    return [LAYOUTS[seed % len(LAYOUTS)] for seed in range(count)]
+
+
+def bench_parsers(pages: List[str], layouts: List[str], max_chars: int) -> None:
+    for parser in ("soup", "stream"):
+        timings = []
+        for page in pages:
+            started = time.perf_counter()
+            extract_main_text(page, max_chars, parser)
+            timings.append((time.perf_counter() - started) * 1000)
+        print({
+            "parser": parser,
+            "pages": len(pages),
+            "median_ms": round(statistics.median(timings), 2),
+            "max_ms": round(max(timings), 2),
+        })
+
+    # A long <main> outranks a later or deeply nested <article> in the streaming parser by
+    # design, so mismatches are expected there; an empty stream result never is.
+    by_layout: Dict[str, Dict[str, int]] = {}
+    for page, layout in zip(pages, layouts):
+        soup_text = extract_main_text(page, max_chars, "soup")
+        stream_text = extract_main_text(page, max_chars, "stream")
+        counts = by_layout.setdefault(layout, {"pages": 0, "mismatches": 0, "stream_empty": 0})
+        counts["pages"] += 1
+        counts["mismatches"] += soup_text != stream_text
+        counts["stream_empty"] += bool(soup_text) and not stream_text
+    for layout, counts in by_layout.items():
+        print({"layout": layout, **counts})
+
+
+async def bench_backend(backend: str, parser: str, pages: List[str], max_chars: int, workers: int) -> dict:
+    extractor = HtmlExtractor(backend=backend, parser=parser, workers=workers)
+    extractor.warm()
+    await extractor.extract(pages[0], max_chars)
+
+    max_stall = 0.0
+    running = True
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        interval = 0.005
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_stall = max(max_stall, time.perf_counter() - started - interval)
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(extractor.extract(page, max_chars) for page in pages))
+    elapsed = time.perf_counter() - started
+    running = False
+    await tick_task
+    extractor.shutdown()
+
+    return {
+        "backend": backend,
+        "parser": parser,
+        "elapsed_s": round(elapsed, 3),
+        "pages_per_s": round(len(pages) / elapsed, 1) if elapsed else float("inf"),
+        "max_loop_stall_ms": round(max_stall * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTML main-text extraction benchmark")
+    parser.add_argument("--corpus", type=str, default="")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--size-mb", type=float, default=2.0)
+    parser.add_argument("--max-chars", type=int, default=1800)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    pages = load_corpus(args)
+    if not pages:
+        raise SystemExit("No pages to benchmark.")
+    print({"pages": len(pages), "avg_kb": round(sum(len(p) for p in pages) / len(pages) / 1024, 1)})
+
+    bench_parsers(pages, page_layouts(args, len(pages)), args.max_chars)
+    for backend in ("thread", "process"):
+        for html_parser in ("soup", "stream"):
+            print(asyncio.run(bench_backend(backend, html_parser, pages, args.max_chars, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark for GeminiRateLimiter under many concurrent waiters.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--waiters 1000] [--rpm 100] [--window 0.05]
+
+The window is shrunk from 60s so the run finishes quickly; the shape of the contention
+(many coroutines queued on one limiter) is what matters. A polling limiter that mirrors
+the previous sleep-and-rescan loop is included as a baseline. Priority inversions in the
+new limiter come only from the first window, granted on the fast path before anything queues.
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.core.gemini_rate_limiter import GeminiRateLimiter, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+class PollingRateLimiter(GeminiRateLimiter):
+    """Previous implementation: lock, rescan the token deque, sleep >= 0.3s on contention."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = asyncio.Lock()
+
+    async def acquire_quota(self, reserved_tokens: int, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        while True:
+            async with self._lock:
+                now = time.time()
+                while self._minute_req_ts and now - self._minute_req_ts[0] >= self.WINDOW_SECONDS:
+                    self._minute_req_ts.popleft()
+                while self._minute_tokens and now - self._minute_tokens[0][0] >= self.WINDOW_SECONDS:
+                    self._minute_tokens.popleft()
+                used_tokens = sum(item[1] for item in self._minute_tokens)
+                if len(self._minute_req_ts) < self.rpm_limit and (used_tokens + reserved_tokens) <= self.tpm_limit:
+                    self._minute_req_ts.append(now)
+                    self._minute_tokens.append((now, reserved_tokens))
+                    return True
+                wait_req = (self.WINDOW_SECONDS - (now - self._minute_req_ts[0])) if self._minute_req_ts else 0.5
+                wait_time = max(0.3, wait_req)
+            await asyncio.sleep(wait_time)
+
+
+async def run_case(limiter_cls, waiters: int, rpm: int, window: float) -> dict:
+    limiter_cls.WINDOW_SECONDS = window
+    limiter = limiter_cls(rpm=rpm, tpm=10**12, rpd=0)
+    grant_order = []
+
+    async def worker(idx: int) -> None:
+        priority = PRIORITY_BACKGROUND if idx % 2 else PRIORITY_INTERACTIVE
+        await limiter.acquire_quota(100, priority=priority)
+        grant_order.append(priority)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(waiters)))
+    elapsed = time.perf_counter() - started
+
+    # Count background grants that jumped ahead of a still-queued interactive waiter.
+    inversions = 0
+    interactive_left = grant_order.count(PRIORITY_INTERACTIVE)
+    for priority in grant_order:
+        if priority == PRIORITY_INTERACTIVE:
+            interactive_left -= 1
+        elif interactive_left > 0:
+            inversions += 1
+
+    ideal = (waiters / rpm - 1) * window if waiters > rpm else 0.0
+    return {
+        "limiter": limiter_cls.__name__,
+        "elapsed_s": round(elapsed, 3),
+        "ideal_s": round(max(0.0, ideal), 3),
+        "grants_per_s": round(waiters / elapsed, 1) if elapsed else float("inf"),
+        "priority_inversions": inversions,
+    }
+
+
+async def run_fast_path(iterations: int) -> dict:
+    limiter = GeminiRateLimiter(rpm=10**9, tpm=10**15, rpd=0)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await limiter.acquire_quota(100)
+    elapsed = time.perf_counter() - started
+    return {"fast_path_acquires_per_s": round(iterations / elapsed, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GeminiRateLimiter contention benchmark")
+    parser.add_argument("--waiters", type=int, default=1000)
+    parser.add_argument("--rpm", type=int, default=100)
+    parser.add_argument("--window", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for limiter_cls in (GeminiRateLimiter, PollingRateLimiter):
+        print(asyncio.run(run_case(limiter_cls, args.waiters, args.rpm, args.window)))
+    print(asyncio.run(run_fast_path(100_000)))
+
+
+if __name__ == "__main__":
+    main()
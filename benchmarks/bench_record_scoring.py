@@ -0,0 +1,176 @@
+"""
+Benchmark for search record scoring and reranking (one intent's worth of records at a time).
+
+Usage:
+    python -m benchmarks.bench_record_scoring [--intents 20] [--records 18] [--repeats 3] [--topic gaming]
+
+Generates --intents synthetic queries with --records DuckDuckGo-style records each (Vietnamese
+and English snippets, about half carrying absolute or relative dates, a few short or social
+media ones). Each intent is scored --repeats times, which is what happens when a query is
+split into intents that share results, retried with a forced fallback, or checked for
+sufficiency while hedging.
+
+Compares the previous per-record path (_score_record, then _lightweight_rerank and
+_count_quality_sources, each re-extracting dates and re-deriving query features) with
+SearchEngine._score_and_rank_records plus the batched quality count, reports ms per intent for
+both, and checks that scores, ranking and quality counts are identical.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from src.tools.constants import SEARCH_TOPICS
+from src.tools.date_extractor import get_date_extractor
+from src.tools.search_engine import SearchEngine
+
+
+class LegacyScorer:
+    """The per-record scoring SearchEngine used before _score_and_rank_records."""
+
+    def __init__(self, engine: SearchEngine):
+        self.engine = engine
+
+    def score_record(self, topic: str, query: str, record: Dict[str, str]) -> float:
+        score = 0.0
+        snippet = (record.get("snippet") or "").strip().lower()
+        title = (record.get("title") or "").strip().lower()
+        domain = (record.get("domain") or "").lower()
+        combined_text = f"{title} {snippet}"
+        query_terms = [t for t in query.lower().strip().split() if len(t) > 2]
+        score += sum(1 for t in query_terms if t in title) * 0.30
+        score += sum(1 for t in query_terms if t in snippet) * 0.20
+        if any(t in title for t in query_terms):
+            score += 0.50
+        pub_date = get_date_extractor().extract(snippet + " " + title)
+        is_time_sensitive = self.engine._is_time_sensitive_query(query)
+        if pub_date and is_time_sensitive:
+            days_ago = (datetime.now() - pub_date).days
+            if days_ago <= 1:
+                score += 1.0
+            elif days_ago <= 7:
+                score += 0.6
+            elif days_ago <= 30:
+                score += 0.3
+        if is_time_sensitive and not pub_date and not self.engine._contains_year(combined_text):
+            score -= 0.3
+        topic_keywords = set(SEARCH_TOPICS.get(topic.lower(), {}).get("keywords", []))
+        if topic_keywords:
+            score += sum(1 for kw in topic_keywords if kw in combined_text) * 0.10
+        if len(snippet) < 20:
+            score -= 0.30
+        elif len(snippet) < 40:
+            score -= 0.10
+        if domain:
+            if any(d in domain for d in ["wiki", "wikipedia"]):
+                score += 0.15
+            if any(d in domain for d in [".gov", ".edu"]):
+                score += 0.20
+        score += -0.05
+        return round(max(-0.5, min(3.0, score)), 3)
+
+    def is_quality_record(self, query: str, record: Dict[str, str]) -> bool:
+        snippet = (record.get("snippet") or "").strip().lower()
+        title = (record.get("title") or "").strip().lower()
+        domain = (record.get("domain") or "").lower()
+        query_terms = [t for t in query.lower().strip().split() if len(t) > 2]
+        if not query_terms:
+            return len(snippet) >= 40
+        if not any(t in f"{title} {snippet}" for t in query_terms):
+            return False
+        if len(snippet) < 30:
+            return False
+        return not any(d in domain for d in ["pinterest", "facebook", "instagram", "tiktok"])
+
+    def run(self, topic: str, query: str, records: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], int]:
+        for rec in records:
+            rec["score"] = str(self.score_record(topic, query, rec))
+        ranked = []
+        for rec in records:
+            is_time_sensitive = self.engine._is_time_sensitive_query(query)
+            pub_date = get_date_extractor().extract((rec.get("snippet") or "") + " " + (rec.get("title") or ""))
+            decay = self.engine._calculate_time_decay_penalty(topic, pub_date, is_time_sensitive)
+            ranked.append((float(rec["score"]) + self.engine._dynamic_reputation_score(topic, query, rec) + decay, rec))
+        ranked.sort(key=lambda x: x[0], reverse=True)
+        ordered = [rec for _, rec in ranked]
+        return ordered, sum(1 for rec in ordered if self.is_quality_record(query, rec))
+
+
+def synthetic_intents(intents: int, per_intent: int, topic: str, seed: int = 11) -> List[Tuple[str, List[Dict[str, str]]]]:
+    rng = random.Random(seed)
+    keywords = SEARCH_TOPICS.get(topic, {}).get("keywords", []) or ["update"]
+    words = ["bản cập nhật", "thông tin", "release", "review", "chi tiết", "analysis", "mới nhất", "guide", "sự kiện", "players"]
+    domains = ["reuters.com", "bbc.com", "wikipedia.org", "github.com", "ign.com", "example.vn", "facebook.com", "news.gov", "blog.edu"]
+    now = datetime.now()
+    out = []
+    for i in range(intents):
+        kw = rng.choice(keywords)
+        query = f"{kw} {rng.choice(words)} {'hôm nay' if i % 2 else 'tổng hợp'}"
+        records = []
+        for j in range(per_intent):
+            body = " ".join(rng.choice(words + keywords) for _ in range(rng.randint(4, 30)))
+            roll = rng.random()
+            if roll < 0.25:
+                body = f"{(now - timedelta(days=rng.randint(0, 60))).strftime('%d/%m/%Y')} — {body}"
+            elif roll < 0.45:
+                body = f"{rng.randint(1, 23)} giờ trước · {body}"
+            elif roll < 0.55:
+                body = f"{(now - timedelta(days=rng.randint(0, 400))).strftime('%b %d, %Y')} ... {body}"
+            domain = rng.choice(domains)
+            records.append({
+                "provider": "duckduckgo",
+                "title": f"{kw.title()} {rng.choice(words)} #{j}",
+                "snippet": body,
+                "url": f"https://{domain}/{i}/{j}",
+                "normalized_url": f"https://{domain}/{i}/{j}",
+                "domain": domain,
+            })
+        out.append((query, records))
+    return out
+
+
+def run(args) -> None:
+    engine = SearchEngine()
+    legacy = LegacyScorer(engine)
+    intents = synthetic_intents(args.intents, args.records, args.topic)
+    print({"intents": args.intents, "records_per_intent": args.records, "repeats": args.repeats, "topic": args.topic})
+
+    legacy_out = []
+    started = time.perf_counter()
+    for query, records in intents:
+        for _ in range(args.repeats):
+            ordered, quality = legacy.run(args.topic, query, [dict(r) for r in records])
+        legacy_out.append(([(r["url"], r["score"]) for r in ordered], quality))
+    legacy_s = time.perf_counter() - started
+
+    batch_out = []
+    started = time.perf_counter()
+    for query, records in intents:
+        for _ in range(args.repeats):
+            ordered = engine._score_and_rank_records(args.topic, query, [dict(r) for r in records])
+            quality = engine._count_quality_sources(ordered, args.topic, query)
+        batch_out.append(([(r["url"], r["score"]) for r in ordered], quality))
+    batch_s = time.perf_counter() - started
+
+    runs = args.intents * args.repeats
+    for name, elapsed in (("legacy_per_record", legacy_s), ("batch", batch_s)):
+        print({"scorer": name, "elapsed_s": round(elapsed, 3), "ms_per_intent": round(elapsed * 1000 / runs, 2)})
+    print({
+        "speedup": round(legacy_s / batch_s, 1) if batch_s else float("inf"),
+        "same_ranking_and_scores": legacy_out == batch_out,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search record scoring benchmark")
+    parser.add_argument("--intents", type=int, default=20)
+    parser.add_argument("--records", type=int, default=18)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--topic", type=str, default="gaming")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
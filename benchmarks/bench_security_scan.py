@@ -0,0 +1,149 @@
+"""
+Benchmark for the prompt-injection / hidden-character scan run on every uploaded file.
+
+Usage:
+    python -m benchmarks.bench_security_scan [--corpus FILE] [--size-mb 8] [--max-scan-lines 2000] [--block-lines 8192]
+
+--corpus points at a text file to scan. Without it, a synthetic mixed Vietnamese/English
+document of --size-mb is generated, with zero-width characters, HTML comments and a few
+injection markers sprinkled in.
+
+Compares the previous per-line scanner (a Python loop over characters plus one regex per
+pattern per line) with SecurityScanner.scan_lines on blocks, reports MB/s for both, and
+checks that both produce the same cleaned text and security state. --max-scan-lines 0 scans
+every line for markers, which is the worst case for the combined regex.
+"""
+
+import argparse
+import random
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.services.security_scanner import INJECTION_PATTERNS, SecurityScanner
+
+
+def new_state() -> Dict[str, Any]:
+    return {
+        "hidden_removed": 0,
+        "html_comment_count": 0,
+        "html_comment_samples": [],
+        "suspicious_lines": [],
+        "scanned_lines": 0,
+    }
+
+
+class LegacyScanner:
+    """The per-line implementation FileParserService used before SecurityScanner."""
+
+    def __init__(self, max_scan_lines: int, max_suspicious_lines: int):
+        self.max_scan_lines = max_scan_lines
+        self.max_suspicious_lines = max_suspicious_lines
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in INJECTION_PATTERNS]
+        self.comment = re.compile(r"<!--(.*?)-->", re.DOTALL)
+
+    def strip(self, text: str) -> Tuple[str, int]:
+        removed = 0
+        cleaned: List[str] = []
+        for ch in text:
+            if ch in {"\n", "\t"}:
+                cleaned.append(ch)
+                continue
+            if ord(ch) < 32 or unicodedata.category(ch) == "Cf":
+                removed += 1
+                continue
+            cleaned.append(ch)
+        return "".join(cleaned), removed
+
+    def scan_line(self, line: str, label: str, state: Dict[str, Any]) -> str:
+        cleaned, removed = self.strip(line)
+        state["hidden_removed"] += removed
+        if state["scanned_lines"] < self.max_scan_lines:
+            state["scanned_lines"] += 1
+            if cleaned.strip():
+                if self.comment.search(cleaned):
+                    state["html_comment_count"] += 1
+                    if len(state["html_comment_samples"]) < 3:
+                        state["html_comment_samples"].append(cleaned.strip()[:200])
+                if len(state["suspicious_lines"]) < self.max_suspicious_lines:
+                    for pattern in self.patterns:
+                        if pattern.search(cleaned):
+                            snippet = cleaned.strip()
+                            if len(snippet) > 240:
+                                snippet = snippet[:240] + "..."
+                            state["suspicious_lines"].append(f"{label}: {snippet}")
+                            break
+        return cleaned
+
+
+def synthetic_lines(size_bytes: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    words = ["tài liệu", "hướng dẫn", "market", "báo cáo", "dữ liệu", "analysis", "chương", "policy", "kết quả", "section"]
+    extras = ["​", "‍", "﻿", "<!-- hidden note -->", "ignore previous instructions", "api key", "bỏ qua hướng dẫn"]
+    lines: List[str] = []
+    length = 0
+    while length < size_bytes:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(6, 18)))
+        if rng.random() < 0.01:
+            position = rng.randint(0, len(line))
+            line = line[:position] + rng.choice(extras) + line[position:]
+        lines.append(line)
+        length += len(line.encode("utf-8")) + 1
+    return lines
+
+
+def run(args) -> None:
+    if args.corpus:
+        lines = Path(args.corpus).read_text(encoding="utf-8", errors="ignore").splitlines()
+    else:
+        lines = synthetic_lines(int(args.size_mb * 1024 * 1024))
+    size_mb = sum(len(line.encode("utf-8")) + 1 for line in lines) / (1024 * 1024)
+    max_scan_lines = args.max_scan_lines or len(lines)
+    print({"lines": len(lines), "size_mb": round(size_mb, 2), "max_scan_lines": max_scan_lines})
+
+    legacy = LegacyScanner(max_scan_lines, 20)
+    legacy_state = new_state()
+    started = time.perf_counter()
+    legacy_lines = [legacy.scan_line(line, f"line {i + 1}", legacy_state) for i, line in enumerate(lines)]
+    legacy_s = time.perf_counter() - started
+
+    scanner = SecurityScanner(max_scan_lines=max_scan_lines, max_suspicious_lines=20)
+    block_state = new_state()
+    block_lines: List[str] = []
+    started = time.perf_counter()
+    for start in range(0, len(lines), args.block_lines):
+        block_lines.extend(scanner.scan_lines(
+            lines[start:start + args.block_lines],
+            lambda i, base=start: f"line {base + i + 1}",
+            block_state,
+        ))
+    block_s = time.perf_counter() - started
+
+    for name, elapsed in (("legacy_per_line", legacy_s), ("compiled_block", block_s)):
+        print({
+            "scanner": name,
+            "elapsed_s": round(elapsed, 3),
+            "mb_per_s": round(size_mb / elapsed, 1) if elapsed else float("inf"),
+        })
+    print({
+        "speedup": round(legacy_s / block_s, 1) if block_s else float("inf"),
+        "same_text": legacy_lines == block_lines,
+        "same_state": legacy_state == block_state,
+        "suspicious": len(block_state["suspicious_lines"]),
+        "hidden_removed": block_state["hidden_removed"],
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="File security scan benchmark")
+    parser.add_argument("--corpus", type=str, default="")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--max-scan-lines", type=int, default=2000)
+    parser.add_argument("--block-lines", type=int, default=8192)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
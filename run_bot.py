@@ -6,6 +6,7 @@ Usage:
     python run_bot.py                     # Run bot only
     python run_bot.py --server            # Run bot + FastAPI gateway server
     python run_bot.py --preflight         # Validate runtime and exit
+    python run_bot.py --rag-index-worker  # Run only the background file-index worker
 """
 
 import argparse
@@ -50,9 +51,11 @@ def _ensure_preferred_interpreter() -> None:
 _ensure_preferred_interpreter()
 
 from src.core.config import get_config, logger
+from src.core.http_client import close_http_client
 from src.core.preflight import emit_startup_banner, run_preflight_checks
 from src.handlers.discord.bot_core import BotCore
 from src.handlers.message_handler import MessageHandler
+from src.services.rag_index_worker import RagIndexWorker
 from src.services.search_subtask_worker import SearchSubtaskWorker
 
 
@@ -87,6 +90,8 @@ async def run_bot_only(config):
     worker_task = None
     search_worker = None
     search_task = None
+    index_worker = None
+    index_task = None
 
     try:
         bot_core = BotCore(config)
@@ -103,6 +108,11 @@ async def run_bot_only(config):
             logger.info("Starting SearchSubtaskWorker")
             search_task = asyncio.create_task(search_worker.start_worker())
 
+        if config.RAG_INDEX_BACKGROUND and config.RAG_INDEX_WORKER_IN_PROCESS:
+            index_worker = RagIndexWorker(config)
+            logger.info("Starting RagIndexWorker")
+            index_task = asyncio.create_task(index_worker.start_worker())
+
         logger.info("Starting Chad Gibiti Discord bot")
         await bot_core.start(config.TOKEN)
 
@@ -130,18 +140,41 @@ async def run_bot_only(config):
         if search_worker is not None:
             await search_worker.shutdown()
 
+        if index_task is not None and not index_task.done():
+            index_task.cancel()
+            try:
+                await index_task
+            except asyncio.CancelledError:
+                pass
+
+        if index_worker is not None:
+            await index_worker.shutdown()
+
         if message_handler is not None:
             await message_handler.shutdown()
 
         if bot_core is not None:
             await bot_core.shutdown()
 
+        await close_http_client()
+
+
+async def run_index_worker_only(config):
+    """Run the file-index worker alone, e.g. on extra hosts sharing FILE_CHUNK_DIR."""
+    index_worker = RagIndexWorker(config)
+    try:
+        await index_worker.start_worker()
+    finally:
+        await index_worker.shutdown()
+        await close_http_client()
+
 
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Chad Gibiti Discord Bot")
     parser.add_argument("--preflight", action="store_true", help="Validate runtime paths/dependencies and exit")
     parser.add_argument("--config", type=str, default=".env", help="Config file path (legacy, retained for compatibility)")
+    parser.add_argument("--rag-index-worker", action="store_true", help="Run only the background file-index worker")
 
     args = parser.parse_args()
 
@@ -149,7 +182,7 @@ def main():
     logger.info("Configuration loaded")
     emit_startup_banner(config)
 
-    preflight_require_token = not args.preflight
+    preflight_require_token = not args.preflight and not args.rag_index_worker
     preflight_ok, _ = run_preflight_checks(config, require_token=preflight_require_token)
     if not preflight_ok:
         sys.exit(1)
@@ -158,6 +191,13 @@ def main():
         logger.info("Preflight only mode complete.")
         sys.exit(0)
 
+    if args.rag_index_worker:
+        try:
+            asyncio.run(run_index_worker_only(config))
+        except KeyboardInterrupt:
+            logger.info("RagIndexWorker shutdown signal received.")
+        sys.exit(0)
+
     if not config.TOKEN:
         logger.error("Missing DISCORD_TOKEN. Please set it in your environment.")
         sys.exit(1)
@@ -50,6 +50,10 @@ ROUTER_COUNTER_LOG_ENABLED = os.getenv('ROUTER_COUNTER_LOG_ENABLED', 'true').low
 GEMINI_LIMITER_MAX_OUTPUT_TOKENS = int(os.getenv('GEMINI_LIMITER_MAX_OUTPUT_TOKENS', '2000'))
 GEMINI_LIMITER_FIXED_OVERHEAD = int(os.getenv('GEMINI_LIMITER_FIXED_OVERHEAD', '80'))
 GEMINI_LIMITER_SAFETY_FACTOR = float(os.getenv('GEMINI_LIMITER_SAFETY_FACTOR', '1.25'))
+# "redis" shares RPM/TPM/RPD windows across worker processes; "memory" keeps them per process
+GEMINI_LIMITER_BACKEND = os.getenv('GEMINI_LIMITER_BACKEND', 'memory').strip().lower() or 'memory'
+GEMINI_LIMITER_REDIS_URL = os.getenv('GEMINI_LIMITER_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+GEMINI_LIMITER_REDIS_PREFIX = os.getenv('GEMINI_LIMITER_REDIS_PREFIX', 'azuris:gemini_limiter').strip() or 'azuris:gemini_limiter'
 
 DEFAULT_REASONING_MODEL_ALIAS = os.getenv('REASONING_MODEL_ALIAS', 'gemini-flash-lite').strip() or 'gemini-flash-lite'
 DEFAULT_FINAL_MODEL_ALIAS = os.getenv('FINAL_MODEL_ALIAS', 'gemini-flash').strip() or 'gemini-flash'
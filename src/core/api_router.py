@@ -13,12 +13,15 @@ from .api_config import (
     GEMINI_LIMITER_MAX_OUTPUT_TOKENS,
     GEMINI_LIMITER_FIXED_OVERHEAD,
     GEMINI_LIMITER_SAFETY_FACTOR,
+    GEMINI_LIMITER_BACKEND,
+    GEMINI_LIMITER_REDIS_URL,
+    GEMINI_LIMITER_REDIS_PREFIX,
     DEFAULT_REASONING_MODEL_ALIAS,
     DEFAULT_FINAL_MODEL_ALIAS,
     DEFAULT_FALLBACK_MODEL_ALIAS,
     initialize_key_pool,
 )
-from .gemini_rate_limiter import GeminiRateLimiter
+from .gemini_rate_limiter import GeminiRateLimiter, PRIORITY_INTERACTIVE
 
 class APIRouter:
     _instance = None
@@ -66,7 +69,7 @@ class APIRouter:
 
         self.rate_limiters: Dict[str, GeminiRateLimiter] = {}
         for model_alias, cfg in AVAILABLE_MODELS.items():
-            self.rate_limiters[model_alias] = GeminiRateLimiter(
+            limiter_kwargs = dict(
                 rpm=int(cfg.get("rpm", 15)),
                 tpm=int(cfg.get("tpm", 250000)),
                 rpd=int(cfg.get("rpd", 0)),
@@ -74,6 +77,16 @@ class APIRouter:
                 fixed_overhead=GEMINI_LIMITER_FIXED_OVERHEAD,
                 safety_factor=GEMINI_LIMITER_SAFETY_FACTOR,
             )
+            if GEMINI_LIMITER_BACKEND == "redis":
+                from .redis_rate_limiter import RedisGeminiRateLimiter
+
+                self.rate_limiters[model_alias] = RedisGeminiRateLimiter(
+                    redis_url=GEMINI_LIMITER_REDIS_URL,
+                    namespace=f"{GEMINI_LIMITER_REDIS_PREFIX}:{model_alias}",
+                    **limiter_kwargs,
+                )
+            else:
+                self.rate_limiters[model_alias] = GeminiRateLimiter(**limiter_kwargs)
 
         self._print_init_summary()
         APIRouter._initialized = True
@@ -86,10 +99,19 @@ class APIRouter:
         print("🔑 API ROUTER - FULL AUTO (PostgreSQL Edition)")
         print("=" * 60)
         print(f"🤖 Models (priority): {', '.join(self.model_priority)}")
+        print(f"⏱️ Rate limiter backend: {GEMINI_LIMITER_BACKEND}")
         print("🔗 Mode: DIRECT (GEMINI_BASE_URL có thể cấu hình trong .env)")
         print("=" * 60 + "\n")
 
-    async def acquire_gemini_quota(self, prompt_text: str, max_output_tokens: int, model_alias: Optional[str] = None, image_count: int = 0) -> bool:
+    async def acquire_gemini_quota(
+        self,
+        prompt_text: str,
+        max_output_tokens: int,
+        model_alias: Optional[str] = None,
+        image_count: int = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        input_tokens: Optional[int] = None,
+    ) -> bool:
         target_model = model_alias or self.get_preferred_model()
         limiter = self.rate_limiters.get(target_model)
         if limiter is None and self.rate_limiters:
@@ -97,8 +119,24 @@ class APIRouter:
         if limiter is None:
             return False
 
-        reserved_tokens = limiter.estimate_request_tokens(prompt_text, max_output_tokens, image_count=image_count)
-        return await limiter.acquire_quota(reserved_tokens)
+        reserved_tokens = limiter.estimate_request_tokens(
+            prompt_text,
+            max_output_tokens,
+            image_count=image_count,
+            input_tokens=input_tokens,
+        )
+        return await limiter.acquire_quota(reserved_tokens, priority)
+
+    def get_quota_headroom(self, model_alias: Optional[str] = None) -> int:
+        """Requests still free in the current RPM window, less anyone already queued."""
+        target_model = model_alias or self.get_preferred_model()
+        limiter = self.rate_limiters.get(target_model)
+        if limiter is None and self.rate_limiters:
+            limiter = next(iter(self.rate_limiters.values()))
+        if limiter is None:
+            return 0
+        snapshot = limiter.get_counters_snapshot()
+        return max(0, snapshot["rpm_limit"] - snapshot["rpm_used"] - snapshot["waiters"])
 
     def get_preferred_model(self) -> str:
         return self.get_current_model()
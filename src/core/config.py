@@ -61,6 +61,7 @@ class Config:
         self.WEATHER_CACHE_PATH = self._resolve_runtime_path("WEATHER_CACHE_PATH", "data/weather_cache.json")
         self.FILE_STORAGE_PATH = self._resolve_runtime_path("FILE_STORAGE_PATH", "uploaded_files")
         self.FILE_CHUNK_DIR = self._resolve_runtime_path("FILE_CHUNK_DIR", "data/file_chunks")
+        self.RAG_VECTOR_DIR = self._resolve_runtime_path("RAG_VECTOR_DIR", "data/rag_vectors")
         self.LOG_PATH = self._resolve_runtime_path("BOT_LOG_PATH", "bot.log")
 
         # Keep router config aligned with absolute runtime path.
@@ -177,6 +178,11 @@ class Config:
         self.SEARCH_ENABLE_EXTRA_RETRIEVAL_PASS = self._get_bool("SEARCH_ENABLE_EXTRA_RETRIEVAL_PASS", True)
         self.SEARCH_ALLOW_PARTIAL_ANSWER = self._get_bool("SEARCH_ALLOW_PARTIAL_ANSWER", True)
 
+        # --- STREAMING FINAL REPLY ---
+        self.STREAM_FINAL_REPLY = self._get_bool("STREAM_FINAL_REPLY", True)
+        self.STREAM_PUBLISH_INTERVAL_MS = self._get_int("STREAM_PUBLISH_INTERVAL_MS", 800, min_value=200, max_value=10000)
+        self.STREAM_EDIT_INTERVAL_MS = self._get_int("STREAM_EDIT_INTERVAL_MS", 1200, min_value=500, max_value=10000)
+
         # --- GEMINI CIRCUIT BREAKER ---
         self.GEMINI_CIRCUIT_ENABLED = self._get_bool("GEMINI_CIRCUIT_ENABLED", True)
         self.GEMINI_CIRCUIT_FAILURE_THRESHOLD = self._get_int("GEMINI_CIRCUIT_FAILURE_THRESHOLD", 5, min_value=1, max_value=50)
@@ -196,6 +202,27 @@ class Config:
 
         # --- SEARCH TUNING ---
         self.MAX_SEARCH_CALLS_PER_TURN = self._get_int("MAX_SEARCH_CALLS_PER_TURN", 5, min_value=1, max_value=20)
+        self.REASONING_TOOL_CONCURRENCY = self._get_int("REASONING_TOOL_CONCURRENCY", 4, min_value=1, max_value=16)
+
+        # --- FILE INDEXING ---
+        self.INDEX_CONCURRENCY = self._get_int("INDEX_CONCURRENCY", 4, min_value=1, max_value=16)
+        self.INDEX_BATCH_MAX_CHUNKS = self._get_int("INDEX_BATCH_MAX_CHUNKS", 4, min_value=1, max_value=16)
+        self.INDEX_BATCH_MAX_CHARS = self._get_int("INDEX_BATCH_MAX_CHARS", 12000, min_value=1000, max_value=60000)
+        self.RAG_INDEX_BACKGROUND = self._get_bool("RAG_INDEX_BACKGROUND", True)
+        self.RAG_INDEX_WORKER_IN_PROCESS = self._get_bool("RAG_INDEX_WORKER_IN_PROCESS", True)
+        self.RAG_INDEX_WORKERS = self._get_int("RAG_INDEX_WORKERS", 2, min_value=1, max_value=16)
+        self.RAG_INDEX_PREVIEW_CHUNKS = self._get_int("RAG_INDEX_PREVIEW_CHUNKS", 3, min_value=1, max_value=10)
+        self.RAG_VECTOR_INDEX_ENABLED = self._get_bool("RAG_VECTOR_INDEX_ENABLED", True)
+        self.RAG_VECTOR_DIM = self._get_int("RAG_VECTOR_DIM", 256, min_value=64, max_value=4096)
+        # 0 workers extracts PDF pages on the calling thread.
+        self.PDF_EXTRACT_WORKERS = self._get_int("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1), min_value=0, max_value=32)
+        self.PDF_EXTRACT_BATCH_PAGES = self._get_int("PDF_EXTRACT_BATCH_PAGES", 8, min_value=1, max_value=200)
+
+        # --- SHARED HTTP CLIENT ---
+        self.HTTP_POOL_LIMIT = self._get_int("HTTP_POOL_LIMIT", 100, min_value=10, max_value=1000)
+        self.HTTP_POOL_LIMIT_PER_HOST = self._get_int("HTTP_POOL_LIMIT_PER_HOST", 8, min_value=1, max_value=100)
+        self.HTTP_DNS_CACHE_TTL_SECONDS = self._get_int("HTTP_DNS_CACHE_TTL_SECONDS", 300, min_value=0, max_value=3600)
+        self.HTTP_KEEPALIVE_SECONDS = self._get_int("HTTP_KEEPALIVE_SECONDS", 30, min_value=1, max_value=300)
 
     def _resolve_runtime_path(self, env_name: str, default_relative_path: str) -> str:
         raw_path = (os.getenv(env_name) or "").strip()
@@ -211,6 +238,7 @@ class Config:
             Path(self.WEATHER_CACHE_PATH).parent,
             Path(self.FILE_STORAGE_PATH),
             Path(self.FILE_CHUNK_DIR),
+            Path(self.RAG_VECTOR_DIR),
             Path(self.VOICE_LOCK_BASE_DIR),
             Path(self.LOG_PATH).parent,
         }
@@ -223,6 +251,7 @@ class Config:
             "project_root": str(self.PROJECT_ROOT),
             "file_storage_path": self.FILE_STORAGE_PATH,
             "file_chunk_dir": self.FILE_CHUNK_DIR,
+            "rag_vector_dir": self.RAG_VECTOR_DIR,
             "weather_cache_path": self.WEATHER_CACHE_PATH,
             "voice_lock_base_dir": self.VOICE_LOCK_BASE_DIR,
             "log_path": self.LOG_PATH,
@@ -293,6 +322,7 @@ NOTE_PATH = config.NOTE_PATH
 WEATHER_CACHE_PATH = config.WEATHER_CACHE_PATH
 FILE_STORAGE_PATH = config.FILE_STORAGE_PATH
 FILE_CHUNK_DIR = config.FILE_CHUNK_DIR
+RAG_VECTOR_DIR = config.RAG_VECTOR_DIR
 VOICE_LOCK_BASE_DIR = config.VOICE_LOCK_BASE_DIR
 VOICE_WHITELIST_FILE = config.VOICE_WHITELIST_FILE
 LOCKED_CHANNELS_FILE = config.LOCKED_CHANNELS_FILE
@@ -300,6 +330,22 @@ ENFORCED_NAMES_FILE = config.ENFORCED_NAMES_FILE
 VOICE_LOCK_LOG_FILE = config.VOICE_LOCK_LOG_FILE
 MIN_FREE_SPACE_MB = config.MIN_FREE_SPACE_MB
 MAX_SEARCH_CALLS_PER_TURN = config.MAX_SEARCH_CALLS_PER_TURN
+REASONING_TOOL_CONCURRENCY = config.REASONING_TOOL_CONCURRENCY
+INDEX_CONCURRENCY = config.INDEX_CONCURRENCY
+INDEX_BATCH_MAX_CHUNKS = config.INDEX_BATCH_MAX_CHUNKS
+INDEX_BATCH_MAX_CHARS = config.INDEX_BATCH_MAX_CHARS
+RAG_INDEX_BACKGROUND = config.RAG_INDEX_BACKGROUND
+RAG_INDEX_WORKER_IN_PROCESS = config.RAG_INDEX_WORKER_IN_PROCESS
+RAG_INDEX_WORKERS = config.RAG_INDEX_WORKERS
+RAG_INDEX_PREVIEW_CHUNKS = config.RAG_INDEX_PREVIEW_CHUNKS
+RAG_VECTOR_INDEX_ENABLED = config.RAG_VECTOR_INDEX_ENABLED
+RAG_VECTOR_DIM = config.RAG_VECTOR_DIM
+PDF_EXTRACT_WORKERS = config.PDF_EXTRACT_WORKERS
+PDF_EXTRACT_BATCH_PAGES = config.PDF_EXTRACT_BATCH_PAGES
+HTTP_POOL_LIMIT = config.HTTP_POOL_LIMIT
+HTTP_POOL_LIMIT_PER_HOST = config.HTTP_POOL_LIMIT_PER_HOST
+HTTP_DNS_CACHE_TTL_SECONDS = config.HTTP_DNS_CACHE_TTL_SECONDS
+HTTP_KEEPALIVE_SECONDS = config.HTTP_KEEPALIVE_SECONDS
 DEFAULT_RATE_LIMIT = config.DEFAULT_RATE_LIMIT
 PREMIUM_RATE_LIMIT = config.PREMIUM_RATE_LIMIT
 DEFAULT_DM_LIMIT = config.DEFAULT_DM_LIMIT
@@ -315,6 +361,9 @@ FALLBACK_MAX_OUTPUT_TOKENS = config.FALLBACK_MAX_OUTPUT_TOKENS
 FINAL_CONTINUATION_MAX_CALLS = config.FINAL_CONTINUATION_MAX_CALLS
 SEARCH_ENABLE_EXTRA_RETRIEVAL_PASS = config.SEARCH_ENABLE_EXTRA_RETRIEVAL_PASS
 SEARCH_ALLOW_PARTIAL_ANSWER = config.SEARCH_ALLOW_PARTIAL_ANSWER
+STREAM_FINAL_REPLY = config.STREAM_FINAL_REPLY
+STREAM_PUBLISH_INTERVAL_MS = config.STREAM_PUBLISH_INTERVAL_MS
+STREAM_EDIT_INTERVAL_MS = config.STREAM_EDIT_INTERVAL_MS
 PROJECT_ROOT = str(config.PROJECT_ROOT)
 LOG_PATH = config.LOG_PATH
 DONATE_ENCRYPTION_KEY = config.DONATE_ENCRYPTION_KEY
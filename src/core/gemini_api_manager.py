@@ -14,6 +14,8 @@ from google.genai import types as genai_types
 
 from src.core.config import logger
 from src.core.api_router import get_api_router
+from src.core.gemini_rate_limiter import PRIORITY_INTERACTIVE
+from src.core.token_estimator import get_token_estimator, units_to_tokens
 
 
 class GeminiApiManager:
@@ -38,6 +40,7 @@ class GeminiApiManager:
         self._gemini_clients: Dict[Any, Any] = {}
         self._gemini_clients_lock = threading.Lock()
         self.router_bypass_until = 0.0
+        self._token_estimator = get_token_estimator()
 
     # --- Key selection ---
 
@@ -339,29 +342,25 @@ class GeminiApiManager:
 
     # --- Prompt helpers ---
 
-    @staticmethod
-    def _flatten_prompt_text(messages: List[Dict[str, Any]]) -> str:
-        chunks: List[str] = []
-        for msg in messages:
-            parts = msg.get("parts", [])
-            for part in parts:
-                text = part.get("text") if isinstance(part, dict) else None
-                if text:
-                    chunks.append(text)
-        return "\n".join(chunks)
-
     async def _acquire_gemini_quota(
         self,
         messages: List[Dict[str, Any]],
         max_output_tokens: int,
         model_alias: Optional[str] = None,
         extra_text: str = "",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> bool:
-        prompt_text = self._flatten_prompt_text(messages)
-        if extra_text:
-            prompt_text = f"{extra_text}\n{prompt_text}" if prompt_text else extra_text
+        # Estimate per block instead of flattening: the system prompt and history parts are
+        # memoized, so each reasoning-loop call only counts the parts appended since the last one.
+        input_tokens = units_to_tokens(self._token_estimator.message_units(messages, extra_text))
         target_model = model_alias or self.api_router.get_preferred_model()
-        return await self.api_router.acquire_gemini_quota(prompt_text, max_output_tokens, target_model)
+        return await self.api_router.acquire_gemini_quota(
+            "",
+            max_output_tokens,
+            target_model,
+            priority=priority,
+            input_tokens=input_tokens,
+        )
 
     async def _generate_gemini_content(
         self,
@@ -552,7 +551,14 @@ class GeminiApiManager:
             contents=sdk_contents,
             config=request_config,  # type: ignore[arg-type]
         )
-        for chunk in stream:
+        # Pull each chunk in a worker thread: iterating the SDK stream directly would block
+        # the event loop for the whole network read between chunks.
+        iterator = iter(stream)
+        sentinel = object()
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, sentinel)
+            if chunk is sentinel:
+                break
             yield chunk
 
 
@@ -6,8 +6,9 @@ class TextParsedFunctionCall:
 
 import asyncio
 import re
+import time
 from datetime import datetime
-from typing import Any, Optional, Dict, List, Tuple
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple
 
 from src.core.config import logger
 from src.core.prompt_loader import (
@@ -24,6 +25,19 @@ from src.core.prompt_loader import (
 
 from .gemini_api_manager import GeminiApiManager
 
+# Receives the cleaned cumulative final-output text each time it grows.
+PartialOutputCallback = Callable[[str], Awaitable[None]]
+
+# Tools without side effects; consecutive calls to these within one reasoning step run
+# concurrently. Anything else (note/role writes) runs alone, in the order the model asked.
+_PARALLEL_SAFE_TOOLS = frozenset({
+    "web_search",
+    "get_weather",
+    "calculate",
+    "image_recognition",
+    "retrieve_notes",
+})
+
 
 def _prepare_user_input_block(user_input: str, max_chars: int = 2200) -> str:
     text = (user_input or "").strip()
@@ -287,6 +301,7 @@ class GeminiPipeline:
         model_alias: str,
         user_id: str,
         stage: str,
+        on_partial: Optional[PartialOutputCallback] = None,
     ) -> str:
         max_calls = int(getattr(self.config, "FINAL_CONTINUATION_MAX_CALLS", 5) or 5)
         current_text = accumulated_text
@@ -349,6 +364,7 @@ class GeminiPipeline:
                         return current_text
 
                     current_text = _append_continuation_text(current_text, next_text)
+                    await self._emit_partial(on_partial, current_text)
                     if not _is_truncated_candidate(candidate):
                         return current_text
                     break
@@ -414,8 +430,58 @@ class GeminiPipeline:
 
         return current_text
 
-    async def call_gemini_api(self, messages: List[Dict[str, Any]], user_id: str, privacy_context: Dict[str, Any]) -> str:
-        """Two-Tier Model Strategy: Flash-Lite (reasoning) -> Flash (final output)."""
+    async def _emit_partial(self, on_partial: Optional[PartialOutputCallback], text: str) -> None:
+        if on_partial is None or not text:
+            return
+        try:
+            await on_partial(text)
+        except Exception as e:
+            self.logger.warning(f"Partial output callback failed: {e}")
+
+    async def _stream_final_text(
+        self,
+        *,
+        api_key: str,
+        model_name: str,
+        system_instruction: str,
+        generation_config: Dict[str, Any],
+        messages: List[Dict[str, Any]],
+        on_partial: PartialOutputCallback,
+    ) -> Tuple[str, Any]:
+        """Stream the final output, reporting partial text; returns (text, last candidate)."""
+        raw_parts: List[str] = []
+        last_candidate = None
+        async for chunk in self.api_mgr._generate_gemini_content_stream(
+            api_key=api_key,
+            model_name=model_name,
+            system_instruction=system_instruction,
+            generation_config=generation_config,
+            messages=messages,
+        ):
+            candidate = chunk.candidates[0] if getattr(chunk, "candidates", None) else None
+            if candidate is None:
+                continue
+            last_candidate = candidate
+            parts = getattr(getattr(candidate, "content", None), "parts", None) or []
+            piece = "".join(str(part.text) for part in parts if getattr(part, "text", None))
+            if piece:
+                raw_parts.append(piece)
+                await self._emit_partial(on_partial, _clean_response_artifacts("".join(raw_parts).strip()))
+
+        return _clean_response_artifacts("".join(raw_parts).strip()), last_candidate
+
+    async def call_gemini_api(
+        self,
+        messages: List[Dict[str, Any]],
+        user_id: str,
+        privacy_context: Dict[str, Any],
+        on_partial: Optional[PartialOutputCallback] = None,
+    ) -> str:
+        """Two-Tier Model Strategy: Flash-Lite (reasoning) -> Flash (final output).
+
+        When on_partial is given and STREAM_FINAL_REPLY is on, the final output is streamed
+        and on_partial receives the growing text; the returned text is always complete.
+        """
 
         reasoning_result, tool_results = await self._call_gemini_reasoning_loop(messages, user_id, privacy_context)
 
@@ -439,9 +505,57 @@ class GeminiPipeline:
                     f"Evidence below strict threshold for {user_id}, continuing with partial evidence mode={self.config.SEARCH_ALLOW_PARTIAL_ANSWER}."
                 )
 
-        final_output = await self._call_gemini_final(messages, reasoning_result, tool_results, user_id, privacy_context)
+        final_output = await self._call_gemini_final(
+            messages, reasoning_result, tool_results, user_id, privacy_context, on_partial=on_partial
+        )
         return final_output
 
+    async def _execute_tool_calls(
+        self,
+        calls: List[Dict[str, Any]],
+        user_id: str,
+        iteration: int,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Run one step's tool calls, storing each result on its call dict.
+
+        Consecutive side-effect-free calls run concurrently under the turn's semaphore;
+        any other tool is a barrier that runs alone.
+        """
+        if not calls:
+            return
+
+        async def run(call: Dict[str, Any]) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                call["result"] = await self.tools_mgr.call_tool(call["fc"], user_id)
+                call["elapsed_ms"] = (time.perf_counter() - started) * 1000
+            self.logger.info(
+                f"[Reasoning Loop {iteration}] Tool {call['fc'].name} returned content "
+                f"(length={len(str(call['result']))}) in {call['elapsed_ms']:.0f}ms"
+            )
+
+        step_started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+        for call in calls:
+            if call["name"] in _PARALLEL_SAFE_TOOLS:
+                batch.append(call)
+                continue
+            if batch:
+                await asyncio.gather(*(run(item) for item in batch))
+                batch = []
+            await run(call)
+        if batch:
+            await asyncio.gather(*(run(item) for item in batch))
+
+        if len(calls) > 1:
+            wall_ms = (time.perf_counter() - step_started) * 1000
+            sum_ms = sum(call.get("elapsed_ms", 0.0) for call in calls)
+            self.logger.info(
+                f"[TOOL-SPAN] step={iteration} user={user_id} calls={len(calls)} "
+                f"wall_ms={wall_ms:.0f} sum_ms={sum_ms:.0f}"
+            )
+
     async def _call_gemini_reasoning_loop(self, messages: List[Dict[str, Any]], user_id: str, privacy_context: Dict[str, Any]) -> Tuple[str, str]:
         MAX_RETRIES = self.config.REASONING_MAX_API_RETRIES
         reasoning_model_alias = self.reasoning_model_alias
@@ -459,6 +573,7 @@ class GeminiPipeline:
         tool_results_list: List[str] = []
         web_search_calls = 0
         iteration = 0
+        tool_semaphore = asyncio.Semaphore(int(getattr(self.config, "REASONING_TOOL_CONCURRENCY", 4) or 1))
 
         for attempt in range(MAX_RETRIES):
             api_key: Optional[str] = None
@@ -530,6 +645,11 @@ class GeminiPipeline:
                     model_parts = []
                     function_response_parts = []
 
+                    # Collect the step's calls first so independent tools can run concurrently;
+                    # responses are emitted afterwards in the order the model requested them.
+                    step_calls: List[Dict[str, Any]] = []
+                    max_search_calls = getattr(self.config, "MAX_SEARCH_CALLS_PER_TURN", 5)
+
                     for part in candidate.content.parts:
                         if part.function_call and part.function_call.name:
                             has_function_calls = True
@@ -538,48 +658,57 @@ class GeminiPipeline:
                             args = dict(fc.args) if fc.args else {}
                             self.logger.info(f"[Reasoning Loop {iteration}] Model requested tool: {fc.name} args={args}")
                             model_parts.append(part)
+                            call: Dict[str, Any] = {"fc": fc, "name": tool_name, "args": args, "result": None, "line": None}
+                            step_calls.append(call)
 
                             # Intercept JSON parsing errors from the wrapper
                             if "_parsing_error" in args:
                                 error_msg = args["_parsing_error"]
                                 raw_args = args.get("_raw_arguments", "")
-                                tool_res = "System Error: Failed to parse tool arguments as valid JSON. Error: {} Raw input was: {} Please fix your JSON formatting and try again.".format(error_msg, raw_args)
+                                call["result"] = "System Error: Failed to parse tool arguments as valid JSON. Error: {} Raw input was: {} Please fix your JSON formatting and try again.".format(error_msg, raw_args)
+                                call["line"] = f"[{fc.name}|error=json_parse_failed]"
                                 self.logger.warning(f"[Reasoning Loop {iteration}] Tool {fc.name} parsing failed: {error_msg}")
-                                tool_results_list.append(f"[{fc.name}|error=json_parse_failed]")
-                                func_res = {"name": fc.name, "response": {"content": str(tool_res)}}
-                                if getattr(fc, 'id', None):
-                                    func_res['id'] = fc.id
-                                function_response_parts.append({"function_response": func_res})
                                 continue
 
-                            max_search_calls = getattr(self.config, "MAX_SEARCH_CALLS_PER_TURN", 5)
-                            if tool_name == "web_search" and web_search_calls >= max_search_calls:
-                                budget_msg = get_search_budget_prompt()
-                                self.logger.info(f"[Reasoning Loop {iteration}] Tool {fc.name} blocked by search budget.")
-                                func_res = {"name": "web_search", "response": {"content": budget_msg}}
-                                if getattr(fc, 'id', None):
-                                    func_res['id'] = fc.id
-                                function_response_parts.append({"function_response": func_res})
-                                continue
-
-                            tool_res = await self.tools_mgr.call_tool(fc, user_id)
-                            self.logger.info(f"[Reasoning Loop {iteration}] Tool {fc.name} returned content (length={len(str(tool_res))})")
                             if tool_name == "web_search":
+                                # Budget is reserved at request time so concurrent searches cannot overshoot it.
+                                if web_search_calls >= max_search_calls:
+                                    self.logger.info(f"[Reasoning Loop {iteration}] Tool {fc.name} blocked by search budget.")
+                                    call["result"] = get_search_budget_prompt()
+                                    call["response_name"] = "web_search"
+                                    continue
                                 web_search_calls += 1
-                                intent_query = (args.get("query") or "").strip()
-                                tool_results_list.append(f"[{fc.name}|intent={intent_query}] {tool_res}")
-                            else:
-                                tool_results_list.append(f"[{fc.name}] {tool_res}")
 
-                            func_res = {"name": fc.name, "response": {"content": str(tool_res)}}
-                            if getattr(fc, 'id', None):
-                                func_res['id'] = fc.id
-                            function_response_parts.append({"function_response": func_res})
-                        
+                            call["run"] = True
+
                         elif part.text and has_function_calls:
                             # We can also append text parts from the model to the model_parts if they exist alongside function calls
                             model_parts.append(part)
 
+                    await self._execute_tool_calls(
+                        [call for call in step_calls if call.get("run")],
+                        user_id,
+                        iteration,
+                        tool_semaphore,
+                    )
+
+                    for call in step_calls:
+                        fc = call["fc"]
+                        tool_res = call["result"]
+                        if call.get("run"):
+                            if call["name"] == "web_search":
+                                intent_query = (call["args"].get("query") or "").strip()
+                                call["line"] = f"[{fc.name}|intent={intent_query}] {tool_res}"
+                            else:
+                                call["line"] = f"[{fc.name}] {tool_res}"
+                        if call["line"]:
+                            tool_results_list.append(call["line"])
+
+                        func_res = {"name": call.get("response_name") or fc.name, "response": {"content": str(tool_res)}}
+                        if getattr(fc, 'id', None):
+                            func_res['id'] = fc.id
+                        function_response_parts.append({"function_response": func_res})
+
                     if has_function_calls:
                         reasoning_messages.append({"role": "model", "parts": model_parts})
                         reasoning_messages.append({"role": "user", "parts": function_response_parts})
@@ -733,8 +862,18 @@ class GeminiPipeline:
         tool_results_str = "\n".join(tool_results_list) if tool_results_list else ""
         return "Reasoning loop failed", tool_results_str
 
-    async def _call_gemini_final(self, original_messages: List[Dict[str, Any]], reasoning_result: str, tool_results: str, user_id: str, privacy_context: Dict[str, Any]) -> str:
+    async def _call_gemini_final(
+        self,
+        original_messages: List[Dict[str, Any]],
+        reasoning_result: str,
+        tool_results: str,
+        user_id: str,
+        privacy_context: Dict[str, Any],
+        on_partial: Optional[PartialOutputCallback] = None,
+    ) -> str:
         MAX_RETRIES = max(5, self.config.FINAL_MAX_API_RETRIES)
+        if not getattr(self.config, "STREAM_FINAL_REPLY", False):
+            on_partial = None
         # Nếu chưa cấu hình Router API (ROUTER_AUTH_KEY rỗng) → dùng lite model cho cả final
         if not getattr(self.config, "ROUTER_AUTH_KEY", "") and getattr(self.config, "GEMINI_BASE_URL", ""):
             final_model_alias = self.fallback_model_alias
@@ -822,19 +961,37 @@ class GeminiPipeline:
 
                 await self.api_mgr._throttle_api_request(api_key)
 
-                self.logger.info(f"Final output for user {user_id} ({model_name}, attempt {attempt + 1}/{MAX_RETRIES})")
-
-                response = await self.api_mgr._generate_gemini_content(
-                    api_key=api_key,
-                    model_name=model_name,
-                    system_instruction=system_with_context,
-                    generation_config=generation_config,
-                    messages=final_messages,
+                self.logger.info(
+                    f"Final output for user {user_id} ({model_name}, attempt {attempt + 1}/{MAX_RETRIES}, "
+                    f"stream={on_partial is not None})"
                 )
-                self.api_mgr._commit_selected_key(key_reservation)
 
-                candidate = response.candidates[0] if response.candidates else None
-                if not (candidate and candidate.content and candidate.content.parts):
+                if on_partial is not None:
+                    text, candidate = await self._stream_final_text(
+                        api_key=api_key,
+                        model_name=model_name,
+                        system_instruction=system_with_context,
+                        generation_config=generation_config,
+                        messages=final_messages,
+                        on_partial=on_partial,
+                    )
+                    self.api_mgr._commit_selected_key(key_reservation)
+                    has_candidate = candidate is not None and bool(text)
+                else:
+                    response = await self.api_mgr._generate_gemini_content(
+                        api_key=api_key,
+                        model_name=model_name,
+                        system_instruction=system_with_context,
+                        generation_config=generation_config,
+                        messages=final_messages,
+                    )
+                    self.api_mgr._commit_selected_key(key_reservation)
+
+                    candidate = response.candidates[0] if response.candidates else None
+                    has_candidate = bool(candidate and candidate.content and candidate.content.parts)
+                    text = _candidate_text(candidate) if has_candidate else ""
+
+                if not has_candidate:
                     if api_key:
                         self.api_mgr._mark_key_as_failed(
                             api_key,
@@ -850,7 +1007,6 @@ class GeminiPipeline:
                     await asyncio.sleep(1)
                     continue
 
-                text = _candidate_text(candidate)
                 if text and len(text) > 5:
                     if _is_truncated_candidate(candidate):
                         self.logger.info(f"Final output hit token limit for {user_id}; requesting continuation chunks.")
@@ -861,6 +1017,7 @@ class GeminiPipeline:
                             model_alias=final_model_alias,
                             user_id=user_id,
                             stage="final_flash",
+                            on_partial=on_partial,
                         )
                     if _looks_semantically_incomplete(text):
                         self.logger.info(f"Final output looks semantically incomplete for {user_id}; requesting continuation.")
@@ -871,6 +1028,7 @@ class GeminiPipeline:
                             model_alias=final_model_alias,
                             user_id=user_id,
                             stage="final_flash_semantic",
+                            on_partial=on_partial,
                         )
                     return text
 
@@ -1,10 +1,21 @@
 import asyncio
 import datetime
+import heapq
+import itertools
 import time
 from collections import deque
+from typing import List, Optional, Tuple
+
+from .token_estimator import get_token_estimator, units_to_tokens
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
 
 
 class GeminiRateLimiter:
+    WINDOW_SECONDS = 60.0
+
     def __init__(
         self,
         rpm: int = 15,
@@ -23,70 +34,116 @@ class GeminiRateLimiter:
 
         self._minute_req_ts = deque()
         self._minute_tokens = deque()
+        # Running total of the tokens in _minute_tokens, kept in step with the deque.
+        self._minute_token_sum = 0
         self._rpd_date = datetime.date.today()
         self._rpd_count = 0
-        self._lock = asyncio.Lock()
+
+        # Min-heap of (priority, seq, reserved_tokens, future); lower priority values go first.
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._waiter_seq = itertools.count()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
 
     def estimate_text_tokens(self, text: str) -> int:
-        if not text:
-            return 1
-        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
-        non_ascii_chars = len(text) - ascii_chars
-        base_tokens = (ascii_chars / 3.6) + (non_ascii_chars / 1.6)
-        return max(1, int(base_tokens + 0.999999))
-
-    def estimate_request_tokens(self, prompt_text: str, max_output_tokens: int, image_count: int = 0) -> int:
-        input_tokens = self.estimate_text_tokens(prompt_text)
+        return units_to_tokens(get_token_estimator().text_units(text))
+
+    def estimate_request_tokens(
+        self,
+        prompt_text: str,
+        max_output_tokens: int,
+        image_count: int = 0,
+        input_tokens: Optional[int] = None,
+    ) -> int:
+        if input_tokens is None:
+            input_tokens = self.estimate_text_tokens(prompt_text)
         image_overhead = image_count * 20
         total = (input_tokens + max_output_tokens + self.fixed_overhead + image_overhead) * self.safety_factor
         return max(1, int(total + 0.999999))
 
-    async def acquire_quota(self, reserved_tokens: int) -> bool:
-        while True:
-            async with self._lock:
-                now = time.time()
-                today = datetime.date.today()
-
-                if today != self._rpd_date:
-                    self._rpd_date = today
-                    self._rpd_count = 0
-
-                while self._minute_req_ts and now - self._minute_req_ts[0] >= 60:
-                    self._minute_req_ts.popleft()
-
-                while self._minute_tokens and now - self._minute_tokens[0][0] >= 60:
-                    self._minute_tokens.popleft()
-
-                if self.rpd_limit > 0 and self._rpd_count >= self.rpd_limit:
-                    return False
-
-                used_tokens = sum(item[1] for item in self._minute_tokens)
-                if len(self._minute_req_ts) < self.rpm_limit and (used_tokens + reserved_tokens) <= self.tpm_limit:
-                    self._minute_req_ts.append(now)
-                    self._minute_tokens.append((now, reserved_tokens))
-                    self._rpd_count += 1
-                    return True
-
-                wait_req = (60 - (now - self._minute_req_ts[0])) if self._minute_req_ts else 0.5
-                wait_tok = (60 - (now - self._minute_tokens[0][0])) if self._minute_tokens else 0.5
-                wait_time = max(0.3, min(wait_req, wait_tok))
-
-            await asyncio.sleep(wait_time)
-
-    def get_counters_snapshot(self) -> dict:
+    def _prune(self, now: float) -> None:
+        today = datetime.date.today()
+        if today != self._rpd_date:
+            self._rpd_date = today
+            self._rpd_count = 0
+
+        cutoff = now - self.WINDOW_SECONDS
+        while self._minute_req_ts and self._minute_req_ts[0] <= cutoff:
+            self._minute_req_ts.popleft()
+        while self._minute_tokens and self._minute_tokens[0][0] <= cutoff:
+            self._minute_token_sum -= self._minute_tokens.popleft()[1]
+
+    def _record_usage(self, now: float, reserved_tokens: int) -> None:
+        self._minute_req_ts.append(now)
+        self._minute_tokens.append((now, reserved_tokens))
+        self._minute_token_sum += reserved_tokens
+        self._rpd_count += 1
+
+    def _rpd_exhausted(self) -> bool:
+        return self.rpd_limit > 0 and self._rpd_count >= self.rpd_limit
+
+    def _has_capacity(self, reserved_tokens: int) -> bool:
+        return (
+            len(self._minute_req_ts) < self.rpm_limit
+            and (self._minute_token_sum + reserved_tokens) <= self.tpm_limit
+        )
+
+    def _seconds_until_capacity(self, now: float, reserved_tokens: int) -> float:
+        wait = 0.0
+        if len(self._minute_req_ts) >= self.rpm_limit and self._minute_req_ts:
+            wait = max(wait, self._minute_req_ts[0] + self.WINDOW_SECONDS - now)
+        if (self._minute_token_sum + reserved_tokens) > self.tpm_limit and self._minute_tokens:
+            wait = max(wait, self._minute_tokens[0][0] + self.WINDOW_SECONDS - now)
+        return max(0.01, wait)
+
+    async def acquire_quota(self, reserved_tokens: int, priority: int = PRIORITY_INTERACTIVE) -> bool:
         now = time.time()
-        req_ts_snapshot = list(self._minute_req_ts)
-        token_snapshot = list(self._minute_tokens)
+        self._prune(now)
+        if self._rpd_exhausted() or reserved_tokens > self.tpm_limit:
+            return False
+
+        # Fast path: nobody queued ahead and the window has room.
+        if not self._waiters and self._has_capacity(reserved_tokens):
+            self._record_usage(now, reserved_tokens)
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._waiter_seq), reserved_tokens, future))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        """Grant queued waiters in priority order, then arm one timer for the next expiry."""
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+            self._wake_handle = None
 
-        rpm_used = sum(1 for ts in req_ts_snapshot if now - ts < 60)
-        tpm_used = sum(tokens for ts, tokens in token_snapshot if now - ts < 60)
-        rpd_used = self._rpd_count if datetime.date.today() == self._rpd_date else 0
+        now = time.time()
+        self._prune(now)
+        while self._waiters:
+            _, _, reserved_tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._rpd_exhausted() or reserved_tokens > self.tpm_limit:
+                heapq.heappop(self._waiters)
+                future.set_result(False)
+                continue
+            if not self._has_capacity(reserved_tokens):
+                delay = self._seconds_until_capacity(now, reserved_tokens)
+                self._wake_handle = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._record_usage(now, reserved_tokens)
+            future.set_result(True)
 
+    def get_counters_snapshot(self) -> dict:
+        self._prune(time.time())
         return {
-            "rpm_used": rpm_used,
+            "rpm_used": len(self._minute_req_ts),
             "rpm_limit": self.rpm_limit,
-            "tpm_used": tpm_used,
+            "tpm_used": self._minute_token_sum,
             "tpm_limit": self.tpm_limit,
-            "rpd_used": rpd_used,
+            "rpd_used": self._rpd_count,
             "rpd_limit": self.rpd_limit,
+            "waiters": len(self._waiters),
         }
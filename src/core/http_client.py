@@ -0,0 +1,440 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiofiles
+import aiohttp
+
+from src.core.config import (
+    logger,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL_SECONDS,
+    HTTP_KEEPALIVE_SECONDS,
+)
+
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+# Downloads buffer this much before each (thread-offloaded) file write.
+DOWNLOAD_WRITE_BYTES = 1024 * 1024
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_\-]+)""", re.IGNORECASE)
+
+
+class ResponseTooLargeError(Exception):
+    """Raised when a response body exceeds the caller's byte cap."""
+
+
+class HttpResult:
+    __slots__ = ("url", "status", "headers", "body", "charset", "truncated", "elapsed_ms")
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        charset: Optional[str],
+        truncated: bool,
+        elapsed_ms: float,
+    ):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.charset = charset
+        self.truncated = truncated
+        self.elapsed_ms = elapsed_ms
+
+    def text(self, default_encoding: str = "utf-8") -> str:
+        encoding = self.charset
+        if not encoding:
+            match = _META_CHARSET_RE.search(self.body[:4096])
+            encoding = match.group(1).decode("ascii") if match else default_encoding
+        try:
+            return self.body.decode(encoding, errors="replace")
+        except LookupError:
+            return self.body.decode(default_encoding, errors="replace")
+
+
+class DownloadResult:
+    __slots__ = ("url", "path", "bytes", "sha256", "attempts", "resumed", "elapsed_ms")
+
+    def __init__(self, url: str, path: str, size: int, sha256: str, attempts: int, resumed: bool, elapsed_ms: float):
+        self.url = url
+        self.path = path
+        self.bytes = size
+        self.sha256 = sha256
+        self.attempts = attempts
+        self.resumed = resumed
+        self.elapsed_ms = elapsed_ms
+
+
+class _RetryableDownloadError(Exception):
+    """A download attempt failed in a way that is worth retrying (or resuming)."""
+
+
+def _new_host_stats() -> Dict[str, int]:
+    return {
+        "requests": 0,
+        "new_connections": 0,
+        "reused_connections": 0,
+        "dns_cache_hits": 0,
+        "dns_cache_misses": 0,
+        "bytes": 0,
+        "oversize_aborts": 0,
+        "errors": 0,
+        "download_retries": 0,
+        "download_resumes": 0,
+    }
+
+
+class HttpClient:
+    """Process-wide aiohttp session: keep-alive pools per host, cached DNS, per-host limits.
+
+    aiohttp speaks HTTP/1.1 only, so reuse comes from keep-alive connections rather than
+    HTTP/2 multiplexing. Connection reuse is counted per host through aiohttp trace hooks.
+    """
+
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl_seconds: int = HTTP_DNS_CACHE_TTL_SECONDS,
+        keepalive_seconds: int = HTTP_KEEPALIVE_SECONDS,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl_seconds = dns_cache_ttl_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retiring: Set[asyncio.Task] = set()
+        self._host_stats: Dict[str, Dict[str, int]] = {}
+        self.logger = logger
+
+    def _stats_for(self, host: str) -> Dict[str, int]:
+        stats = self._host_stats.get(host)
+        if stats is None:
+            stats = _new_host_stats()
+            self._host_stats[host] = stats
+        return stats
+
+    async def _on_connection_created(self, session, ctx, params) -> None:
+        host = (ctx.trace_request_ctx or {}).get("host", "")
+        self._stats_for(host)["new_connections"] += 1
+
+    async def _on_connection_reused(self, session, ctx, params) -> None:
+        host = (ctx.trace_request_ctx or {}).get("host", "")
+        self._stats_for(host)["reused_connections"] += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params) -> None:
+        self._stats_for(params.host)["dns_cache_hits"] += 1
+
+    async def _on_dns_cache_miss(self, session, ctx, params) -> None:
+        self._stats_for(params.host)["dns_cache_misses"] += 1
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        self._retire_session(loop)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(self._on_dns_cache_miss)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl_seconds,
+            keepalive_timeout=self.keepalive_seconds,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+        self._loop = loop
+        return self._session
+
+    def _retire_session(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Close a session left over from another event loop before it is replaced."""
+        stale, stale_loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if stale is None or stale.closed:
+            return
+        if stale_loop is not None and stale_loop.is_running() and not stale_loop.is_closed():
+            # Still serving another thread: close it there, where its connections live.
+            asyncio.run_coroutine_threadsafe(stale.close(), stale_loop)
+            return
+        # The old loop has stopped, so its sockets are dead; closing here releases the pool.
+        task = loop.create_task(stale.close())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def fetch(
+        self,
+        url: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = 15.0,
+        headers: Optional[Mapping[str, str]] = None,
+        truncate: bool = False,
+    ) -> HttpResult:
+        """GET url and read at most max_bytes of the body.
+
+        Oversized bodies are cut at max_bytes when truncate is set, otherwise the read stops
+        early and ResponseTooLargeError is raised without downloading the rest.
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        stats = self._stats_for(host)
+        stats["requests"] += 1
+        started = time.perf_counter()
+
+        try:
+            session = self._get_session()
+            async with session.get(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx={"host": host},
+            ) as resp:
+                declared = resp.content_length
+                if declared is not None and declared > max_bytes and not truncate:
+                    raise ResponseTooLargeError(f"{host}: Content-Length {declared} exceeds cap {max_bytes}")
+
+                body = bytearray()
+                truncated = False
+                async for chunk in resp.content.iter_chunked(READ_CHUNK_BYTES):
+                    room = max_bytes - len(body)
+                    if len(chunk) > room:
+                        if not truncate:
+                            raise ResponseTooLargeError(f"{host}: body exceeds cap {max_bytes}")
+                        body.extend(chunk[:room])
+                        truncated = True
+                        break
+                    body.extend(chunk)
+
+                stats["bytes"] += len(body)
+                return HttpResult(
+                    url=str(resp.url),
+                    status=resp.status,
+                    headers=resp.headers,
+                    body=bytes(body),
+                    charset=resp.charset,
+                    truncated=truncated,
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                )
+        except ResponseTooLargeError:
+            stats["oversize_aborts"] += 1
+            raise
+        except Exception:
+            stats["errors"] += 1
+            raise
+
+    async def _download_attempt(
+        self,
+        url: str,
+        part_path: str,
+        offset: int,
+        hasher: "hashlib._Hash",
+        *,
+        max_bytes: int,
+        timeout: float,
+        headers: Optional[Mapping[str, str]],
+        host: str,
+    ) -> Tuple[int, bool, "hashlib._Hash"]:
+        """One GET, resuming at offset when possible. Returns (bytes on disk, resumed, hasher)."""
+        # Content-Length, Range offsets and the cap all count bytes on the wire, so ask for
+        # the unencoded body and store exactly what arrives.
+        request_headers = dict(headers or {})
+        request_headers["Accept-Encoding"] = "identity"
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+
+        session = self._get_session()
+        try:
+            async with session.get(
+                url,
+                headers=request_headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx={"host": host},
+                auto_decompress=False,
+            ) as resp:
+                if resp.status in RETRYABLE_STATUSES:
+                    raise _RetryableDownloadError(f"HTTP Error {resp.status}")
+                resumed = bool(offset) and resp.status == 206
+                if offset and not resumed:
+                    # The server ignored the Range header; start the file over.
+                    if resp.status != 200:
+                        raise Exception(f"HTTP Error {resp.status}")
+                    offset = 0
+                    hasher = hashlib.sha256()
+                elif not offset and resp.status != 200:
+                    raise Exception(f"HTTP Error {resp.status}")
+                encoding = (resp.headers.get("Content-Encoding") or "identity").strip().lower()
+                if encoding != "identity":
+                    # Saving the encoded bytes would corrupt the file, and decoding them would
+                    # break the size checks and Range resume.
+                    raise Exception(f"{host}: unsupported Content-Encoding {encoding!r} for download")
+
+                declared = resp.content_length
+                if declared is not None and offset + declared > max_bytes:
+                    raise ResponseTooLargeError(f"{host}: Content-Length {offset + declared} exceeds cap {max_bytes}")
+
+                total = offset
+                pending = bytearray()
+                async with aiofiles.open(part_path, "ab" if resumed else "wb") as handle:
+                    async for chunk in resp.content.iter_chunked(READ_CHUNK_BYTES):
+                        total += len(chunk)
+                        if total > max_bytes:
+                            raise ResponseTooLargeError(f"{host}: body exceeds cap {max_bytes}")
+                        hasher.update(chunk)
+                        pending.extend(chunk)
+                        if len(pending) >= DOWNLOAD_WRITE_BYTES:
+                            await handle.write(bytes(pending))
+                            pending.clear()
+                    if pending:
+                        await handle.write(bytes(pending))
+                if declared is not None and total != offset + declared:
+                    raise _RetryableDownloadError(f"{host}: short body ({total - offset} of {declared} bytes)")
+                return total, resumed, hasher
+        except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise _RetryableDownloadError(f"{host}: {type(e).__name__}: {e}") from e
+
+    async def download_to_file(
+        self,
+        url: str,
+        path: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = 300.0,
+        headers: Optional[Mapping[str, str]] = None,
+        retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ) -> DownloadResult:
+        """Stream url to path without holding the body in memory, hashing it on the way.
+
+        The cap applies to bytes actually received, not to what the server or caller declared.
+        Interrupted transfers are retried and resumed with a Range request from the bytes
+        already on disk; the file only appears at path once it is complete.
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        stats = self._stats_for(host)
+        stats["requests"] += 1
+        started = time.perf_counter()
+        part_path = f"{path}.part"
+        hasher = hashlib.sha256()
+        offset = 0
+        resumed_any = False
+        attempt = 0
+
+        try:
+            while True:
+                attempt += 1
+                try:
+                    offset, resumed, hasher = await self._download_attempt(
+                        url,
+                        part_path,
+                        offset,
+                        hasher,
+                        max_bytes=max_bytes,
+                        timeout=timeout,
+                        headers=headers,
+                        host=host,
+                    )
+                    resumed_any = resumed_any or resumed
+                    break
+                except _RetryableDownloadError as e:
+                    if attempt > retries:
+                        raise
+                    # Resume from what actually reached the disk: the write buffer of the failed
+                    # attempt is lost, so the part file is re-hashed rather than trusting the hasher.
+                    offset, hasher = await asyncio.to_thread(_hash_file, part_path)
+                    stats["download_retries"] += 1
+                    if offset:
+                        stats["download_resumes"] += 1
+                    self.logger.warning(f"Download of {url} interrupted ({e}); retry {attempt}/{retries} from byte {offset}.")
+                    await asyncio.sleep(backoff_seconds * (2 ** (attempt - 1)))
+
+            os.replace(part_path, path)
+            stats["bytes"] += offset
+            return DownloadResult(
+                url=url,
+                path=path,
+                size=offset,
+                sha256=hasher.hexdigest(),
+                attempts=attempt,
+                resumed=resumed_any,
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        except ResponseTooLargeError:
+            stats["oversize_aborts"] += 1
+            _remove_quietly(part_path)
+            raise
+        except Exception:
+            stats["errors"] += 1
+            _remove_quietly(part_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        totals = _new_host_stats()
+        for host_stats in self._host_stats.values():
+            for key, value in host_stats.items():
+                totals[key] += value
+        connections = totals["new_connections"] + totals["reused_connections"]
+        return {
+            "totals": totals,
+            "connection_reuse_ratio": round(totals["reused_connections"] / connections, 4) if connections else 0.0,
+            "hosts": {host: dict(host_stats) for host, host_stats in self._host_stats.items()},
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def _hash_file(path: str) -> Tuple[int, "hashlib._Hash"]:
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "rb") as handle:
+            while True:
+                block = handle.read(DOWNLOAD_WRITE_BYTES)
+                if not block:
+                    break
+                hasher.update(block)
+                size += len(block)
+    except FileNotFoundError:
+        pass
+    return size, hasher
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_http_client_instance = None
+
+
+def get_http_client() -> HttpClient:
+    global _http_client_instance
+    if _http_client_instance is None:
+        _http_client_instance = HttpClient()
+    return _http_client_instance
+
+
+async def close_http_client() -> None:
+    if _http_client_instance is not None:
+        await _http_client_instance.close()
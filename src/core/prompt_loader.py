@@ -42,6 +42,11 @@ def get_file_index_reasoning_prompt() -> str:
     return _load_prompt("file_index_reasoning_prompt.txt", "")
 
 
+@lru_cache(maxsize=1)
+def get_file_index_batch_prompt() -> str:
+    return _load_prompt("file_index_batch_prompt.txt", "")
+
+
 @lru_cache(maxsize=1)
 def get_file_index_validation_prompt() -> str:
     return _load_prompt("file_index_validation_prompt.txt", "")
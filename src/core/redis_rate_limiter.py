@@ -0,0 +1,206 @@
+import asyncio
+import datetime
+import time
+import uuid
+from typing import Optional
+
+from redis.asyncio import Redis  # type: ignore[reportMissingImports]
+
+from src.core.config import logger
+from .gemini_rate_limiter import GeminiRateLimiter, PRIORITY_INTERACTIVE
+
+
+# KEYS: [1] request zset, [2] token zset, [3] running token sum, [4] daily counter
+# ARGV: now_ms, window_ms, rpm_limit, tpm_limit, rpd_limit, reserved_tokens, member, rpd_ttl_seconds
+# Returns {status, wait_ms}: 1 = granted, 0 = retry after wait_ms, -1 = daily quota exhausted.
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local rpm_limit = tonumber(ARGV[3])
+local tpm_limit = tonumber(ARGV[4])
+local rpd_limit = tonumber(ARGV[5])
+local reserved = tonumber(ARGV[6])
+local member = ARGV[7]
+local cutoff = now - window
+
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', cutoff)
+if #expired > 0 then
+    local released = 0
+    for _, item in ipairs(expired) do
+        local sep = string.find(item, ':', 1, true)
+        if sep then
+            released = released + tonumber(string.sub(item, sep + 1))
+        end
+    end
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', cutoff)
+    local remaining = redis.call('DECRBY', KEYS[3], released)
+    if remaining < 0 then
+        redis.call('SET', KEYS[3], 0)
+    end
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', cutoff)
+
+local rpd_used = tonumber(redis.call('GET', KEYS[4]) or '0')
+if rpd_limit > 0 and rpd_used >= rpd_limit then
+    return {-1, 0}
+end
+
+local req_used = redis.call('ZCARD', KEYS[1])
+local tok_used = tonumber(redis.call('GET', KEYS[3]) or '0')
+if req_used < rpm_limit and (tok_used + reserved) <= tpm_limit then
+    redis.call('ZADD', KEYS[1], now, member)
+    redis.call('ZADD', KEYS[2], now, member .. ':' .. reserved)
+    redis.call('INCRBY', KEYS[3], reserved)
+    redis.call('INCR', KEYS[4])
+    redis.call('EXPIRE', KEYS[4], tonumber(ARGV[8]))
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+    redis.call('PEXPIRE', KEYS[2], window * 2)
+    redis.call('PEXPIRE', KEYS[3], window * 2)
+    return {1, 0}
+end
+
+-- Both windows must clear, so wait for the later of the two oldest entries to expire.
+local wait_ms = 1
+if req_used >= rpm_limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        wait_ms = math.max(wait_ms, tonumber(oldest[2]) + window - now)
+    end
+end
+if (tok_used + reserved) > tpm_limit then
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        wait_ms = math.max(wait_ms, tonumber(oldest[2]) + window - now)
+    else
+        -- Reservation larger than the whole TPM budget: retry once per window.
+        wait_ms = window
+    end
+end
+return {0, wait_ms}
+"""
+
+
+class RedisGeminiRateLimiter(GeminiRateLimiter):
+    """GeminiRateLimiter whose RPM/TPM/RPD windows live in Redis and are shared across processes.
+
+    Falls back to the in-memory windows of the parent class while Redis is unreachable.
+    """
+
+    WINDOW_MS = 60_000
+    REDIS_RETRY_SECONDS = 30.0
+    MIN_WAIT_SECONDS = 0.05
+
+    def __init__(
+        self,
+        redis_url: str,
+        namespace: str,
+        rpm: int = 15,
+        tpm: int = 250000,
+        rpd: int = 500,
+        max_output_tokens: int = 2000,
+        fixed_overhead: int = 80,
+        safety_factor: float = 1.25,
+    ):
+        super().__init__(
+            rpm=rpm,
+            tpm=tpm,
+            rpd=rpd,
+            max_output_tokens=max_output_tokens,
+            fixed_overhead=fixed_overhead,
+            safety_factor=safety_factor,
+        )
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self._redis: Optional[Redis] = None
+        self._script = None
+        self._redis_retry_at = 0.0
+        # Earliest time another local attempt can succeed; lets local waiters sleep once
+        # instead of each hammering Redis.
+        self._blocked_until = 0.0
+        self.logger = logger
+
+    def _keys(self) -> list:
+        day = datetime.date.today().isoformat()
+        return [
+            f"{self.namespace}:req",
+            f"{self.namespace}:tok",
+            f"{self.namespace}:tok_sum",
+            f"{self.namespace}:rpd:{day}",
+        ]
+
+    async def _ensure_script(self):
+        if self._script is not None:
+            return self._script
+        self._redis = Redis.from_url(
+            self.redis_url,
+            decode_responses=False,
+            socket_connect_timeout=3,
+            socket_timeout=5,
+        )
+        await asyncio.wait_for(self._redis.ping(), timeout=5)
+        self._script = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self.logger.info(f"Gemini limiter '{self.namespace}' using Redis backend")
+        return self._script
+
+    async def _disable_redis(self, error: Exception) -> None:
+        self.logger.warning(
+            f"Gemini limiter '{self.namespace}' Redis unavailable, using in-memory fallback "
+            f"for {self.REDIS_RETRY_SECONDS:.0f}s: {error}"
+        )
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+        self._script = None
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception:
+                pass
+            self._redis = None
+
+    async def acquire_quota(self, reserved_tokens: int, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        # The script would answer "wait" forever for a reservation no window can hold.
+        if reserved_tokens > self.tpm_limit:
+            return False
+        if time.monotonic() < self._redis_retry_at:
+            return await super().acquire_quota(reserved_tokens, priority)
+
+        while True:
+            pause = self._blocked_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            try:
+                script = await self._ensure_script()
+                status, wait_ms = await script(
+                    keys=self._keys(),
+                    args=[
+                        int(time.time() * 1000),
+                        self.WINDOW_MS,
+                        self.rpm_limit,
+                        self.tpm_limit,
+                        self.rpd_limit,
+                        int(reserved_tokens),
+                        uuid.uuid4().hex,
+                        2 * 86400,
+                    ],
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._disable_redis(e)
+                return await super().acquire_quota(reserved_tokens, priority)
+
+            status = int(status)
+            if status == 1:
+                self._mirror_local_usage(reserved_tokens)
+                return True
+            if status == -1:
+                return False
+
+            wait_seconds = max(self.MIN_WAIT_SECONDS, int(wait_ms) / 1000.0)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait_seconds)
+
+    def _mirror_local_usage(self, reserved_tokens: int) -> None:
+        """Record this process's share locally so get_counters_snapshot stays meaningful."""
+        now = time.time()
+        self._prune(now)
+        self._record_usage(now, reserved_tokens)
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List
+
+ASCII_CHARS_PER_TOKEN = 3.6
+NON_ASCII_CHARS_PER_TOKEN = 1.6
+
+# Texts shorter than this are cheaper to count than to look up.
+MEMO_MIN_CHARS = 256
+MEMO_MAX_ENTRIES = 4096
+
+_ASCII_BYTES = bytes(range(128))
+_NEWLINE_UNITS = 1 / ASCII_CHARS_PER_TOKEN
+
+
+def _count_units(text: str) -> float:
+    if text.isascii():
+        return len(text) / ASCII_CHARS_PER_TOKEN
+    # Every ASCII char is exactly one UTF-8 byte below 0x80, so deleting those bytes
+    # in C gives the ASCII count without a Python-level loop over characters.
+    encoded = text.encode("utf-8", "surrogatepass")
+    ascii_chars = len(encoded) - len(encoded.translate(None, _ASCII_BYTES))
+    non_ascii_chars = len(text) - ascii_chars
+    return (ascii_chars / ASCII_CHARS_PER_TOKEN) + (non_ascii_chars / NON_ASCII_CHARS_PER_TOKEN)
+
+
+class TokenEstimator:
+    """Fractional token estimates per text block, memoized for long stable blocks.
+
+    System prompts and history messages are the same str objects turn after turn, so
+    dict lookup hits on their cached hash and identity and skips the count entirely.
+    """
+
+    def __init__(self, max_entries: int = MEMO_MAX_ENTRIES, min_chars: int = MEMO_MIN_CHARS):
+        self.max_entries = max_entries
+        self.min_chars = min_chars
+        self._memo: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def text_units(self, text: str) -> float:
+        if not text:
+            return 0.0
+        if len(text) < self.min_chars:
+            return _count_units(text)
+
+        units = self._memo.get(text)
+        if units is not None:
+            self._memo.move_to_end(text)
+            self.hits += 1
+            return units
+
+        self.misses += 1
+        units = _count_units(text)
+        self._memo[text] = units
+        if len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+        return units
+
+    def joined_units(self, texts: Iterable[str]) -> float:
+        """Units of "\\n".join(texts) without building the joined string."""
+        total = 0.0
+        count = 0
+        for text in texts:
+            if text:
+                total += self.text_units(text)
+                count += 1
+        if count > 1:
+            total += (count - 1) * _NEWLINE_UNITS
+        return total
+
+    def message_units(self, messages: List[Dict[str, Any]], extra_text: str = "") -> float:
+        """Units of extra_text plus every text part, matching the flattened prompt text."""
+        texts: List[str] = [extra_text] if extra_text else []
+        for msg in messages:
+            for part in msg.get("parts", []):
+                text = part.get("text") if isinstance(part, dict) else None
+                if text:
+                    texts.append(text)
+        return self.joined_units(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._memo), "hits": self.hits, "misses": self.misses}
+
+
+def units_to_tokens(units: float) -> int:
+    return max(1, int(units + 0.999999))
+
+
+_estimator_instance = None
+
+
+def get_token_estimator() -> TokenEstimator:
+    global _estimator_instance
+    if _estimator_instance is None:
+        _estimator_instance = TokenEstimator()
+    return _estimator_instance
@@ -0,0 +1,174 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "ttl", "expires_at")
+
+    def __init__(self, value: Any, size: int, ttl: float, expires_at: float):
+        self.value = value
+        self.size = size
+        self.ttl = ttl
+        self.expires_at = expires_at
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a cached value (strings, bytes and shallow containers)."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """LRU cache with per-entry TTL, entry/byte budgets and hit/miss/eviction counters.
+
+    Every operation is O(1) amortized: recency lives in one OrderedDict, and expiry is
+    tracked in one insertion-ordered queue per distinct TTL, so the oldest entry of each
+    queue is always the next to expire.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        default_ttl_seconds: float,
+        max_bytes: int = 0,
+        sliding_ttl: bool = False,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.default_ttl_seconds = float(default_ttl_seconds)
+        self.sliding_ttl = sliding_ttl
+        self._sizeof = sizeof
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._expiry_queues: Dict[float, "OrderedDict[Hashable, None]"] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        _register(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        self._purge_expired(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry.expires_at <= now:
+            self._remove(key, entry)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        if self.sliding_ttl:
+            entry.expires_at = now + entry.ttl
+            self._expiry_queues[entry.ttl].move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = time.monotonic()
+        ttl = float(ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds)
+        size = self._sizeof(value)
+
+        existing = self._entries.get(key)
+        if existing is not None:
+            self._remove(key, existing)
+        if self.max_bytes and size > self.max_bytes:
+            # A single value larger than the whole budget is never worth caching.
+            self.evictions += 1
+            return
+
+        self._entries[key] = _CacheEntry(value, size, ttl, now + ttl)
+        self._expiry_queues.setdefault(ttl, OrderedDict())[key] = None
+        self._bytes += size
+
+        self._purge_expired(now)
+        while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+            old_key, old_entry = next(iter(self._entries.items()))
+            self._remove(old_key, old_entry)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key, entry)
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry_queues.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable, entry: _CacheEntry) -> None:
+        del self._entries[key]
+        queue = self._expiry_queues.get(entry.ttl)
+        if queue is not None:
+            queue.pop(key, None)
+            if not queue:
+                del self._expiry_queues[entry.ttl]
+        self._bytes -= entry.size
+
+    def _purge_expired(self, now: float) -> None:
+        for ttl in list(self._expiry_queues):
+            queue = self._expiry_queues.get(ttl)
+            while queue:
+                key = next(iter(queue))
+                entry = self._entries[key]
+                if entry.expires_at > now:
+                    break
+                self._remove(key, entry)
+                self.expirations += 1
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def _register(cache: TTLCache) -> None:
+    _caches[cache.name] = cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of counters for every TTLCache created in this process."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -1,7 +1,9 @@
 import asyncio
 import json
 import os
+import re
 import uuid
+import time
 from typing import Optional, List, Dict, Any, Tuple
 
 import asyncpg  # type: ignore[reportMissingImports]
@@ -208,6 +210,37 @@ class DatabaseRepository:
                 """
             )
 
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rag_documents (
+                    document_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    filename TEXT NOT NULL DEFAULT '',
+                    chunk_count INTEGER NOT NULL DEFAULT 0,
+                    byte_size BIGINT NOT NULL DEFAULT 0,
+                    content_sha256 TEXT NOT NULL DEFAULT '',
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (document_id, user_id)
+                )
+                """
+            )
+
+            # One row per distinct file content; ref_count counts the rag_documents rows using it.
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rag_content (
+                    content_sha256 TEXT PRIMARY KEY,
+                    document_id TEXT NOT NULL,
+                    chunk_count INTEGER NOT NULL DEFAULT 0,
+                    byte_size BIGINT NOT NULL DEFAULT 0,
+                    ref_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+
             await conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS api_key_pool (
@@ -290,6 +323,32 @@ class DatabaseRepository:
                 """
             )
 
+            await conn.execute(
+                """
+                ALTER TABLE rag_documents ADD COLUMN IF NOT EXISTS content_sha256 TEXT NOT NULL DEFAULT ''
+                """
+            )
+
+            # Deduplicated documents are shared by several users: widen the rag_documents key.
+            await conn.execute(
+                """
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1
+                        FROM pg_index i
+                        JOIN pg_class c ON c.oid = i.indrelid
+                        WHERE c.relname = 'rag_documents'
+                          AND i.indisprimary
+                          AND i.indnatts = 1
+                    ) THEN
+                        ALTER TABLE rag_documents DROP CONSTRAINT rag_documents_pkey;
+                        ALTER TABLE rag_documents ADD PRIMARY KEY (document_id, user_id);
+                    END IF;
+                END $$;
+                """
+            )
+
             # Migrate user_notes.metadata column to JSONB if it's currently TEXT
             await conn.execute(
                 """
@@ -316,6 +375,19 @@ class DatabaseRepository:
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_user_notes_metadata_gin ON user_notes USING gin (metadata)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_chunks_keywords ON rag_chunks USING GIN (keywords)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_chunks_summary_trgm ON rag_chunks USING GIN (chunk_summary gin_trgm_ops)")
+            # 'simple' config: chunks are Vietnamese as often as English, and no stemmer fits both.
+            await conn.execute(
+                """
+                ALTER TABLE rag_chunks ADD COLUMN IF NOT EXISTS search_tsv tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(chunk_summary, '')), 'A')
+                    || setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+                ) STORED
+                """
+            )
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_chunks_search_tsv ON rag_chunks USING GIN (search_tsv)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_chunks_document ON rag_chunks (document_id)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_documents_user_access ON rag_documents (user_id, last_accessed_at DESC)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_custom_api_models_alive ON custom_api_models (provider, is_alive, model_id)")
 
             await self.sync_env_api_keys(conn=conn)
@@ -1019,6 +1091,83 @@ class DatabaseRepository:
             val = await conn.fetchval("SELECT 1 FROM messages WHERE user_id != $1 LIMIT 1", user_id)
         return val is not None
 
+    async def load_turn_context(self, user_id: str, history_limit: int = 12, identity_limit: int = 10) -> Dict[str, Any]:
+        """Load roles, daily count, privacy flags, identity notes and history in one round trip."""
+        started = time.perf_counter()
+        pool = await self._ensure_pool()
+        safe_history_limit = max(0, min(history_limit, 100))
+        safe_identity_limit = max(0, min(identity_limit, 100))
+
+        async with pool.acquire() as conn:
+            acquired = time.perf_counter()
+            row = await conn.fetchrow(
+                """
+                SELECT
+                    EXISTS (SELECT 1 FROM admin_users WHERE user_id = $1) AS is_admin,
+                    EXISTS (SELECT 1 FROM moderator_users WHERE user_id = $1) AS is_moderator,
+                    EXISTS (SELECT 1 FROM premium_users WHERE user_id = $1) AS is_premium,
+                    (
+                        SELECT COUNT(*) FROM messages
+                        WHERE user_id = $1 AND role = 'user' AND DATE(timestamp) = CURRENT_DATE
+                    ) AS daily_count,
+                    (SELECT COUNT(DISTINCT user_id) FROM messages WHERE user_id != $1) AS other_user_count,
+                    EXISTS (SELECT 1 FROM messages WHERE user_id != $1) AS has_other_users,
+                    (
+                        SELECT COALESCE(json_agg(n.content ORDER BY n.importance DESC, n.sort_ts DESC), '[]'::json)
+                        FROM (
+                            SELECT content, importance, COALESCE(updated_at, created_at) AS sort_ts
+                            FROM user_notes
+                            WHERE is_active = 1 AND user_id = $1 AND note_type = 'personal_preference'
+                            ORDER BY importance DESC, COALESCE(updated_at, created_at) DESC
+                            LIMIT $3
+                        ) n
+                    ) AS identity_notes,
+                    (
+                        SELECT COALESCE(json_agg(json_build_object('role', h.role, 'content', h.content) ORDER BY h.timestamp ASC), '[]'::json)
+                        FROM (
+                            SELECT role, content, timestamp
+                            FROM messages
+                            WHERE user_id = $1
+                            ORDER BY timestamp DESC
+                            LIMIT $2
+                        ) h
+                    ) AS history
+                """,
+                user_id,
+                safe_history_limit,
+                safe_identity_limit,
+            )
+            queried = time.perf_counter()
+
+        identity_notes = row["identity_notes"] if row else []
+        history = row["history"] if row else []
+        if isinstance(identity_notes, str):
+            identity_notes = json.loads(identity_notes)
+        if isinstance(history, str):
+            history = json.loads(history)
+        finished = time.perf_counter()
+
+        return {
+            "is_admin": bool(row and row["is_admin"]),
+            "is_moderator": bool(row and row["is_moderator"]),
+            "is_premium": bool(row and row["is_premium"]),
+            "daily_count": int((row and row["daily_count"]) or 0),
+            # The current user is about to log this turn, so count them in.
+            "distinct_user_count": int((row and row["other_user_count"]) or 0) + 1,
+            "has_other_users": bool(row and row["has_other_users"]),
+            "identity_notes": [str(item) for item in (identity_notes or [])],
+            "history": [
+                {"role": item.get("role", ""), "content": item.get("content", "")}
+                for item in (history or [])
+            ],
+            "timings_ms": {
+                "acquire": round((acquired - started) * 1000, 2),
+                "query": round((queried - acquired) * 1000, 2),
+                "decode": round((finished - queried) * 1000, 2),
+                "total": round((finished - started) * 1000, 2),
+            },
+        }
+
     async def search_user_messages_db(self, search_query: str, limit: int = 30, exclude_user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         pool = await self._ensure_pool()
         safe_limit = max(1, min(limit, 100))
@@ -1266,21 +1415,318 @@ class DatabaseRepository:
                 await conn.execute("TRUNCATE TABLE user_notes")
         return True
 
-    async def search_similar_chunks(self, search_text: str, limit: int = 5) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _rag_document_row(row: Any) -> Dict[str, Any]:
+        item = dict(row)
+        for field in ("created_at", "last_accessed_at"):
+            if item.get(field):
+                item[field] = item[field].isoformat()
+        return item
+
+    async def upsert_rag_document(
+        self,
+        document_id: str,
+        user_id: str,
+        filename: str,
+        chunk_count: int,
+        byte_size: int,
+        content_sha256: str = "",
+    ) -> Optional[Dict[str, Any]]:
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow(
+                    """
+                    INSERT INTO rag_documents (document_id, user_id, filename, chunk_count, byte_size, content_sha256)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (document_id, user_id) DO UPDATE
+                    SET filename = EXCLUDED.filename,
+                        chunk_count = EXCLUDED.chunk_count,
+                        byte_size = EXCLUDED.byte_size,
+                        content_sha256 = EXCLUDED.content_sha256,
+                        last_accessed_at = CURRENT_TIMESTAMP
+                    RETURNING document_id, user_id, filename, chunk_count, byte_size, content_sha256,
+                              created_at, last_accessed_at, (xmax = 0) AS inserted
+                    """,
+                    document_id,
+                    user_id,
+                    filename,
+                    int(chunk_count),
+                    int(byte_size),
+                    content_sha256 or "",
+                )
+                if row and row["inserted"] and content_sha256:
+                    await conn.execute(
+                        """
+                        UPDATE rag_content
+                        SET ref_count = ref_count + 1, last_accessed_at = CURRENT_TIMESTAMP
+                        WHERE content_sha256 = $1
+                        """,
+                        content_sha256,
+                    )
+        if not row:
+            return None
+        item = self._rag_document_row(row)
+        item.pop("inserted", None)
+        return item
+
+    async def get_latest_rag_document(self, user_id: str) -> Optional[Dict[str, Any]]:
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT document_id, user_id, filename, chunk_count, byte_size, content_sha256, created_at, last_accessed_at
+                FROM rag_documents
+                WHERE user_id = $1
+                ORDER BY last_accessed_at DESC
+                LIMIT 1
+                """,
+                user_id,
+            )
+        return self._rag_document_row(row) if row else None
+
+    async def touch_rag_document(self, document_id: str, user_id: Optional[str] = None) -> bool:
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            if user_id:
+                result = await conn.execute(
+                    "UPDATE rag_documents SET last_accessed_at = CURRENT_TIMESTAMP WHERE document_id = $1 AND user_id = $2",
+                    document_id,
+                    user_id,
+                )
+            else:
+                result = await conn.execute(
+                    "UPDATE rag_documents SET last_accessed_at = CURRENT_TIMESTAMP WHERE document_id = $1",
+                    document_id,
+                )
+        return self._command_count(result) > 0
+
+    async def get_rag_content(self, content_sha256: str) -> Optional[Dict[str, Any]]:
+        """Indexed document for a content hash, if an identical file was indexed before."""
+        if not content_sha256:
+            return None
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                UPDATE rag_content
+                SET last_accessed_at = CURRENT_TIMESTAMP
+                WHERE content_sha256 = $1
+                RETURNING content_sha256, document_id, chunk_count, byte_size, ref_count, created_at, last_accessed_at
+                """,
+                content_sha256,
+            )
+        return self._rag_document_row(row) if row else None
+
+    async def register_rag_content(
+        self,
+        content_sha256: str,
+        document_id: str,
+        chunk_count: int,
+        byte_size: int,
+    ) -> bool:
+        """Make document_id the shared index for this content. References are counted by
+        upsert_rag_document, so register before the uploader's own rag_documents row."""
+        if not content_sha256:
+            return False
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            # An existing row is repointed: its document was re-indexed because its files
+            # had been evicted from disk. Rows of the old document keep their own chunks.
+            result = await conn.execute(
+                """
+                INSERT INTO rag_content (content_sha256, document_id, chunk_count, byte_size)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (content_sha256) DO UPDATE
+                SET document_id = EXCLUDED.document_id,
+                    chunk_count = EXCLUDED.chunk_count,
+                    byte_size = EXCLUDED.byte_size,
+                    last_accessed_at = CURRENT_TIMESTAMP
+                """,
+                content_sha256,
+                document_id,
+                int(chunk_count),
+                int(byte_size),
+            )
+        return self._command_count(result) > 0
+
+    async def release_user_rag_documents(self, user_id: str) -> List[str]:
+        """Drop a user's document references. Returns the document_ids nobody references any
+        more; their chunks are deleted here and their files are the caller's to remove."""
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                released = await conn.fetch(
+                    "DELETE FROM rag_documents WHERE user_id = $1 RETURNING document_id, content_sha256",
+                    user_id,
+                )
+                if not released:
+                    return []
+                hashes = [row["content_sha256"] for row in released if row["content_sha256"]]
+                if hashes:
+                    # unnest keeps duplicates, so a user holding two rows of one content releases both.
+                    await conn.execute(
+                        """
+                        UPDATE rag_content c
+                        SET ref_count = GREATEST(c.ref_count - r.n, 0)
+                        FROM (SELECT h, COUNT(*) AS n FROM unnest($1::text[]) AS h GROUP BY h) r
+                        WHERE c.content_sha256 = r.h
+                        """,
+                        hashes,
+                    )
+                    await conn.execute(
+                        "DELETE FROM rag_content WHERE content_sha256 = ANY($1::text[]) AND ref_count <= 0",
+                        hashes,
+                    )
+                orphaned = await conn.fetch(
+                    """
+                    SELECT DISTINCT d.id AS document_id
+                    FROM unnest($1::text[]) AS d(id)
+                    WHERE NOT EXISTS (SELECT 1 FROM rag_documents r WHERE r.document_id = d.id)
+                      AND NOT EXISTS (SELECT 1 FROM rag_content c WHERE c.document_id = d.id)
+                    """,
+                    [row["document_id"] for row in released],
+                )
+                orphaned_ids = [row["document_id"] for row in orphaned]
+                if orphaned_ids:
+                    await conn.execute("DELETE FROM rag_chunks WHERE document_id = ANY($1::text[])", orphaned_ids)
+        return orphaned_ids
+
+    async def bulk_upsert_rag_chunks(self, records: List[Tuple[str, str, str, str, List[str], str]]) -> int:
+        """COPY (chunk_id, document_id, content, chunk_summary, keywords, metadata) rows into a
+        staging table, then merge them into rag_chunks with one INSERT ... ON CONFLICT."""
+        if not records:
+            return 0
+
+        # ON CONFLICT cannot touch the same row twice in one statement; keep the last copy.
+        deduped = list({record[0]: record for record in records}.values())
+
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE rag_chunks_stage (
+                        chunk_id TEXT NOT NULL,
+                        document_id TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        chunk_summary TEXT NOT NULL,
+                        keywords TEXT[] NOT NULL,
+                        metadata TEXT NOT NULL
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table(
+                    "rag_chunks_stage",
+                    records=deduped,
+                    columns=["chunk_id", "document_id", "content", "chunk_summary", "keywords", "metadata"],
+                )
+                result = await conn.execute(
+                    """
+                    INSERT INTO rag_chunks (chunk_id, document_id, content, chunk_summary, keywords, metadata)
+                    SELECT chunk_id, document_id, content, chunk_summary, keywords, metadata
+                    FROM rag_chunks_stage
+                    ON CONFLICT (chunk_id) DO UPDATE
+                    SET content = EXCLUDED.content,
+                        chunk_summary = EXCLUDED.chunk_summary,
+                        keywords = EXCLUDED.keywords,
+                        metadata = EXCLUDED.metadata
+                    """
+                )
+        return self._command_count(result)
+
+    async def get_rag_chunks_by_ids(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        if not chunk_ids:
+            return []
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT chunk_id, document_id, content, chunk_summary, keywords, metadata, created_at
+                FROM rag_chunks
+                WHERE chunk_id = ANY($1::text[])
+                """,
+                list(chunk_ids),
+            )
+        result = []
+        for row in rows:
+            item = dict(row)
+            if item.get("created_at"):
+                item["created_at"] = item["created_at"].isoformat()
+            result.append(item)
+        return result
+
+    # Fusion weights for search_similar_chunks; each component score lies in [0, 1].
+    CHUNK_TEXT_WEIGHT = 0.5
+    CHUNK_TRIGRAM_WEIGHT = 0.3
+    CHUNK_KEYWORD_WEIGHT = 0.2
+    CHUNK_QUERY_MAX_TERMS = 16
+
+    @classmethod
+    def _chunk_query_terms(cls, search_text: str) -> Tuple[str, List[str]]:
+        """Split a query into an OR tsquery string and the keyword array to overlap with."""
+        terms: List[str] = []
+        for term in re.findall(r"\w+", (search_text or "").lower()):
+            if len(term) >= 2 and term not in terms:
+                terms.append(term)
+            if len(terms) >= cls.CHUNK_QUERY_MAX_TERMS:
+                break
+
+        tsquery = " | ".join(f"'{term}'" for term in terms)
+        # Index keywords are short lowercase phrases, so adjacent pairs can match them too.
+        keywords = terms + [f"{first} {second}" for first, second in zip(terms, terms[1:])]
+        return tsquery, keywords
+
+    async def search_similar_chunks(
+        self,
+        search_text: str,
+        limit: int = 5,
+        document_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rank chunks by full-text rank, trigram similarity and keyword overlap in one query.
+
+        With document_id the search is scoped to that document first, so top-k is always
+        drawn from it; without one only chunks matching at least one signal are considered.
+        """
         pool = await self._ensure_pool()
         safe_limit = max(1, min(limit, 50))
+        tsquery, keywords = self._chunk_query_terms(search_text)
+        if not tsquery and not document_id:
+            return []
+
         async with pool.acquire() as conn:
             rows = await conn.fetch(
                 """
+                WITH q AS (SELECT to_tsquery('simple', $2) AS tsq)
                 SELECT chunk_id, document_id, content, chunk_summary, keywords, metadata, created_at,
-                       (chunk_summary <-> $1) AS summary_distance
-                FROM rag_chunks
-                WHERE chunk_summary % $1 OR $2::text[] && keywords
-                ORDER BY summary_distance ASC
-                LIMIT $3
+                       text_score, trigram_score, keyword_score,
+                       $5::float8 * text_score + $6::float8 * trigram_score + $7::float8 * keyword_score AS score
+                FROM (
+                    SELECT c.chunk_id, c.document_id, c.content, c.chunk_summary, c.keywords, c.metadata, c.created_at,
+                           ts_rank_cd(c.search_tsv, q.tsq, 32) AS text_score,
+                           word_similarity($3, c.chunk_summary) AS trigram_score,
+                           (
+                               SELECT count(*) FROM unnest(c.keywords) AS k WHERE lower(k) = ANY($4::text[])
+                           )::float8 / greatest(cardinality($4::text[]), 1) AS keyword_score
+                    FROM rag_chunks c, q
+                    WHERE ($1::text IS NULL OR c.document_id = $1)
+                      AND (
+                          $1::text IS NOT NULL
+                          OR c.search_tsv @@ q.tsq
+                          OR $3 <% c.chunk_summary
+                          OR c.keywords && $4::text[]
+                      )
+                ) scored
+                ORDER BY score DESC, chunk_id ASC
+                LIMIT $8
                 """,
+                document_id,
+                tsquery,
                 search_text,
-                [search_text],
+                keywords,
+                self.CHUNK_TEXT_WEIGHT,
+                self.CHUNK_TRIGRAM_WEIGHT,
+                self.CHUNK_KEYWORD_WEIGHT,
                 safe_limit,
             )
         result = []
@@ -4,6 +4,7 @@ import json
 import os
 import random
 import re
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -17,6 +18,7 @@ from src.database.repository import DatabaseRepository
 from src.managers.cleanup_manager import CleanupManager
 from src.services.health_checker import get_health_checker
 from src.services.redis_service import RedisStreamService, RedisStreamConsumer
+from src.tools.helpers import TextProcessor
 from src.voice.voice_lock import VoiceLockManager
 
 # Import Slash Commands Registration
@@ -26,6 +28,11 @@ from src.handlers.discord.commands import register_slash_commands
 class BotCore:
     """Core bot initialization and event handling for Redis Streams-based architecture."""
 
+    # Actions delivered in order through the per-user sender queue.
+    QUEUED_REPLY_ACTIONS = ("reply", "reply_batch", "reply_stream")
+    STREAM_CURSOR = " ▌"
+    STREAM_STATE_TTL = timedelta(minutes=15)
+
     def __init__(self, config: Config):
         self.config = config
         self.logger = logger
@@ -267,6 +274,13 @@ class BotCore:
             if normalized_content in valid_yes:
                 self.confirmation_pending.pop(user_id, None)
                 await self.db_repo.clear_user_data_db(user_id)
+                try:
+                    # Shared documents survive until their last reference goes; only orphans are deleted.
+                    orphaned = await self.db_repo.release_user_rag_documents(user_id)
+                    for document_id in orphaned:
+                        await asyncio.to_thread(self.cleanup_mgr.evict_document, document_id)
+                except Exception as doc_err:
+                    self.logger.error(f"Failed to release documents of user {user_id}: {doc_err}")
                 try:
                     await self.kafka_service.publish(
                         "discord-incoming",
@@ -437,7 +451,7 @@ class BotCore:
         if not action:
             return
 
-        if action in ("reply", "reply_batch"):
+        if action in self.QUEUED_REPLY_ACTIONS:
             queue = self._get_outgoing_queue(user_id)
             await queue.put(payload)
             self._ensure_sender_task(user_id)
@@ -538,7 +552,7 @@ class BotCore:
 
     async def _process_outgoing_payload(self, payload: dict) -> None:
         action = payload.get("action")
-        if action not in ("reply", "reply_batch"):
+        if action not in self.QUEUED_REPLY_ACTIONS:
             return
 
         entry_id_str = payload.pop('_consumer_entry_id', None)
@@ -546,6 +560,8 @@ class BotCore:
         try:
             if action == "reply_batch":
                 await self._process_reply_batch(payload)
+            elif action == "reply_stream":
+                await self._process_reply_stream(payload)
             else:
                 await self._process_reply(payload)
         except Exception:
@@ -699,6 +715,151 @@ class BotCore:
         if int(state.get("last_index", -1)) >= chunk_total - 1:
             self._delivery_state.pop(reply_group_id, None)
 
+    def _prune_stream_states(self) -> None:
+        """Drop streams whose final event never arrived (worker crashed mid-reply)."""
+        cutoff = datetime.utcnow() - self.STREAM_STATE_TTL
+        stale = [
+            group_id
+            for group_id, state in self._delivery_state.items()
+            if state.get("stream") and state.get("created_at", cutoff) <= cutoff
+        ]
+        for group_id in stale:
+            state = self._delivery_state.pop(group_id, None) or {}
+            user_id = state.get("user_id")
+            # The final event would have released the busy lock; do it here unless the same
+            # user already has a newer stream in flight.
+            if user_id and not any(
+                other.get("stream") and other.get("user_id") == user_id
+                for other in self._delivery_state.values()
+            ):
+                self._cancel_typing_task(user_id)
+
+    async def _process_reply_stream(self, payload: dict) -> None:
+        """Render cumulative streamed text as progressive edits, one message per 1800-char chunk."""
+        channel_id_str = payload.get("channel_id")
+        user_id = payload.get("user_id") or "unknown"
+        if not channel_id_str:
+            return
+
+        self._prune_stream_states()
+        reply_group_id = str(payload.get("reply_group_id") or payload.get("reference_message_id") or "unknown")
+        seq = int(payload.get("seq") or 0)
+        done = bool(payload.get("done"))
+
+        state = self._delivery_state.setdefault(
+            reply_group_id,
+            {
+                "stream": True,
+                "messages": [],
+                "contents": [],
+                "seq": 0,
+                "last_edit": 0.0,
+                "created_at": datetime.utcnow(),
+                "user_id": user_id,
+            },
+        )
+        try:
+            await self._render_reply_stream(payload, state, reply_group_id, channel_id_str, user_id, seq, done)
+        finally:
+            # Typing and the busy lock last for the whole generation, not just the first chunk.
+            if done:
+                self._cancel_typing_task(user_id)
+
+    async def _render_reply_stream(
+        self,
+        payload: dict,
+        state: Dict[str, Any],
+        reply_group_id: str,
+        channel_id_str: str,
+        user_id: str,
+        seq: int,
+        done: bool,
+    ) -> None:
+        # Events carry the whole text so far, so older or duplicate ones add nothing.
+        if seq <= int(state.get("seq", 0)):
+            return
+        state["seq"] = seq
+
+        # Intermediate events that arrive faster than the edit budget are skipped; the
+        # next one (or the final event) carries their text anyway.
+        edit_interval = self.config.STREAM_EDIT_INTERVAL_MS / 1000.0
+        if not done and time.monotonic() - float(state.get("last_edit", 0.0)) < edit_interval:
+            return
+
+        channel_id = int(channel_id_str)
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            channel = await self.bot.fetch_channel(channel_id)
+        if not channel:
+            return
+
+        allow_user_mentions = payload.get("allow_user_mentions") or []
+        ref_id_str = payload.get("reference_message_id")
+        reference = None
+        if ref_id_str:
+            reference = discord.MessageReference(
+                message_id=int(ref_id_str),
+                channel_id=channel_id,
+                fail_if_not_exists=False,
+            )
+
+        messages: List[discord.Message] = state["messages"]
+        contents: List[str] = state["contents"]
+        chunks = TextProcessor.split_message_text(payload.get("text") or "")
+
+        for idx, chunk in enumerate(chunks):
+            content = await self._sanitize_mentions(chunk, channel, allow_user_mentions)  # type: ignore[arg-type]
+            if not done and idx == len(chunks) - 1:
+                content = f"{content}{self.STREAM_CURSOR}"
+
+            if idx < len(messages):
+                if contents[idx] == content:
+                    continue
+                edited = await self._edit_message_with_retry(
+                    messages[idx],
+                    content=content,
+                    label="reply_stream_edit",
+                )
+                if edited:
+                    contents[idx] = content
+                elif done:
+                    fallback = await self._send_message_with_retry(
+                        channel,  # type: ignore[arg-type]
+                        content=content,
+                        reference=None,
+                        mention_author=False,
+                        label="reply_stream_edit_fallback",
+                    )
+                    if fallback:
+                        messages[idx] = fallback
+                        contents[idx] = content
+                continue
+
+            # Rolled past the split boundary: the previous message is final, start a new one.
+            sent_message = await self._send_message_with_retry(
+                channel,  # type: ignore[arg-type]
+                content=content,
+                reference=reference if idx == 0 else None,
+                mention_author=False,
+                label="reply_stream",
+            )
+            if not sent_message:
+                break
+            messages.append(sent_message)
+            contents.append(content)
+
+        if not done:
+            state["last_edit"] = time.monotonic()
+            return
+
+        # A retried generation can end shorter than an earlier draft; remove leftover messages.
+        for extra in messages[len(chunks):]:
+            try:
+                await extra.delete()
+            except Exception as e:
+                self.logger.warning(f"Failed to delete stale reply_stream message: {e}")
+        self._delivery_state.pop(reply_group_id, None)
+
     async def _send_message_with_retry(
         self,
         channel: discord.abc.Messageable,
@@ -1,5 +1,6 @@
 import os
 import re
+import time
 import uuid
 import json
 import asyncio
@@ -8,11 +9,12 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 
 from src.core.config import logger, Config
-from src.services.redis_service import RedisStreamService, RedisStreamConsumer, _RedisMsg
+from src.services.redis_service import RedisStreamService, RedisStreamConsumer, RedisStreamListener, _RedisMsg
 from src.database.repository import DatabaseRepository
 from src.core.api_router import get_api_router
 from src.core.gemini_api_manager import GeminiApiManager
 from src.core.gemini_pipeline import GeminiPipeline
+from src.core.http_client import get_http_client
 from src.core.api_config import (
     DEFAULT_REASONING_MODEL_ALIAS,
     DEFAULT_FINAL_MODEL_ALIAS,
@@ -20,15 +22,19 @@ from src.core.api_config import (
     VISION_MODEL_ALIAS,
 )
 from src.tools.tools import ToolsManager
+from src.tools.helpers import TextProcessor
 from src.managers.note_manager import NoteManager
 from src.managers.premium_manager import PremiumManager
 from src.managers.cache_manager import get_cache_manager
 from src.services.file_parser import FileParserService
+from src.services.pdf_extractor import get_pdf_extractor
 from src.services.file_index_service import (
     FileIndexService,
     should_use_last_index,
     build_index_context,
+    build_preview_context,
 )
+from src.services.rag_index_worker import RAG_INDEX_STREAM, RAG_INDEX_EVENTS_STREAM
 from src.services.search_subtask_client import SearchSubtaskClient
 from src.managers.cleanup_manager import CleanupManager
 from src.core.prompt_loader import build_identity_capability_prompt
@@ -67,6 +73,7 @@ class MessageHandler:
         self.file_chunk_dir = self.config.FILE_CHUNK_DIR
         self._image_download_sem = asyncio.Semaphore(3)
         self._incoming_consumer: Optional[RedisStreamConsumer] = None
+        self._index_events_task: Optional[asyncio.Task] = None
 
 
     async def _publish_outgoing(self, payload: Dict[str, Any], user_id: Optional[str]) -> bool:
@@ -76,14 +83,38 @@ class MessageHandler:
             raise RuntimeError(f"Failed to publish outgoing Redis payload action={action} user={user_id}")
         return ok
 
+    async def _publish_reply_stream(
+        self,
+        stream_state: Dict[str, Any],
+        payload: Dict[str, Any],
+        user_id: str,
+        text: str,
+        done: bool,
+    ) -> None:
+        """Publish the cumulative final-output text as one reply_stream event."""
+        if stream_state["allowed_mentions"] is None:
+            stream_state["allowed_mentions"] = self.tools_mgr.pop_allowed_mentions(user_id)
+        stream_state["seq"] += 1
+        stream_state["last_publish"] = time.monotonic()
+        stream_state["text"] = text
+        await self._publish_outgoing({
+            "action": "reply_stream",
+            "reply_group_id": stream_state["reply_group_id"],
+            "seq": stream_state["seq"],
+            "channel_id": payload.get('channel_id'),
+            "user_id": user_id,
+            "text": text,
+            "done": done,
+            "allow_user_mentions": stream_state["allowed_mentions"],
+            "reference_message_id": payload.get('message_id'),
+            "created_at": datetime.utcnow().isoformat(),
+        }, user_id)
+
     async def _download_file(self, url: str) -> Optional[bytes]:
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                timeout_obj = aiohttp.ClientTimeout(total=15)
-                async with session.get(url, timeout=timeout_obj) as response:
-                    if response.status == 200:
-                        return await response.read()
+            result = await get_http_client().fetch(url, timeout=15)
+            if result.status == 200:
+                return result.body
         except Exception as e:
             self.logger.error(f"Failed to download attachment: {e}")
         return None
@@ -113,6 +144,7 @@ class MessageHandler:
                 api_log_exception_fn=self.api_mgr._log_gemini_exception,
                 reasoning_model_alias=self.pipeline.reasoning_model_alias,
                 final_model_alias=self.pipeline.final_model_alias,
+                api_quota_headroom_fn=self.api_mgr.api_router.get_quota_headroom,
             )
         return self._file_index_svc
 
@@ -248,24 +280,7 @@ class MessageHandler:
         return "\n".join(lines)
 
     def _split_text(self, text: str, limit: int = 1800) -> List[str]:
-        chunks = []
-        current_text = text.strip()
-
-        while len(current_text) > limit:
-            split_idx = current_text.rfind('\n', 0, limit)
-            if split_idx == -1:
-                split_idx = current_text.rfind(' ', 0, limit)
-            if split_idx == -1 or split_idx <= 0:
-                split_idx = limit
-
-            chunk = current_text[:split_idx].strip()
-            if chunk:
-                chunks.append(chunk)
-            current_text = current_text[split_idx:].strip()
-
-        if current_text:
-            chunks.append(current_text)
-        return chunks
+        return TextProcessor.split_message_text(text, limit=limit)
 
     async def start_worker(self):
         """Start the Redis Streams consumer and listen for incoming messages."""
@@ -286,6 +301,19 @@ class MessageHandler:
         if reclaimed:
             self.logger.info(f"Reclaimed {len(reclaimed)} pending messages from dead consumers on startup")
 
+        if self.config.RAG_INDEX_BACKGROUND:
+            try:
+                # Plain XREAD fan-out: every chat worker must learn about every finished index,
+                # and a group per process would be left behind in Redis on every restart.
+                events_listener = await self.kafka_service.start_listener(RAG_INDEX_EVENTS_STREAM)
+                self._index_events_task = asyncio.create_task(self._listen_index_events(events_listener))
+            except Exception as e:
+                self.logger.error(f"Failed to subscribe to {RAG_INDEX_EVENTS_STREAM}: {e}")
+
+        if not self.tools_mgr.search_subtasks_enabled:
+            # Deep-read runs in this process, so start the HTML extraction workers up front.
+            self.tools_mgr.search_engine.html_extractor.warm()
+
         self.logger.info("Worker started. Listening for messages...")
 
         try:
@@ -299,11 +327,116 @@ class MessageHandler:
         finally:
             await self.shutdown()
 
+    async def _listen_index_events(self, listener: RedisStreamListener) -> None:
+        try:
+            async for msg in listener:
+                event = msg.value or {}
+                stage = event.get("stage")
+                user_id = str(event.get("user_id") or "")
+                document_id = str(event.get("document_id") or "")
+                if stage == "progress":
+                    self.logger.info(
+                        f"[RAG-INDEX] doc={document_id} user={user_id} "
+                        f"{event.get('chunks_done')}/{event.get('chunks_total')} chunks"
+                    )
+                elif stage == "done" and user_id and document_id:
+                    self.logger.info(
+                        f"[RAG-INDEX] doc={document_id} user={user_id} done status={event.get('status')} "
+                        f"chunks={event.get('chunk_count')} elapsed_ms={event.get('elapsed_ms')}"
+                    )
+                    if event.get("status") != "block":
+                        # The index worker already wrote rag_documents; just refresh the front cache.
+                        self.file_index_svc.cache_latest_index(user_id, {
+                            "document_id": document_id,
+                            "user_id": user_id,
+                            "filename": str(event.get("filename") or ""),
+                            "chunk_count": int(event.get("chunk_count") or 0),
+                            "byte_size": int(event.get("byte_size") or 0),
+                            "last_accessed_at": event.get("created_at"),
+                        })
+                elif stage == "failed":
+                    self.logger.warning(f"[RAG-INDEX] doc={document_id} user={user_id} failed: {event.get('error')}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"RAG index event listener error: {e}")
+
+    async def _enqueue_file_index(
+        self,
+        file_meta: Dict[str, Any],
+        doc_id: str,
+        user_id: str,
+        payload: Dict[str, Any],
+    ) -> bool:
+        job = {
+            "type": "rag_index_job",
+            "document_id": doc_id,
+            "user_id": user_id,
+            "filename": file_meta.get("filename"),
+            "file_meta": file_meta,
+            "channel_id": payload.get("channel_id"),
+            "reference_message_id": payload.get("message_id"),
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        return await self.kafka_service.publish(RAG_INDEX_STREAM, payload=job, key=user_id)
+
+    async def _index_file_inline(self, file_meta: Dict[str, Any], doc_id: str, user_id: str, content: str) -> str:
+        index_data = await self.file_index_svc.build_file_index(
+            file_meta=file_meta,
+            document_id=doc_id,
+            user_id=user_id,
+        )
+        validation = await self.file_index_svc.validate_file_index(index_data, user_id)
+
+        if validation.get("status") == "block":
+            return f"\n[System Note: Blocked index: {validation.get('reason')}]\n"
+        await self.file_index_svc.register_indexed_content(
+            file_meta.get("content_sha256", ""),
+            doc_id,
+            chunk_count=index_data.get("chunk_count", 0),
+            byte_size=file_meta.get("file_size", 0),
+        )
+        await self.file_index_svc.set_latest_index(
+            user_id,
+            doc_id,
+            file_meta.get("filename"),
+            chunk_count=index_data.get("chunk_count", 0),
+            byte_size=file_meta.get("file_size", 0),
+            content_sha256=file_meta.get("content_sha256", ""),
+        )
+        return await build_index_context(
+            doc_id, content, db_repo=self.db_repo, file_parser=self.file_parser
+        )
+
+    async def _attach_reused_document(self, file_meta: Dict[str, Any], user_id: str, content: str) -> str:
+        reused = file_meta["reused_document"]
+        doc_id = str(reused["document_id"])
+        await self.file_index_svc.set_latest_index(
+            user_id,
+            doc_id,
+            file_meta.get("filename"),
+            chunk_count=reused.get("chunk_count", 0),
+            byte_size=file_meta.get("file_size", 0),
+            content_sha256=file_meta.get("content_sha256", ""),
+        )
+        return await build_index_context(
+            doc_id, content, db_repo=self.db_repo, file_parser=self.file_parser
+        )
+
     async def shutdown(self):
+        if self._index_events_task and not self._index_events_task.done():
+            self._index_events_task.cancel()
+            try:
+                await self._index_events_task
+            except asyncio.CancelledError:
+                pass
         try:
             await self.search_subtask_client.close()
         except Exception:
             pass
+        self.tools_mgr.search_engine.html_extractor.shutdown()
+        await self.tools_mgr.search_engine.shared_search_cache.close()
+        get_pdf_extractor().shutdown()
         await self.kafka_service.stop()
 
         try:
@@ -321,6 +454,7 @@ class MessageHandler:
         if msg_type == "invalidate_cache":
             if user_id:
                 self.cache_mgr.invalidate_chat_history(user_id)
+                self.file_index_svc.latest_index_cache.pop(user_id)
                 self.logger.info(f"[CACHE] Invalidated chat history cache for user {user_id} via Redis event.")
             if self._incoming_consumer:
                 await self._incoming_consumer.ack(msg)
@@ -349,14 +483,42 @@ class MessageHandler:
         content = payload.get('content', '').strip()
         self.logger.info(f"[REDIS-RECV] Consumed message from 'discord-incoming' | User: {user_id} | MsgID: {payload.get('message_id')} | Content Length: {len(content)}")
 
+        stream_state: Dict[str, Any] = {
+            "reply_group_id": str(uuid.uuid4()),
+            "seq": 0,
+            "last_publish": 0.0,
+            "text": "",
+            "allowed_mentions": None,
+        }
+        publish_interval = self.config.STREAM_PUBLISH_INTERVAL_MS / 1000.0
+
+        async def publish_partial(text: str) -> None:
+            # First partial goes out immediately; later ones are throttled, BotCore edits at its own pace.
+            if stream_state["seq"] and time.monotonic() - stream_state["last_publish"] < publish_interval:
+                return
+            await self._publish_reply_stream(stream_state, payload, user_id, text, done=False)
+
         try:
-            is_admin = await self.premium_mgr.is_admin_user(user_id)
-            is_moderator = await self.premium_mgr.is_moderator_user(user_id)
-            is_premium = await self.premium_mgr.is_premium_user(user_id)
+            # 0. Load roles, quota, privacy flags, identity and history in one DB round trip.
+            # History is only fetched when the RAM cache cannot serve it.
+            cached_history = self.cache_mgr.get_chat_history(user_id, limit=12)
+            turn_ctx = await self.db_repo.load_turn_context(
+                user_id,
+                history_limit=0 if cached_history is not None else 12,
+            )
+            timings = turn_ctx["timings_ms"]
+            self.logger.info(
+                f"[TURN-CTX] user={user_id} acquire={timings['acquire']}ms query={timings['query']}ms "
+                f"decode={timings['decode']}ms total={timings['total']}ms"
+            )
+
+            is_admin = user_id in self.config.ADMIN_USER_IDS or turn_ctx["is_admin"]
+            is_moderator = user_id in self.config.MODERATOR_USER_IDS or turn_ctx["is_moderator"]
+            is_premium = turn_ctx["is_premium"]
 
             # 1. Daily Limit Validation for Free Tier users
             if not is_admin and not is_moderator and not is_premium:
-                daily_count = await self.db_repo.count_user_messages_today_db(user_id)
+                daily_count = turn_ctx["daily_count"]
                 if daily_count >= 50:
                     await self._publish_outgoing({
                         "action": "reply",
@@ -425,25 +587,30 @@ class MessageHandler:
                             size=int(att.get("size") or 10 * 1024 * 1024),
                             base_name=doc_id,
                             chunk_dir=os.path.join(self.file_chunk_dir, doc_id),
+                            reuse_lookup=lambda sha: self.file_index_svc.find_reusable_document(sha, self.file_chunk_dir),
                         )
                         if not file_meta or file_meta.get("error"):
                             attachment_data += f"\n[System Error: Lỗi file {att.get('filename')}]\n"
                             continue
 
-                        index_data = await self.file_index_svc.build_file_index(
-                            file_meta=file_meta,
-                            document_id=doc_id,
-                            user_id=user_id,
-                        )
-                        validation = await self.file_index_svc.validate_file_index(index_data, user_id)
-                        self.file_index_svc.set_latest_index(user_id, doc_id, att.get("filename"))
+                        # Identical bytes were indexed before (by anyone): no chunking, no LLM calls.
+                        if file_meta.get("reused_document"):
+                            attachment_data += await self._attach_reused_document(file_meta, user_id, content)
+                            continue
 
-                        if validation.get("status") == "block":
-                            attachment_data += f"\n[System Note: Blocked index: {validation.get('reason')}]\n"
-                        else:
-                            attachment_data += await build_index_context(
-                                doc_id, content, db_repo=self.db_repo, file_parser=self.file_parser
+                        # Large uploads index in the background; this turn answers from a preview.
+                        queued = False
+                        if self.config.RAG_INDEX_BACKGROUND:
+                            queued = await self._enqueue_file_index(file_meta, doc_id, user_id, payload)
+                        if queued:
+                            attachment_data += await build_preview_context(
+                                file_meta,
+                                doc_id,
+                                file_parser=self.file_parser,
+                                preview_chunks=self.config.RAG_INDEX_PREVIEW_CHUNKS,
                             )
+                        else:
+                            attachment_data += await self._index_file_inline(file_meta, doc_id, user_id, content)
                     except Exception as e:
                         self.logger.error(f"Error indexing: {e}")
                         attachment_data += f"\n[System Error: Không thể index file {att.get('filename')}]\n"
@@ -467,7 +634,7 @@ class MessageHandler:
 
             # 4. Reroute last RAG index if keyword matches
             if not attachments and should_use_last_index(content):
-                last_index = self.file_index_svc.get_latest_index_for_user(user_id)
+                last_index = await self.file_index_svc.get_latest_index_for_user(user_id)
                 if last_index and last_index.get("document_id"):
                     attachment_data += await build_index_context(
                         last_index["document_id"], content, db_repo=self.db_repo, file_parser=self.file_parser
@@ -490,9 +657,9 @@ class MessageHandler:
             await self.db_repo.log_message_db(user_id, "user", user_message)
             self.cache_mgr.add_chat_message(user_id, "user", user_message)
 
-            distinct_user_count = await self.db_repo.count_distinct_message_users_db()
-            has_other_users = await self.db_repo.has_other_users_history_db(user_id)
-            user_identity = await self.note_mgr.get_user_identity(user_id)
+            distinct_user_count = turn_ctx["distinct_user_count"]
+            has_other_users = turn_ctx["has_other_users"]
+            user_identity = self.note_mgr.format_user_identity(turn_ctx["identity_notes"])
 
             admin_cross_user_evidence = ""
             if is_admin:
@@ -514,8 +681,11 @@ class MessageHandler:
             # Tận dụng In-memory KV Cache từ RAM
             history = self.cache_mgr.get_chat_history(user_id, limit=12)
             if history is None:
-                # Cache miss: query PostgreSQL
-                history = await self.db_repo.get_user_history_from_db(user_id, limit=12)
+                # Cache miss: reuse the history loaded with the turn context (plus the message just logged)
+                if cached_history is None:
+                    history = (turn_ctx["history"] + [{"role": "user", "content": user_message}])[-12:]
+                else:
+                    history = await self.db_repo.get_user_history_from_db(user_id, limit=12)
                 self.cache_mgr.set_chat_history(user_id, history)
                 self.logger.info(f"[CACHE MISS] Loaded chat history for user {user_id} from PostgreSQL.")
             else:
@@ -533,15 +703,27 @@ class MessageHandler:
             messages.append({"role": "user", "parts": user_parts})
 
             await self._refresh_pipeline_model_aliases(force_vision_model=bool(downloaded_images))
-            response_text = await self.pipeline.call_gemini_api(messages, user_id, privacy_context)
+            response_text = await self.pipeline.call_gemini_api(
+                messages, user_id, privacy_context, on_partial=publish_partial
+            )
 
             # 8. Log reply and Split response chunks sequentially
             await self.db_repo.log_message_db(user_id, "assistant", response_text)
             self.cache_mgr.add_chat_message(user_id, "assistant", response_text)
 
+            if stream_state["seq"]:
+                # Partial text is already on screen; the final event carries the complete reply.
+                await self._publish_reply_stream(stream_state, payload, user_id, response_text, done=True)
+                self.logger.info(
+                    f"Published final reply_stream event (seq={stream_state['seq']}, {len(response_text)} chars) for user {user_id}"
+                )
+                if self._incoming_consumer:
+                    await self._incoming_consumer.ack(msg)
+                return
+
             allowed_mentions = self.tools_mgr.pop_allowed_mentions(user_id)
             chunks = self._split_text(response_text)
-            reply_group_id = str(uuid.uuid4())
+            reply_group_id = stream_state["reply_group_id"]
             chunk_items = [{"index": idx, "content": chunk} for idx, chunk in enumerate(chunks)]
             reply_payload = {
                 "action": "reply_batch",
@@ -564,6 +746,12 @@ class MessageHandler:
 
         except Exception as e:
             self.logger.error(f"Error processing message for {user_id}: {e}")
+            if stream_state["seq"]:
+                # Close the open stream so BotCore stops editing and drops its state.
+                try:
+                    await self._publish_reply_stream(stream_state, payload, user_id, stream_state["text"], done=True)
+                except Exception:
+                    pass
             try:
                 await self._publish_outgoing({
                     "action": "reply",
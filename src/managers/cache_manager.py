@@ -1,6 +1,7 @@
-import time
 from typing import Dict, Any, Optional, List
 
+from src.core.ttl_cache import TTLCache
+
 
 class CacheManager:
     """Manager for caching search, image recognition results, and user chat history."""
@@ -9,95 +10,73 @@ class CacheManager:
     CHAT_CACHE_TTL_SECONDS = 300  # 5 minutes for chat history cache
     MAX_CACHE_SIZE = 1000
     MAX_CHAT_HISTORY_LIMIT = 50  # Max messages kept in RAM for 1 user
+    WEB_SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    IMAGE_RECOGNITION_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    CHAT_HISTORY_CACHE_MAX_BYTES = 128 * 1024 * 1024
 
     def __init__(self):
-        self.web_search_cache: Dict[str, Dict[str, Any]] = {}
-        self.image_recognition_cache: Dict[str, Dict[str, Any]] = {}
-        self.chat_history_cache: Dict[str, Dict[str, Any]] = {}
+        self.web_search_cache = TTLCache(
+            "cache_manager.web_search",
+            max_entries=self.MAX_CACHE_SIZE,
+            default_ttl_seconds=self.CACHE_TTL_SECONDS,
+            max_bytes=self.WEB_SEARCH_CACHE_MAX_BYTES,
+        )
+        self.image_recognition_cache = TTLCache(
+            "cache_manager.image_recognition",
+            max_entries=self.MAX_CACHE_SIZE,
+            default_ttl_seconds=self.CACHE_TTL_SECONDS,
+            max_bytes=self.IMAGE_RECOGNITION_CACHE_MAX_BYTES,
+        )
+        # Chat history TTL slides on every read/append, matching the old LRU refresh.
+        self.chat_history_cache = TTLCache(
+            "cache_manager.chat_history",
+            max_entries=self.MAX_CACHE_SIZE,
+            default_ttl_seconds=self.CHAT_CACHE_TTL_SECONDS,
+            max_bytes=self.CHAT_HISTORY_CACHE_MAX_BYTES,
+            sliding_ttl=True,
+        )
 
     def get_web_search_cache(self, query: str) -> Optional[str]:
         """Get cached web search result if valid."""
-        if query in self.web_search_cache:
-            cached_item = self.web_search_cache[query]
-            if time.time() - cached_item['timestamp'] < self.CACHE_TTL_SECONDS:
-                return cached_item['data']
-            else:
-                del self.web_search_cache[query]
-        return None
+        return self.web_search_cache.get(query)
     
     def set_web_search_cache(self, query: str, data: str) -> None:
         """Save web search result to cache."""
-        if len(self.web_search_cache) >= self.MAX_CACHE_SIZE:
-            oldest_key = min(self.web_search_cache, key=lambda k: self.web_search_cache[k]['timestamp'])
-            del self.web_search_cache[oldest_key]
-        self.web_search_cache[query] = {'data': data, 'timestamp': time.time()}
+        self.web_search_cache.set(query, data)
     
     def get_image_recognition_cache(self, image_url: str, question: str) -> Optional[str]:
         """Get cached image recognition result if valid."""
-        key = f"{image_url}|{question}"
-        if key in self.image_recognition_cache:
-            cached_item = self.image_recognition_cache[key]
-            if time.time() - cached_item['timestamp'] < self.CACHE_TTL_SECONDS:
-                return cached_item['data']
-            else:
-                del self.image_recognition_cache[key]
-        return None
+        return self.image_recognition_cache.get(f"{image_url}|{question}")
     
     def set_image_recognition_cache(self, image_url: str, question: str, data: str) -> None:
         """Save image recognition result to cache."""
-        key = f"{image_url}|{question}"
-        if len(self.image_recognition_cache) >= self.MAX_CACHE_SIZE:
-            oldest_key = min(self.image_recognition_cache, key=lambda k: self.image_recognition_cache[k]['timestamp'])
-            del self.image_recognition_cache[oldest_key]
-        self.image_recognition_cache[key] = {'data': data, 'timestamp': time.time()}
+        self.image_recognition_cache.set(f"{image_url}|{question}", data)
     
     def get_chat_history(self, user_id: str, limit: int) -> Optional[List[Dict[str, str]]]:
         """Get cached chat history for a user if valid and within TTL."""
-        if user_id in self.chat_history_cache:
-            cached_item = self.chat_history_cache[user_id]
-            if time.time() - cached_item['timestamp'] < self.CHAT_CACHE_TTL_SECONDS:
-                # Update timestamp to refresh TTL and LRU status
-                cached_item['timestamp'] = time.time()
-                history = cached_item['history']
-                return history[-limit:]
-            else:
-                del self.chat_history_cache[user_id]
-        return None
+        history = self.chat_history_cache.get(user_id)
+        if history is None:
+            return None
+        return history[-limit:]
 
     def set_chat_history(self, user_id: str, history: List[Dict[str, str]]) -> None:
         """Save a user's chat history to the cache."""
-        if len(self.chat_history_cache) >= self.MAX_CACHE_SIZE:
-            # LRU: remove the oldest item
-            oldest_key = min(self.chat_history_cache, key=lambda k: self.chat_history_cache[k]['timestamp'])
-            del self.chat_history_cache[oldest_key]
-
         # Only store the last MAX_CHAT_HISTORY_LIMIT messages
-        safe_history = list(history[-self.MAX_CHAT_HISTORY_LIMIT:]) if len(history) > self.MAX_CHAT_HISTORY_LIMIT else list(history)
-        self.chat_history_cache[user_id] = {
-            'history': safe_history,
-            'timestamp': time.time()
-        }
+        safe_history = list(history[-self.MAX_CHAT_HISTORY_LIMIT:])
+        self.chat_history_cache.set(user_id, safe_history)
 
     def add_chat_message(self, user_id: str, role: str, content: str) -> None:
         """Append a new message to the user's cached chat history if it exists."""
-        if user_id in self.chat_history_cache:
-            cached_item = self.chat_history_cache[user_id]
-            if time.time() - cached_item['timestamp'] < self.CHAT_CACHE_TTL_SECONDS:
-                history = cached_item['history']
-                history.append({'role': role, 'content': content})
-
-                if len(history) > self.MAX_CHAT_HISTORY_LIMIT:
-                    history = history[-self.MAX_CHAT_HISTORY_LIMIT:]
-
-                cached_item['history'] = history
-                cached_item['timestamp'] = time.time()
-            else:
-                del self.chat_history_cache[user_id]
+        history = self.chat_history_cache.get(user_id)
+        if history is None:
+            return
+        history.append({'role': role, 'content': content})
+        # Re-set so the byte budget accounts for the appended message.
+        self.chat_history_cache.set(user_id, history[-self.MAX_CHAT_HISTORY_LIMIT:])
 
     def invalidate_chat_history(self, user_id: str) -> None:
         """Invalidate the cached chat history for a user."""
-        if user_id in self.chat_history_cache:
-            del self.chat_history_cache[user_id]
+        self.chat_history_cache.pop(user_id)
 
     def clear_all_caches(self) -> None:
         """Clear all caches."""
@@ -105,6 +84,14 @@ class CacheManager:
         self.image_recognition_cache.clear()
         self.chat_history_cache.clear()
 
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/eviction counters for each cache namespace."""
+        return {
+            "web_search": self.web_search_cache.stats(),
+            "image_recognition": self.image_recognition_cache.stats(),
+            "chat_history": self.chat_history_cache.stats(),
+        }
+
 
 # Global Singleton pattern
 _cache_manager_instance: Optional[CacheManager] = None
@@ -1,15 +1,24 @@
 import os
 import asyncio
 import shutil
-from src.core.config import logger, FILE_STORAGE_PATH, MIN_FREE_SPACE_MB
+from typing import List, Tuple
+from src.core.config import logger, FILE_STORAGE_PATH, FILE_CHUNK_DIR, MIN_FREE_SPACE_MB
+from src.services.chunk_store import document_footprint, forget_document
+from src.services.vector_index import get_vector_index
 
 
 class CleanupManager:
     """Manager for cleaning up old files and managing disk space."""
     
-    def __init__(self, storage_path: str = FILE_STORAGE_PATH, min_free_mb: int = MIN_FREE_SPACE_MB):
+    def __init__(
+        self,
+        storage_path: str = FILE_STORAGE_PATH,
+        min_free_mb: int = MIN_FREE_SPACE_MB,
+        chunk_root: str = FILE_CHUNK_DIR,
+    ):
         self.storage_path = storage_path
         self.min_free_mb = min_free_mb
+        self.chunk_root = chunk_root
         self.logger = logger
     
     def get_disk_free_space_mb(self) -> int:
@@ -22,6 +31,52 @@ class CleanupManager:
             self.logger.error(f"Error checking disk free space at {self.storage_path}: {e}")
             return 0
     
+    def _list_documents(self) -> List[Tuple[str, str, int, float]]:
+        """(document_id, chunk dir, bytes, last access) for every packed document, oldest first."""
+        documents = []
+        try:
+            entries = list(os.scandir(self.chunk_root))
+        except FileNotFoundError:
+            return documents
+        for entry in entries:
+            if entry.is_dir():
+                size, last_access = document_footprint(entry.path)
+                documents.append((entry.name, entry.path, size, last_access))
+        documents.sort(key=lambda item: item[3])
+        return documents
+
+    def evict_document(self, document_id: str) -> int:
+        """Delete a document's chunk blob, vector shard and original upload; returns bytes freed."""
+        chunk_dir = os.path.join(self.chunk_root, document_id)
+        freed, _ = document_footprint(chunk_dir)
+        forget_document(chunk_dir)
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+        original = os.path.join(self.storage_path, document_id)
+        if os.path.isfile(original):
+            freed += os.path.getsize(original)
+            os.remove(original)
+
+        vector_index = get_vector_index()
+        if vector_index is not None:
+            vector_index.delete_document(document_id)
+        return freed
+
+    def evict_documents_until_free(self) -> Tuple[int, float]:
+        """Evict whole documents, least recently used first, until free space is back above target."""
+        evicted = 0
+        freed_mb = 0.0
+        for document_id, _, _, _ in self._list_documents():
+            if self.get_disk_free_space_mb() > self.min_free_mb + 50:
+                break
+            try:
+                freed_mb += self.evict_document(document_id) / (1024 * 1024)
+                evicted += 1
+                self.logger.info(f"Evicted indexed document {document_id}")
+            except Exception as e:
+                self.logger.error(f"Error evicting document {document_id}: {e}")
+        return evicted, freed_mb
+
     async def cleanup_local_files(self) -> None:
         """Clean up old local files if disk space is below threshold."""
         try:
@@ -32,6 +87,15 @@ class CleanupManager:
                 return
             
             self.logger.warning(f"Free space: {current_free_space} MB (below {self.min_free_mb} MB). Starting file cleanup...")
+
+            # Whole documents first: one rmtree per document instead of one unlink per chunk.
+            evicted, freed_mb = await asyncio.to_thread(self.evict_documents_until_free)
+            if evicted:
+                self.logger.info(f"Evicted {evicted} indexed documents ({freed_mb:.2f} MB).")
+            current_free_space = self.get_disk_free_space_mb()
+            if current_free_space > self.min_free_mb:
+                self.logger.info(f"Cleanup complete. Free space: {current_free_space} MB")
+                return
             
             files_to_delete = []
             
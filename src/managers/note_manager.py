@@ -85,10 +85,14 @@ class NoteManager:
             limit=10,
             note_type="personal_preference"
         )
-        if not notes:
+        return self.format_user_identity([n.get('content', '') for n in notes])
+
+    @staticmethod
+    def format_user_identity(contents: List[str]) -> str:
+        """Render identity note contents as the bullet list used in the system prompt."""
+        if not contents:
             return ""
-        
-        return "\n".join(f"- {n.get('content', '')}" for n in notes)
+        return "\n".join(f"- {content}" for content in contents)
 
     async def save_note_to_db(self, user_id: str, content: str, source: str) -> str:
         """Save an auto-note to database."""
@@ -0,0 +1,131 @@
+import json
+import mmap
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import logger
+from src.core.ttl_cache import TTLCache
+
+
+__all__ = ["PackedChunkWriter", "read_chunk", "is_packed_locator", "forget_document", "document_footprint"]
+
+BLOB_NAME = "chunks.bin"
+INDEX_NAME = "chunks.idx.json"
+# Worst-case UTF-8 width; lets a bounded read skip decoding the rest of a long chunk.
+MAX_UTF8_BYTES_PER_CHAR = 4
+
+_LOCATOR_RE = re.compile(r"^(?P<path>.+)#(?P<offset>\d+):(?P<length>\d+)$")
+
+# blob path -> read-only mmap. Dropping an entry lets the mapping close once unreferenced.
+_open_blobs = TTLCache(name="chunk_store_mmaps", max_entries=64, default_ttl_seconds=900, sliding_ttl=True, sizeof=lambda _: 0)
+_open_lock = threading.Lock()
+
+
+class PackedChunkWriter:
+    """Single-pass writer: chunks are appended to one blob and addressed by offset/length.
+
+    Each append returns a locator "<blob path>#<offset>:<length>", which the manifest keeps in
+    its chunk_path field, so readers never need the sidecar index. The index is written on
+    close for tooling and for whole-document eviction.
+    """
+
+    def __init__(self, chunk_dir: str):
+        self.chunk_dir = chunk_dir
+        os.makedirs(chunk_dir, exist_ok=True)
+        self.blob_path = os.path.join(chunk_dir, BLOB_NAME)
+        # Written under a temp name and renamed on close, so a reader that still maps an
+        # older blob at this path keeps its inode instead of seeing it truncated.
+        self._tmp_blob_path = f"{self.blob_path}.tmp"
+        self._blob = open(self._tmp_blob_path, "wb")
+        self._offset = 0
+        self._index: Dict[str, List[int]] = {}
+
+    def append(self, chunk_id: str, text: str) -> str:
+        data = text.encode("utf-8")
+        self._blob.write(data)
+        offset = self._offset
+        self._offset += len(data)
+        self._index[chunk_id] = [offset, len(data)]
+        return f"{self.blob_path}#{offset}:{len(data)}"
+
+    def close(self) -> None:
+        if self._blob.closed:
+            return
+        self._blob.close()
+        forget_document(self.chunk_dir)
+        os.replace(self._tmp_blob_path, self.blob_path)
+        index_path = os.path.join(self.chunk_dir, INDEX_NAME)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"blob": BLOB_NAME, "bytes": self._offset, "chunks": self._index}, handle)
+        os.replace(tmp_path, index_path)
+
+    def __enter__(self) -> "PackedChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def is_packed_locator(chunk_path: str) -> bool:
+    return bool(chunk_path) and _LOCATOR_RE.match(chunk_path) is not None
+
+
+def _parse_locator(locator: str) -> Optional[Tuple[str, int, int]]:
+    match = _LOCATOR_RE.match(locator or "")
+    if not match:
+        return None
+    return match.group("path"), int(match.group("offset")), int(match.group("length"))
+
+
+def _get_mmap(blob_path: str) -> Optional[mmap.mmap]:
+    with _open_lock:
+        mapped = _open_blobs.get(blob_path)
+        if mapped is not None:
+            return mapped
+        with open(blob_path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return None
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        _open_blobs.set(blob_path, mapped)
+        return mapped
+
+
+def read_chunk(locator: str, max_chars: int) -> Optional[str]:
+    """Decode up to max_chars (+1, so callers can detect truncation) from a packed locator.
+
+    Returns None when the locator is not a packed one, so callers can fall back to legacy
+    one-file-per-chunk paths that older rows still point at.
+    """
+    parsed = _parse_locator(locator)
+    if parsed is None:
+        return None
+    blob_path, offset, length = parsed
+    mapped = _get_mmap(blob_path)
+    if mapped is None:
+        return ""
+    read_len = min(length, (max_chars + 1) * MAX_UTF8_BYTES_PER_CHAR)
+    return mapped[offset:offset + read_len].decode("utf-8", errors="ignore")[:max_chars + 1]
+
+
+def forget_document(chunk_dir: str) -> None:
+    """Drop the cached mapping for a document's blob before it is rewritten or deleted."""
+    with _open_lock:
+        _open_blobs.pop(os.path.join(chunk_dir, BLOB_NAME))
+
+
+def document_footprint(chunk_dir: str) -> Tuple[int, float]:
+    """(bytes on disk, last access time) for one document directory, without walking chunks."""
+    total = 0
+    last_access = 0.0
+    try:
+        for entry in os.scandir(chunk_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                total += stat.st_size
+                last_access = max(last_access, stat.st_atime, stat.st_mtime)
+    except OSError as e:
+        logger.warning(f"Cannot stat chunk directory {chunk_dir}: {e}")
+    return total, last_access
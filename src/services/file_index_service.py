@@ -2,20 +2,28 @@ import os
 import re
 import json
 import asyncio
+import time
 import unicodedata
 from datetime import datetime
-from typing import Any, Optional, Dict, List, Tuple
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple
 
 from src.core.config import logger, Config
+from src.core.gemini_rate_limiter import PRIORITY_BACKGROUND
+from src.core.ttl_cache import TTLCache
 from src.core.prompt_loader import (
+    get_file_index_batch_prompt,
     get_file_index_reasoning_prompt,
     get_file_index_validation_prompt,
 )
 from src.services.file_parser import FileParserService
+from src.services.vector_index import get_vector_index, reciprocal_rank_fusion
 from src.database.repository import DatabaseRepository
 
 
-__all__ = ["build_index_context", "FileIndexService", "should_use_last_index"]
+__all__ = ["build_index_context", "build_preview_context", "FileIndexService", "should_use_last_index"]
+
+# Called with (chunks_done, chunks_total) as index batches finish.
+IndexProgressCallback = Callable[[int, int], Awaitable[None]]
 
 
 def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
@@ -35,6 +43,47 @@ def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def extract_json_array(text: str) -> Optional[List[Any]]:
+    if not text:
+        return None
+    try:
+        payload = json.loads(text)
+        return payload if isinstance(payload, list) else None
+    except Exception:
+        pass
+    start = text.find("[")
+    end = text.rfind("]")
+    if start == -1 or end == -1 or end <= start:
+        return None
+    try:
+        payload = json.loads(text[start:end + 1])
+        return payload if isinstance(payload, list) else None
+    except Exception:
+        return None
+
+
+def pack_chunk_batches(
+    chunks: List[Dict[str, Any]],
+    max_chars: int,
+    max_chunks: int,
+) -> List[List[Dict[str, Any]]]:
+    """Group consecutive chunks so each LLM request carries at most max_chunks / max_chars."""
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_chars = 0
+    for chunk in chunks:
+        size = len(chunk["text"])
+        if current and (len(current) >= max_chunks or current_chars + size > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(chunk)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
 def normalize_intent_text(text: str) -> str:
     lowered = (text or "").lower()
     no_diacritics = "".join(
@@ -66,10 +115,33 @@ async def build_index_context(
     chunk_limit: int = 3,
     chunk_preview_chars: int = 3800,
 ) -> str:
-    selected = await db_repo.search_similar_chunks(query, limit=chunk_limit)
-    selected = [c for c in selected if c.get("document_id") == document_id] if document_id else selected
+    selected: List[Dict[str, Any]] = []
+    vector_index = get_vector_index() if document_id else None
+    # With a second ranking to fuse, fetch a deeper lexical list so fusion has room to reorder.
+    lexical_limit = chunk_limit * 2 if vector_index else chunk_limit
+    try:
+        selected = await db_repo.search_similar_chunks(query, limit=lexical_limit, document_id=document_id or None)
+    except Exception as e:
+        logger.error(f"Error searching chunks for doc {document_id}: {e}")
 
-    if not selected:
+    if vector_index is not None:
+        try:
+            vector_hits = await asyncio.to_thread(vector_index.search, query, [document_id], chunk_limit * 2)
+            # Document-scoped lexical search returns every chunk; only real matches get a vote.
+            lexical_ids = [str(c["chunk_id"]) for c in selected if (c.get("score") or 0) > 0]
+            vector_ids = [chunk_id for chunk_id, score in vector_hits if score > 0]
+            fused_ids = reciprocal_rank_fusion([lexical_ids, vector_ids])[:chunk_limit]
+            if fused_ids:
+                by_id = {str(c["chunk_id"]): c for c in selected}
+                missing = [chunk_id for chunk_id in fused_ids if chunk_id not in by_id]
+                for row in await db_repo.get_rag_chunks_by_ids(missing):
+                    by_id[str(row["chunk_id"])] = row
+                selected = [by_id[chunk_id] for chunk_id in fused_ids if chunk_id in by_id]
+        except Exception as e:
+            logger.warning(f"Vector search failed for doc {document_id}, using lexical ranking: {e}")
+    selected = selected[:chunk_limit]
+
+    if not selected and document_id:
         try:
             await db_repo.init_db()
             async with db_repo.pool.acquire() as conn:  # type: ignore[union-attr]
@@ -116,11 +188,48 @@ async def build_index_context(
     )
 
 
+async def build_preview_context(
+    file_meta: Dict[str, Any],
+    document_id: str,
+    *,
+    file_parser: FileParserService,
+    preview_chunks: int = 3,
+    chunk_preview_chars: int = 3800,
+) -> str:
+    """Context from the first few raw chunks, used while the full index is still being built."""
+    manifest = [c for c in file_meta.get("chunk_manifest", []) if c.get("chunk_path")]
+    selected = manifest[:max(1, preview_chunks)]
+    texts = await asyncio.gather(*(
+        asyncio.to_thread(file_parser.read_chunk_text, chunk["chunk_path"], max_chars=chunk_preview_chars)
+        for chunk in selected
+    ))
+
+    chunk_blocks = [
+        f"[CHUNK {document_id}:{chunk.get('chunk_id')}]\n{text}"
+        for chunk, text in zip(selected, texts)
+        if text
+    ]
+    chunks_text = "\n\n".join(chunk_blocks) if chunk_blocks else "(no readable chunks)"
+
+    return (
+        f"\n[FILE PREVIEW]\n"
+        f"document_id={document_id} file={file_meta.get('filename')} "
+        f"preview_chunks={len(chunk_blocks)} total_chunks={len(manifest)}\n"
+        f"[SYSTEM NOTE: Only the beginning of the file is shown. The full index is being built in the "
+        f"background; if the answer may be later in the file, say so and ask the user to ask again shortly.]\n"
+        f"[SELECTED CHUNKS]\n{chunks_text}\n"
+    )
+
+
 class FileIndexService:
     INDEX_MAX_OUTPUT_TOKENS = 65000
     INDEX_VALIDATION_MAX_OUTPUT_TOKENS = 1200
     INDEX_QUERY_CHUNK_LIMIT = 3
     INDEX_CHUNK_PREVIEW_CHARS = 3800
+    LATEST_INDEX_CACHE_ENTRIES = 4096
+    LATEST_INDEX_CACHE_TTL_SECONDS = 6 * 3600
+    # last_accessed_at only drives "latest document" ordering; minute precision is plenty.
+    LATEST_INDEX_TOUCH_INTERVAL_SECONDS = 60.0
 
     def __init__(
         self,
@@ -136,12 +245,25 @@ class FileIndexService:
         api_log_exception_fn,
         reasoning_model_alias: str,
         final_model_alias: str,
+        api_quota_headroom_fn=None,
     ):
         self.config = config
         self.db_repo = db_repo
         self.file_parser = file_parser
         self.logger = logger
-        self.latest_index_by_user: Dict[str, Dict[str, str]] = {}
+        # Front cache over the rag_documents registry: user_id -> that user's latest document.
+        self.latest_index_cache = TTLCache(
+            name="rag_latest_document",
+            max_entries=self.LATEST_INDEX_CACHE_ENTRIES,
+            default_ttl_seconds=self.LATEST_INDEX_CACHE_TTL_SECONDS,
+            sliding_ttl=True,
+        )
+        # Documents whose last_accessed_at was bumped within the touch interval.
+        self._recent_touches = TTLCache(
+            name="rag_document_touch",
+            max_entries=self.LATEST_INDEX_CACHE_ENTRIES,
+            default_ttl_seconds=self.LATEST_INDEX_TOUCH_INTERVAL_SECONDS,
+        )
 
         self._generate = api_generate_fn
         self._get_best_api_key = api_get_key_fn
@@ -149,41 +271,109 @@ class FileIndexService:
         self._throttle = api_throttle_fn
         self._acquire_quota = api_acquire_quota_fn
         self._log_exception = api_log_exception_fn
+        self._quota_headroom = api_quota_headroom_fn
         self._reasoning_alias = reasoning_model_alias
         self._final_alias = final_model_alias
 
-    def set_latest_index(self, user_id: str, document_id: str, filename: str) -> None:
-        self.latest_index_by_user[user_id] = {
-            "document_id": document_id,
-            "filename": filename,
-            "updated_at": datetime.now().isoformat(),
-        }
+    def set_model_aliases(self, reasoning_model_alias: str, final_model_alias: str) -> None:
+        self._reasoning_alias = reasoning_model_alias
+        self._final_alias = final_model_alias
 
-    def get_latest_index_for_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return self.latest_index_by_user.get(user_id)
+    def cache_latest_index(self, user_id: str, entry: Dict[str, Any]) -> None:
+        """Prime the front cache with a document another process already registered."""
+        if user_id and entry.get("document_id"):
+            self.latest_index_cache.set(user_id, dict(entry))
+            self._recent_touches.set(str(entry["document_id"]), True)
 
-    async def index_chunk_with_reasoning(
+    async def set_latest_index(
         self,
-        *,
-        file_name: str,
-        chunk_id: str,
-        chunk_source: Dict[str, Any],
-        chunk_text: str,
-        security_report: str,
         user_id: str,
+        document_id: str,
+        filename: str,
+        chunk_count: int = 0,
+        byte_size: int = 0,
+        content_sha256: str = "",
     ) -> Dict[str, Any]:
-        current_time_str = datetime.now().strftime("%A, %d %B %Y %H:%M")
-        time_context = f"Current time: {current_time_str}\n"
-        system_instruction = time_context + get_file_index_reasoning_prompt()
+        """Record document_id as the user's latest indexed file in rag_documents and the cache."""
+        entry: Optional[Dict[str, Any]] = None
+        try:
+            entry = await self.db_repo.upsert_rag_document(
+                document_id, user_id, filename or "", chunk_count, byte_size, content_sha256
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to register document {document_id} for user {user_id}: {e}")
+        if not entry:
+            entry = {
+                "document_id": document_id,
+                "user_id": user_id,
+                "filename": filename or "",
+                "chunk_count": int(chunk_count),
+                "byte_size": int(byte_size),
+                "content_sha256": content_sha256 or "",
+                "last_accessed_at": datetime.now().isoformat(),
+            }
+        self.cache_latest_index(user_id, entry)
+        return entry
+
+    async def register_indexed_content(
+        self,
+        content_sha256: str,
+        document_id: str,
+        chunk_count: int = 0,
+        byte_size: int = 0,
+    ) -> None:
+        """Offer a freshly indexed document for reuse by identical uploads."""
+        if not content_sha256:
+            return
+        try:
+            await self.db_repo.register_rag_content(content_sha256, document_id, chunk_count, byte_size)
+        except Exception as e:
+            self.logger.error(f"Failed to register content of document {document_id}: {e}")
 
-        user_payload = (
-            f"FILE_NAME: {file_name}\n"
-            f"CHUNK_ID: {chunk_id}\n"
-            f"CHUNK_SOURCE: {json.dumps(chunk_source, ensure_ascii=False)}\n"
-            f"SECURITY_NOTES: {security_report}\n"
-            f"CHUNK_TEXT:\n{chunk_text}"
-        )
+    async def find_reusable_document(self, content_sha256: str, chunk_root: str) -> Optional[Dict[str, Any]]:
+        """Indexed document with identical content whose files are still on disk, if any."""
+        try:
+            entry = await self.db_repo.get_rag_content(content_sha256)
+        except Exception as e:
+            self.logger.warning(f"Content lookup failed for {content_sha256[:12]}: {e}")
+            return None
+        if not entry:
+            return None
+        # Evicted documents still answer from rag_chunks, but lose their chunk blob and vector
+        # shard; re-index rather than hand out a degraded copy.
+        if not os.path.isdir(os.path.join(chunk_root, str(entry["document_id"]))):
+            return None
+        return entry
+
+    async def get_latest_index_for_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.latest_index_cache.get(user_id)
+        if entry is None:
+            try:
+                entry = await self.db_repo.get_latest_rag_document(user_id)
+            except Exception as e:
+                self.logger.error(f"Failed to load latest document for user {user_id}: {e}")
+                return None
+            if not entry:
+                return None
+            self.latest_index_cache.set(user_id, entry)
+
+        document_id = str(entry["document_id"])
+        if document_id not in self._recent_touches:
+            self._recent_touches.set(document_id, True)
+            try:
+                await self.db_repo.touch_rag_document(document_id, user_id)
+            except Exception as e:
+                self.logger.warning(f"Failed to touch document {document_id}: {e}")
+        return entry
 
+    async def _run_index_request(
+        self,
+        *,
+        system_instruction: str,
+        user_payload: str,
+        user_id: str,
+        stage: str,
+    ) -> str:
         messages = [{"role": "user", "parts": [{"text": user_payload}]}]
         generation_config = {
             "temperature": 0.2,
@@ -197,13 +387,14 @@ class FileIndexService:
             generation_config["max_output_tokens"],
             self._reasoning_alias,
             extra_text=system_instruction,
+            priority=PRIORITY_BACKGROUND,
         )
         if not quota_ok:
-            return {}
+            return ""
 
         api_key, model_name, used_model_alias, key_reservation = await self._get_best_api_key(self._reasoning_alias)
         if not api_key or not model_name:
-            return {}
+            return ""
 
         await self._throttle(api_key)
         try:
@@ -219,15 +410,12 @@ class FileIndexService:
             self._commit_selected_key(key_reservation)
             candidate = response.candidates[0] if response.candidates else None
             if not (candidate and candidate.content and candidate.content.parts):
-                return {}
+                return ""
             part = candidate.content.parts[0]
-            text = (part.text or "").strip() if hasattr(part, "text") else ""
-            payload = extract_json_object(text) or {}
-            if payload:
-                return payload
+            return (part.text or "").strip() if hasattr(part, "text") else ""
         except Exception as e:
             self._log_exception(
-                stage="file_index_chunk",
+                stage=stage,
                 error=e,
                 user_id=user_id,
                 model_alias=used_model_alias,
@@ -236,46 +424,189 @@ class FileIndexService:
                 attempt=1,
                 max_attempts=1,
             )
-        return {}
+        return ""
 
-    async def build_file_index(
+    async def index_chunk_with_reasoning(
         self,
         *,
-        file_meta: Dict[str, Any],
-        document_id: str,
+        file_name: str,
+        chunk_id: str,
+        chunk_source: Dict[str, Any],
+        chunk_text: str,
+        security_report: str,
         user_id: str,
     ) -> Dict[str, Any]:
-        filename = file_meta.get("filename") or "file"
-        chunk_manifest = file_meta.get("chunk_manifest", [])
-        security_report = file_meta.get("security_report", "")
+        current_time_str = datetime.now().strftime("%A, %d %B %Y %H:%M")
+        time_context = f"Current time: {current_time_str}\n"
+        system_instruction = time_context + get_file_index_reasoning_prompt()
 
-        await self.db_repo.init_db()
+        user_payload = (
+            f"FILE_NAME: {file_name}\n"
+            f"CHUNK_ID: {chunk_id}\n"
+            f"CHUNK_SOURCE: {json.dumps(chunk_source, ensure_ascii=False)}\n"
+            f"SECURITY_NOTES: {security_report}\n"
+            f"CHUNK_TEXT:\n{chunk_text}"
+        )
 
-        index_entries: List[Dict[str, Any]] = []
+        text = await self._run_index_request(
+            system_instruction=system_instruction,
+            user_payload=user_payload,
+            user_id=user_id,
+            stage="file_index_chunk",
+        )
+        return extract_json_object(text) or {}
+
+    async def index_chunk_batch_with_reasoning(
+        self,
+        *,
+        file_name: str,
+        chunks: List[Dict[str, Any]],
+        security_report: str,
+        user_id: str,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Index several chunks in one request; returns entries keyed by chunk_id.
+
+        Chunks the model skipped or mislabelled are simply absent from the result.
+        """
+        if len(chunks) == 1:
+            chunk = chunks[0]
+            entry = await self.index_chunk_with_reasoning(
+                file_name=file_name,
+                chunk_id=chunk["chunk_id"],
+                chunk_source=chunk["source"],
+                chunk_text=chunk["text"],
+                security_report=security_report,
+                user_id=user_id,
+            )
+            return {chunk["chunk_id"]: entry} if entry else {}
+
+        current_time_str = datetime.now().strftime("%A, %d %B %Y %H:%M")
+        time_context = f"Current time: {current_time_str}\n"
+        system_instruction = time_context + get_file_index_batch_prompt()
+
+        blocks = [
+            f"=== CHUNK {chunk['chunk_id']} ===\n"
+            f"CHUNK_SOURCE: {json.dumps(chunk['source'], ensure_ascii=False)}\n"
+            f"CHUNK_TEXT:\n{chunk['text']}"
+            for chunk in chunks
+        ]
+        user_payload = (
+            f"FILE_NAME: {file_name}\n"
+            f"SECURITY_NOTES: {security_report}\n\n"
+            + "\n\n".join(blocks)
+        )
+
+        text = await self._run_index_request(
+            system_instruction=system_instruction,
+            user_payload=user_payload,
+            user_id=user_id,
+            stage="file_index_batch",
+        )
+        wanted = {chunk["chunk_id"] for chunk in chunks}
+        entries: Dict[str, Dict[str, Any]] = {}
+        for item in extract_json_array(text) or []:
+            if isinstance(item, dict) and item.get("chunk_id") in wanted:
+                entries[item["chunk_id"]] = item
+        return entries
+
+    def _index_concurrency(self) -> int:
+        limit = max(1, int(getattr(self.config, "INDEX_CONCURRENCY", 4)))
+        if self._quota_headroom is None:
+            return limit
+        try:
+            headroom = int(self._quota_headroom(self._reasoning_alias))
+        except Exception as e:
+            self.logger.warning(f"Cannot read index quota headroom: {e}")
+            return 1
+        # Requests past the headroom would only queue in the limiter; keep at least one in flight.
+        return max(1, min(limit, headroom))
+
+    async def _read_chunks(self, chunk_manifest: List[Dict[str, Any]], document_id: str) -> List[Dict[str, Any]]:
+        pending = []
         for chunk in chunk_manifest:
             manifest_chunk_id = chunk.get("chunk_id")
             chunk_path = chunk.get("chunk_path")
-            chunk_source = chunk.get("source", {})
             if not manifest_chunk_id or not chunk_path:
                 continue
-
-            chunk_id = f"{document_id}:{manifest_chunk_id}"
-            chunk_text = self.file_parser.read_chunk_text(
-                chunk_path,
+            pending.append({
+                "chunk_id": f"{document_id}:{manifest_chunk_id}",
+                "path": chunk_path,
+                "source": chunk.get("source", {}),
+            })
+
+        texts = await asyncio.gather(*(
+            asyncio.to_thread(
+                self.file_parser.read_chunk_text,
+                chunk["path"],
                 max_chars=self.INDEX_CHUNK_PREVIEW_CHARS * 2,
             )
-            if not chunk_text:
-                continue
+            for chunk in pending
+        ))
 
-            entry = await self.index_chunk_with_reasoning(
-                file_name=filename,
-                chunk_id=chunk_id,
-                chunk_source=chunk_source,
-                chunk_text=chunk_text,
-                security_report=security_report,
-                user_id=user_id,
-            )
+        loaded = []
+        for chunk, text in zip(pending, texts):
+            if text:
+                chunk["text"] = text
+                loaded.append(chunk)
+        return loaded
 
+    async def build_file_index(
+        self,
+        *,
+        file_meta: Dict[str, Any],
+        document_id: str,
+        user_id: str,
+        on_progress: Optional[IndexProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        filename = file_meta.get("filename") or "file"
+        chunk_manifest = file_meta.get("chunk_manifest", [])
+        security_report = file_meta.get("security_report", "")
+
+        await self.db_repo.init_db()
+
+        started = time.perf_counter()
+        chunks = await self._read_chunks(chunk_manifest, document_id)
+        batches = pack_chunk_batches(
+            chunks,
+            max_chars=int(getattr(self.config, "INDEX_BATCH_MAX_CHARS", 12000)),
+            max_chunks=int(getattr(self.config, "INDEX_BATCH_MAX_CHUNKS", 4)),
+        )
+        concurrency = self._index_concurrency()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        chunks_done = 0
+
+        async def run_batch(batch: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            nonlocal chunks_done
+            async with semaphore:
+                try:
+                    result = await self.index_chunk_batch_with_reasoning(
+                        file_name=filename,
+                        chunks=batch,
+                        security_report=security_report,
+                        user_id=user_id,
+                    )
+                except Exception as e:
+                    self.logger.error(f"Index batch failed for doc {document_id}: {e}")
+                    result = {}
+            chunks_done += len(batch)
+            if on_progress is not None:
+                try:
+                    await on_progress(chunks_done, len(chunks))
+                except Exception as e:
+                    self.logger.warning(f"Index progress callback failed for doc {document_id}: {e}")
+            return result
+
+        indexed: Dict[str, Dict[str, Any]] = {}
+        for result in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+            indexed.update(result)
+
+        index_entries: List[Dict[str, Any]] = []
+        records = []
+        for chunk in chunks:
+            chunk_id = chunk["chunk_id"]
+            chunk_text = chunk["text"]
+            entry = dict(indexed.get(chunk_id) or {})
             if not entry:
                 entry = {
                     "title": f"Chunk {chunk_id}",
@@ -286,47 +617,58 @@ class FileIndexService:
                 }
 
             entry["chunk_id"] = chunk_id
-            entry["chunk_path"] = chunk_path
-            entry["source"] = chunk_source
+            entry["chunk_path"] = chunk["path"]
+            entry["source"] = chunk["source"]
             index_entries.append(entry)
 
-            try:
-                async with self.db_repo.pool.acquire() as conn:  # type: ignore[union-attr]
-                    summary = entry.get("summary", "")
-                    keywords = entry.get("keywords", [])
-                    if not isinstance(keywords, list):
-                        keywords = []
-
-                    metadata = json.dumps(
-                        {
-                            "chunk_path": chunk_path,
-                            "source": chunk_source,
-                            "title": entry.get("title", ""),
-                            "risk_flags": entry.get("risk_flags", []),
-                            "notes": entry.get("notes", ""),
-                        },
-                        ensure_ascii=False,
-                    )
+            keywords = entry.get("keywords", [])
+            if not isinstance(keywords, list):
+                keywords = []
+            metadata = json.dumps(
+                {
+                    "chunk_path": chunk["path"],
+                    "source": chunk["source"],
+                    "title": entry.get("title", ""),
+                    "risk_flags": entry.get("risk_flags", []),
+                    "notes": entry.get("notes", ""),
+                },
+                ensure_ascii=False,
+            )
+            records.append((
+                chunk_id,
+                document_id,
+                chunk_text,
+                str(entry.get("summary", "") or ""),
+                [str(keyword) for keyword in keywords],
+                metadata,
+            ))
 
-                    await conn.execute(
-                        """
-                        INSERT INTO rag_chunks (chunk_id, document_id, content, chunk_summary, keywords, metadata)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                        ON CONFLICT (chunk_id) DO UPDATE
-                        SET content = EXCLUDED.content,
-                            chunk_summary = EXCLUDED.chunk_summary,
-                            keywords = EXCLUDED.keywords,
-                            metadata = EXCLUDED.metadata
-                        """,
-                        chunk_id,
-                        document_id,
-                        chunk_text,
-                        summary,
-                        keywords,
-                        metadata,
-                    )
+        try:
+            await self.db_repo.bulk_upsert_rag_chunks(records)
+        except Exception as e:
+            self.logger.error(f"Failed to bulk insert {len(records)} chunks for doc {document_id}: {e}")
+
+        vector_index = get_vector_index()
+        if vector_index is not None and index_entries:
+            vector_texts = [
+                f"{entry.get('title', '')}\n{record[3]}\n{' '.join(record[4])}\n{record[2]}"
+                for entry, record in zip(index_entries, records)
+            ]
+            try:
+                await asyncio.to_thread(
+                    vector_index.write_document,
+                    document_id,
+                    [record[0] for record in records],
+                    vector_texts,
+                )
             except Exception as e:
-                self.logger.error(f"Failed to insert chunk {chunk_id} into db: {e}")
+                self.logger.error(f"Failed to write vector shard for doc {document_id}: {e}")
+
+        self.logger.info(
+            f"[FILE-INDEX] doc={document_id} chunks={len(chunks)} requests={len(batches)} "
+            f"concurrency={concurrency} llm_hits={len(indexed)} "
+            f"elapsed_ms={(time.perf_counter() - started) * 1000:.0f}"
+        )
 
         return {
             "document_id": document_id,
@@ -371,6 +713,7 @@ class FileIndexService:
             generation_config["max_output_tokens"],
             self._final_alias,
             extra_text=system_instruction,
+            priority=PRIORITY_BACKGROUND,
         )
         if not quota_ok:
             return {"status": "warn", "reason": "quota blocked", "risk_flags": []}
@@ -1,11 +1,16 @@
 import os
-import aiohttp
+import asyncio
 import csv
 import re
-import unicodedata
-from typing import Optional, Dict, List, Tuple, Any
+from contextlib import closing
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from src.core.config import logger, FILE_STORAGE_PATH, MIN_FREE_SPACE_MB
+from src.core.http_client import DownloadResult, get_http_client, ResponseTooLargeError
 from src.managers.cleanup_manager import CleanupManager
+from src.services.chunk_store import PackedChunkWriter, read_chunk
+from src.services.pdf_extractor import get_pdf_extractor
+from src.services.security_scanner import SecurityScanner, strip_hidden_chars
 
 try:
     import pypdf
@@ -22,6 +27,9 @@ class FileParserService:
     MAX_INDEX_CHUNKS = 5000
     MAX_SCAN_LINES = 2000
     MAX_SUSPICIOUS_LINES = 20
+    # Lines are security-scanned in blocks of roughly this many bytes (or rows, for CSV).
+    SCAN_BLOCK_BYTES = 1024 * 1024
+    SCAN_BLOCK_ROWS = 4096
     
     def __init__(self, storage_path: str = FILE_STORAGE_PATH, cleanup_mgr: Optional[CleanupManager] = None):
         self.storage_path = storage_path
@@ -30,34 +38,10 @@ class FileParserService:
 
         self._safe_name_pattern = re.compile(r"[^a-zA-Z0-9._-]+")
 
-        self._injection_patterns = [
-            r"ignore (all|previous|prior) instructions",
-            r"disregard (all|previous|prior) instructions",
-            r"system prompt",
-            r"developer message",
-            r"tool (?:call|schema)",
-            r"jailbreak",
-            r"bypass",
-            r"role\s*:\s*system",
-            r"<system>",
-            r"</system>",
-            r"<assistant>",
-            r"</assistant>",
-            r"api key",
-            r"password",
-            r"token",
-            r"bỏ qua hướng dẫn",
-            r"bỏ qua chỉ dẫn",
-            r"bỏ qua mọi hướng dẫn",
-            r"quên (mọi )?hướng dẫn",
-            r"lệnh hệ thống",
-            r"cơ chế nội bộ",
-            r"jailbreak",
-            r"bypass",
-        ]
-        self._compiled_injection_patterns = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self._injection_patterns
-        ]
+        self.security_scanner = SecurityScanner(
+            max_scan_lines=self.MAX_SCAN_LINES,
+            max_suspicious_lines=self.MAX_SUSPICIOUS_LINES,
+        )
         self._html_comment_pattern = re.compile(r"<!--(.*?)-->", re.DOTALL)
 
     def _safe_filename(self, filename: str) -> str:
@@ -73,10 +57,10 @@ class FileParserService:
         safe_filename = base_name or self._safe_filename(filename)
         local_path = os.path.join(self.storage_path, safe_filename)
         
-        local_path, download_error = await self._download_attachment(url, filename, size, local_path)
+        download, download_error = await self._download_attachment(url, filename, size, local_path)
         if download_error:
             return {"filename": filename, "content": download_error}
-        assert local_path is not None
+        assert download is not None
         
         # STEP 2: Extract text
         extracted_text = ""
@@ -148,21 +132,41 @@ class FileParserService:
         proxy_url: str = "",
         base_name: str = "",
         chunk_dir: Optional[str] = None,
+        reuse_lookup: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None,
     ) -> Dict[str, Any]:
-        """Download and chunk a file for indexing."""
+        """Download and chunk a file for indexing.
+
+        reuse_lookup maps the content hash to an already indexed document; on a hit the
+        download is discarded and the result carries "reused_document" instead of chunks.
+        """
         safe_filename = base_name or self._safe_filename(filename)
         local_path = os.path.join(self.storage_path, safe_filename)
         resolved_chunk_dir = chunk_dir or os.path.join(self.storage_path, f"{safe_filename}_chunks")
 
-        local_path, download_error = await self._download_attachment(url, filename, size, local_path)
+        download, download_error = await self._download_attachment(url, filename, size, local_path)
         if download_error:
             return {"filename": filename, "error": download_error}
-        assert local_path is not None
+        assert download is not None
 
         file_extension = os.path.splitext(filename)[1].lower()
 
+        if reuse_lookup is not None:
+            reused = await reuse_lookup(download.sha256)
+            if reused:
+                self._remove_local_file(local_path)
+                self.logger.info(f"Reusing indexed document {reused.get('document_id')} for identical upload '{filename}'")
+                return {
+                    "filename": filename,
+                    "file_extension": file_extension,
+                    "file_size": download.bytes,
+                    "content_sha256": download.sha256,
+                    "reused_document": reused,
+                }
+
         try:
-            chunk_manifest, security_report, truncated = self._build_chunk_manifest(
+            # Chunking is CPU bound (PDF text extraction above all); keep it off the event loop.
+            chunk_manifest, security_report, truncated = await asyncio.to_thread(
+                self._build_chunk_manifest,
                 local_path,
                 file_extension,
                 resolved_chunk_dir,
@@ -171,6 +175,8 @@ class FileParserService:
                 "filename": filename,
                 "file_extension": file_extension,
                 "local_path": local_path,
+                "file_size": download.bytes,
+                "content_sha256": download.sha256,
                 "chunk_dir": chunk_dir,
                 "chunk_manifest": chunk_manifest,
                 "security_report": security_report,
@@ -180,7 +186,7 @@ class FileParserService:
             self.logger.error(f"Index prep failed for '{filename}': {e}")
             return {"filename": filename, "error": f"[LỖI: Không thể chuẩn bị file để index: {e}]"}
 
-    async def _download_attachment(self, url: str, filename: str, size: int, local_path: str) -> Tuple[Optional[str], Optional[str]]:
+    async def _download_attachment(self, url: str, filename: str, size: int, local_path: str) -> Tuple[Optional[DownloadResult], Optional[str]]:
         if size > self.MAX_FILE_SIZE_BYTES:
             self.logger.warning(
                 f"File {filename} ({(size / 1024 / 1024):.2f} MB) too large. Skipping."
@@ -199,20 +205,32 @@ class FileParserService:
 
             os.makedirs(self.storage_path, exist_ok=True)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(download_url) as resp:
-                    if resp.status == 200:
-                        data = await resp.read()
-                        with open(local_path, 'wb') as f:
-                            f.write(data)
-                        self.logger.info(f"Saved local file: {local_path}")
-                        return local_path, None
-                    raise Exception(f"HTTP Error {resp.status}")
+            # Streamed to disk in blocks and hashed on the way; RSS stays flat for large uploads.
+            result = await get_http_client().download_to_file(
+                download_url,
+                local_path,
+                timeout=300,
+                max_bytes=self.MAX_FILE_SIZE_BYTES,
+            )
+            self.logger.info(
+                f"Saved local file: {local_path} ({result.bytes} bytes, {result.attempts} attempt(s), sha256 {result.sha256[:12]})"
+            )
+            return result, None
 
+        except ResponseTooLargeError as e:
+            # Discord-reported size can be missing or wrong; the cap applies to actual bytes.
+            self.logger.warning(f"Download of {filename} aborted: {e}")
+            return None, f"[LỖI: File quá lớn, giới hạn {self.MAX_FILE_SIZE_BYTES // 1024 // 1024}MB]"
         except Exception as e:
             self.logger.error(f"Error downloading file from Discord: {e}")
             return None, "[LỖI: Không thể tải file về local]"
 
+    def _remove_local_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError as e:
+            self.logger.warning(f"Could not remove duplicate upload {path}: {e}")
+
     def _read_text_file(self, path: str) -> Tuple[str, bool]:
         text_chunks: List[str] = []
         total = 0
@@ -259,20 +277,6 @@ class FileParserService:
                     break
         return "\n".join(rows), truncated
 
-    def _strip_hidden_chars(self, text: str) -> Tuple[str, int]:
-        removed = 0
-        cleaned_chars: List[str] = []
-        for ch in text:
-            code = ord(ch)
-            if ch in {"\n", "\t"}:
-                cleaned_chars.append(ch)
-                continue
-            if code < 32 or unicodedata.category(ch) == "Cf":
-                removed += 1
-                continue
-            cleaned_chars.append(ch)
-        return "".join(cleaned_chars), removed
-
     def _looks_binary(self, text: str) -> bool:
         if not text:
             return False
@@ -281,7 +285,7 @@ class FileParserService:
         return ratio < 0.7
 
     def _build_security_report(self, text: str) -> Tuple[str, str]:
-        cleaned_text, hidden_removed = self._strip_hidden_chars(text)
+        cleaned_text, hidden_removed = strip_hidden_chars(text)
         report_lines: List[str] = []
 
         if hidden_removed > 0:
@@ -296,21 +300,13 @@ class FileParserService:
                 f"[SECURITY NOTE] Hidden HTML comment sections detected: {len(hidden_sections)} (sample: {sample})"
             )
 
+        lines = cleaned_text.splitlines()[:self.MAX_SCAN_LINES]
         suspicious_lines: List[str] = []
-        for idx, line in enumerate(cleaned_text.splitlines(), start=1):
-            if idx > self.MAX_SCAN_LINES:
-                break
-            if not line.strip():
-                continue
-            for pattern in self._compiled_injection_patterns:
-                if pattern.search(line):
-                    snippet = line.strip()
-                    if len(snippet) > 240:
-                        snippet = snippet[:240] + "..."
-                    suspicious_lines.append(f"{idx}: {snippet}")
-                    break
-            if len(suspicious_lines) >= self.MAX_SUSPICIOUS_LINES:
-                break
+        for idx in self.security_scanner.suspicious_line_indexes(lines, self.MAX_SUSPICIOUS_LINES):
+            snippet = lines[idx].strip()
+            if len(snippet) > 240:
+                snippet = snippet[:240] + "..."
+            suspicious_lines.append(f"{idx + 1}: {snippet}")
 
         if suspicious_lines:
             joined = " | ".join(suspicious_lines)
@@ -333,17 +329,19 @@ class FileParserService:
         manifest: List[Dict[str, Any]] = []
         truncated = False
         state = self._init_security_state()
+        if file_extension == '.pdf' and not pypdf:
+            raise RuntimeError("pypdf library not installed for PDF parsing")
 
-        if file_extension in {'.txt', '.md', '.log', '.env', '.ini', '.yml', '.yaml', '.json', '.xml'}:
-            manifest, truncated = self._chunk_text_file(local_path, chunk_dir, state)
-        elif file_extension == '.csv':
-            manifest, truncated = self._chunk_csv_file(local_path, chunk_dir, state)
-        elif file_extension == '.pdf':
-            if not pypdf:
-                raise RuntimeError("pypdf library not installed for PDF parsing")
-            manifest, truncated = self._chunk_pdf_file(local_path, chunk_dir, state)
-        else:
-            manifest, truncated = self._chunk_text_file(local_path, chunk_dir, state)
+        # All chunks of a document go to one packed blob in a single pass.
+        with PackedChunkWriter(chunk_dir or os.path.join(self.storage_path, "chunks")) as store:
+            if file_extension in {'.txt', '.md', '.log', '.env', '.ini', '.yml', '.yaml', '.json', '.xml'}:
+                manifest, truncated = self._chunk_text_file(local_path, store, state)
+            elif file_extension == '.csv':
+                manifest, truncated = self._chunk_csv_file(local_path, store, state)
+            elif file_extension == '.pdf':
+                manifest, truncated = self._chunk_pdf_file(local_path, store, state)
+            else:
+                manifest, truncated = self._chunk_text_file(local_path, store, state)
 
         security_report = self._finalize_security_report(state)
         return manifest, security_report, truncated
@@ -357,30 +355,6 @@ class FileParserService:
             "scanned_lines": 0,
         }
 
-    def _scan_security_line(self, line: str, label: str, state: Dict[str, Any]) -> str:
-        cleaned_line, hidden_removed = self._strip_hidden_chars(line)
-        if hidden_removed:
-            state["hidden_removed"] += hidden_removed
-
-        if state["scanned_lines"] < self.MAX_SCAN_LINES:
-            state["scanned_lines"] += 1
-            if cleaned_line.strip():
-                if self._html_comment_pattern.search(cleaned_line):
-                    state["html_comment_count"] += 1
-                    if len(state["html_comment_samples"]) < 3:
-                        state["html_comment_samples"].append(cleaned_line.strip()[:200])
-
-                if len(state["suspicious_lines"]) < self.MAX_SUSPICIOUS_LINES:
-                    for pattern in self._compiled_injection_patterns:
-                        if pattern.search(cleaned_line):
-                            snippet = cleaned_line.strip()
-                            if len(snippet) > 240:
-                                snippet = snippet[:240] + "..."
-                            state["suspicious_lines"].append(f"{label}: {snippet}")
-                            break
-
-        return cleaned_line
-
     def _finalize_security_report(self, state: Dict[str, Any]) -> str:
         report_lines: List[str] = []
         if state["hidden_removed"] > 0:
@@ -403,18 +377,13 @@ class FileParserService:
 
         return "\n".join(report_lines)
 
-    def _write_chunk(self, chunk_dir: str, chunk_id: str, text: str) -> str:
-        resolved_chunk_dir = chunk_dir or os.path.join(self.storage_path, "chunks")
-        os.makedirs(resolved_chunk_dir, exist_ok=True)
-        chunk_path = os.path.join(resolved_chunk_dir, f"{chunk_id}.txt")
-        with open(chunk_path, 'w', encoding='utf-8') as f:
-            f.write(text)
-        return chunk_path
+    def _write_chunk(self, store: PackedChunkWriter, chunk_id: str, text: str) -> str:
+        return store.append(chunk_id, text)
 
     def _chunk_text_file(
         self,
         path: str,
-        chunk_dir: str,
+        store: PackedChunkWriter,
         state: Dict[str, Any],
     ) -> Tuple[List[Dict[str, Any]], bool]:
         manifest: List[Dict[str, Any]] = []
@@ -426,36 +395,44 @@ class FileParserService:
         current_line = 0
 
         with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            for raw_line in f:
-                current_line += 1
-                cleaned_line = self._scan_security_line(raw_line.rstrip("\n"), f"line {current_line}", state)
-                chunk_lines.append(cleaned_line)
-                chunk_char_count += len(cleaned_line) + 1
-
-                if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
-                    chunk_index += 1
-                    chunk_id = f"chunk_{chunk_index:05d}"
-                    chunk_text = "\n".join(chunk_lines)
-                    chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
-                    manifest.append({
-                        "chunk_id": chunk_id,
-                        "chunk_path": chunk_path,
-                        "source": {"line_start": line_start, "line_end": current_line},
-                        "char_count": len(chunk_text),
-                    })
-                    chunk_lines = []
-                    chunk_char_count = 0
-                    line_start = current_line + 1
-
-                    if chunk_index >= self.MAX_INDEX_CHUNKS:
-                        truncated = True
-                        break
+            while not truncated:
+                raw_lines = f.readlines(self.SCAN_BLOCK_BYTES)
+                if not raw_lines:
+                    break
+                cleaned_lines = self.security_scanner.scan_lines(
+                    [raw_line.rstrip("\n") for raw_line in raw_lines],
+                    lambda i, base=current_line: f"line {base + i + 1}",
+                    state,
+                )
+                for cleaned_line in cleaned_lines:
+                    current_line += 1
+                    chunk_lines.append(cleaned_line)
+                    chunk_char_count += len(cleaned_line) + 1
+
+                    if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
+                        chunk_index += 1
+                        chunk_id = f"chunk_{chunk_index:05d}"
+                        chunk_text = "\n".join(chunk_lines)
+                        chunk_path = self._write_chunk(store, chunk_id, chunk_text)
+                        manifest.append({
+                            "chunk_id": chunk_id,
+                            "chunk_path": chunk_path,
+                            "source": {"line_start": line_start, "line_end": current_line},
+                            "char_count": len(chunk_text),
+                        })
+                        chunk_lines = []
+                        chunk_char_count = 0
+                        line_start = current_line + 1
+
+                        if chunk_index >= self.MAX_INDEX_CHUNKS:
+                            truncated = True
+                            break
 
         if chunk_lines and chunk_index < self.MAX_INDEX_CHUNKS:
             chunk_index += 1
             chunk_id = f"chunk_{chunk_index:05d}"
             chunk_text = "\n".join(chunk_lines)
-            chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
+            chunk_path = self._write_chunk(store, chunk_id, chunk_text)
             manifest.append({
                 "chunk_id": chunk_id,
                 "chunk_path": chunk_path,
@@ -470,7 +447,7 @@ class FileParserService:
     def _chunk_csv_file(
         self,
         path: str,
-        chunk_dir: str,
+        store: PackedChunkWriter,
         state: Dict[str, Any],
     ) -> Tuple[List[Dict[str, Any]], bool]:
         manifest: List[Dict[str, Any]] = []
@@ -483,39 +460,46 @@ class FileParserService:
 
         with open(path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
             reader = csv.reader(f)
-            for row in reader:
-                current_row += 1
-                line = " | ".join(cell.strip() for cell in row)
-                cleaned_line = self._scan_security_line(line, f"row {current_row}", state)
-                if not cleaned_line:
-                    continue
-                chunk_lines.append(cleaned_line)
-                chunk_char_count += len(cleaned_line) + 1
-
-                if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
-                    chunk_index += 1
-                    chunk_id = f"chunk_{chunk_index:05d}"
-                    chunk_text = "\n".join(chunk_lines)
-                    chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
-                    manifest.append({
-                        "chunk_id": chunk_id,
-                        "chunk_path": chunk_path,
-                        "source": {"row_start": row_start, "row_end": current_row},
-                        "char_count": len(chunk_text),
-                    })
-                    chunk_lines = []
-                    chunk_char_count = 0
-                    row_start = current_row + 1
-
-                    if chunk_index >= self.MAX_INDEX_CHUNKS:
-                        truncated = True
-                        break
+            while not truncated:
+                rows = [" | ".join(cell.strip() for cell in row) for row in islice(reader, self.SCAN_BLOCK_ROWS)]
+                if not rows:
+                    break
+                cleaned_lines = self.security_scanner.scan_lines(
+                    rows,
+                    lambda i, base=current_row: f"row {base + i + 1}",
+                    state,
+                )
+                for cleaned_line in cleaned_lines:
+                    current_row += 1
+                    if not cleaned_line:
+                        continue
+                    chunk_lines.append(cleaned_line)
+                    chunk_char_count += len(cleaned_line) + 1
+
+                    if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
+                        chunk_index += 1
+                        chunk_id = f"chunk_{chunk_index:05d}"
+                        chunk_text = "\n".join(chunk_lines)
+                        chunk_path = self._write_chunk(store, chunk_id, chunk_text)
+                        manifest.append({
+                            "chunk_id": chunk_id,
+                            "chunk_path": chunk_path,
+                            "source": {"row_start": row_start, "row_end": current_row},
+                            "char_count": len(chunk_text),
+                        })
+                        chunk_lines = []
+                        chunk_char_count = 0
+                        row_start = current_row + 1
+
+                        if chunk_index >= self.MAX_INDEX_CHUNKS:
+                            truncated = True
+                            break
 
         if chunk_lines and chunk_index < self.MAX_INDEX_CHUNKS:
             chunk_index += 1
             chunk_id = f"chunk_{chunk_index:05d}"
             chunk_text = "\n".join(chunk_lines)
-            chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
+            chunk_path = self._write_chunk(store, chunk_id, chunk_text)
             manifest.append({
                 "chunk_id": chunk_id,
                 "chunk_path": chunk_path,
@@ -530,7 +514,7 @@ class FileParserService:
     def _chunk_pdf_file(
         self,
         path: str,
-        chunk_dir: str,
+        store: PackedChunkWriter,
         state: Dict[str, Any],
     ) -> Tuple[List[Dict[str, Any]], bool]:
         manifest: List[Dict[str, Any]] = []
@@ -542,55 +526,60 @@ class FileParserService:
 
         if pypdf is None:
             return [], False
-        reader = pypdf.PdfReader(path)
-        for page_idx, page in enumerate(reader.pages, start=1):
-            text = page.extract_text() or ""
-            if not text:
-                continue
-            lines = text.splitlines()
-            cleaned_lines: List[str] = []
-            for line_idx, line in enumerate(lines, start=1):
-                cleaned_line = self._scan_security_line(line, f"page {page_idx}, line {line_idx}", state)
-                if cleaned_line:
-                    cleaned_lines.append(cleaned_line)
-
-            if not cleaned_lines:
-                continue
-
-            for cleaned_line in cleaned_lines:
-                chunk_lines.append(cleaned_line)
-                chunk_char_count += len(cleaned_line) + 1
-                if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
-                    chunk_index += 1
-                    chunk_id = f"chunk_{chunk_index:05d}"
-                    chunk_text = "\n".join(chunk_lines)
-                    chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
-                    manifest.append({
-                        "chunk_id": chunk_id,
-                        "chunk_path": chunk_path,
-                        "source": {"page_start": page_start, "page_end": page_idx},
-                        "char_count": len(chunk_text),
-                    })
-                    chunk_lines = []
-                    chunk_char_count = 0
-                    page_start = page_idx + 1
-
-                    if chunk_index >= self.MAX_INDEX_CHUNKS:
-                        truncated = True
-                        break
-
-            if truncated:
-                break
+        last_page = 0
+        # Pages arrive in order from the extraction pool; closing the iterator on early stop
+        # cancels the batches that are still queued.
+        with closing(get_pdf_extractor().iter_pages(path)) as pages:
+            for page_idx, text in pages:
+                last_page = page_idx
+                if not text:
+                    continue
+                cleaned_lines = [
+                    line for line in self.security_scanner.scan_lines(
+                        text.splitlines(),
+                        lambda i, page=page_idx: f"page {page}, line {i + 1}",
+                        state,
+                    )
+                    if line
+                ]
+
+                if not cleaned_lines:
+                    continue
+
+                for cleaned_line in cleaned_lines:
+                    chunk_lines.append(cleaned_line)
+                    chunk_char_count += len(cleaned_line) + 1
+                    if chunk_char_count >= self.INDEX_CHUNK_CHAR_LIMIT:
+                        chunk_index += 1
+                        chunk_id = f"chunk_{chunk_index:05d}"
+                        chunk_text = "\n".join(chunk_lines)
+                        chunk_path = self._write_chunk(store, chunk_id, chunk_text)
+                        manifest.append({
+                            "chunk_id": chunk_id,
+                            "chunk_path": chunk_path,
+                            "source": {"page_start": page_start, "page_end": page_idx},
+                            "char_count": len(chunk_text),
+                        })
+                        chunk_lines = []
+                        chunk_char_count = 0
+                        page_start = page_idx + 1
+
+                        if chunk_index >= self.MAX_INDEX_CHUNKS:
+                            truncated = True
+                            break
+
+                if truncated:
+                    break
 
         if chunk_lines and chunk_index < self.MAX_INDEX_CHUNKS:
             chunk_index += 1
             chunk_id = f"chunk_{chunk_index:05d}"
             chunk_text = "\n".join(chunk_lines)
-            chunk_path = self._write_chunk(chunk_dir, chunk_id, chunk_text)
+            chunk_path = self._write_chunk(store, chunk_id, chunk_text)
             manifest.append({
                 "chunk_id": chunk_id,
                 "chunk_path": chunk_path,
-                "source": {"page_start": page_start, "page_end": reader.get_num_pages()},
+                "source": {"page_start": page_start, "page_end": last_page},
                 "char_count": len(chunk_text),
             })
         elif chunk_lines:
@@ -600,6 +589,12 @@ class FileParserService:
 
     def read_chunk_text(self, chunk_path: str, max_chars: int = 4000) -> str:
         try:
+            text = read_chunk(chunk_path, max_chars)
+            if text is not None:
+                if len(text) > max_chars:
+                    return text[:max_chars] + "\n...[chunk truncated]"
+                return text
+            # Rows indexed before packed storage still point at one .txt file per chunk.
             with open(chunk_path, 'r', encoding='utf-8', errors='ignore') as f:
                 text = f.read(max_chars + 1)
                 if len(text) > max_chars:
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from src.core.config import logger, PDF_EXTRACT_WORKERS, PDF_EXTRACT_BATCH_PAGES
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+
+__all__ = ["PdfPageExtractor", "extract_page_batch", "get_pdf_extractor"]
+
+# Per-process reader cache: consecutive batches of one file skip re-parsing the xref table.
+_reader_cache: dict = {}
+
+
+def _get_reader(path: str):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    reader = _reader_cache.get(key)
+    if reader is None:
+        _reader_cache.clear()
+        reader = pypdf.PdfReader(path)
+        _reader_cache[key] = reader
+    return reader
+
+
+def extract_page_batch(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) (0-based). Module level so pool workers can unpickle it."""
+    reader = _get_reader(path)
+    texts: List[str] = []
+    for page_number in range(start, min(stop, len(reader.pages))):
+        try:
+            texts.append(reader.pages[page_number].extract_text() or "")
+        except Exception as e:
+            # One malformed page should not cost the rest of the document.
+            logger.warning(f"PDF page {page_number + 1} of {path} failed to extract: {e}")
+            texts.append("")
+    return texts
+
+
+class PdfPageExtractor:
+    """Extracts PDF pages in batches on a process pool and yields them back in page order.
+
+    At most `workers * 2` batches are in flight, so memory stays bounded on huge files and a
+    consumer that stops early (chunk cap reached) leaves little wasted work behind.
+    """
+
+    def __init__(self, workers: int = 2, batch_pages: int = 8):
+        self.logger = logger
+        self.workers = max(0, int(workers))
+        self.batch_pages = max(1, int(batch_pages))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent runs an event loop and helper threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def iter_pages(self, path: str) -> Iterator[Tuple[int, str]]:
+        """Yield (1-based page number, text) in order. Closing the iterator cancels queued batches."""
+        if pypdf is None:
+            raise RuntimeError("pypdf library not installed for PDF parsing")
+        page_count = len(_get_reader(path).pages)
+        executor = self._get_executor() if page_count > self.batch_pages else None
+        if executor is None:
+            yield from self._iter_inline(path, 0, page_count)
+            return
+
+        pending: Deque[Tuple[int, Future]] = deque()
+        next_start = 0
+        try:
+            while next_start < page_count or pending:
+                while next_start < page_count and len(pending) < self.workers * 2:
+                    stop = min(page_count, next_start + self.batch_pages)
+                    pending.append((next_start, executor.submit(extract_page_batch, path, next_start, stop)))
+                    next_start = stop
+                start, future = pending.popleft()
+                try:
+                    texts = future.result()
+                except BrokenProcessPool as e:
+                    self.logger.warning(f"PDF extraction pool broke ({e}); finishing {path} inline.")
+                    self.shutdown()
+                    pending.clear()
+                    yield from self._iter_inline(path, start, page_count)
+                    return
+                for offset, text in enumerate(texts):
+                    yield start + offset + 1, text
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _iter_inline(self, path: str, start: int, stop: int) -> Iterator[Tuple[int, str]]:
+        for batch_start in range(start, stop, self.batch_pages):
+            texts = extract_page_batch(path, batch_start, min(stop, batch_start + self.batch_pages))
+            for offset, text in enumerate(texts):
+                yield batch_start + offset + 1, text
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pdf_extractor_instance: Optional[PdfPageExtractor] = None
+
+
+def get_pdf_extractor() -> PdfPageExtractor:
+    global _pdf_extractor_instance
+    if _pdf_extractor_instance is None:
+        _pdf_extractor_instance = PdfPageExtractor(workers=PDF_EXTRACT_WORKERS, batch_pages=PDF_EXTRACT_BATCH_PAGES)
+    return _pdf_extractor_instance
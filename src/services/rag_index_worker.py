@@ -0,0 +1,263 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from src.core.config import logger, Config
+from src.core.api_router import get_api_router
+from src.core.gemini_api_manager import GeminiApiManager
+from src.core.api_config import DEFAULT_REASONING_MODEL_ALIAS, DEFAULT_FINAL_MODEL_ALIAS
+from src.database.repository import DatabaseRepository
+from src.managers.cleanup_manager import CleanupManager
+from src.services.file_index_service import FileIndexService
+from src.services.file_parser import FileParserService
+from src.services.redis_service import RedisStreamConsumer, RedisStreamService, _RedisMsg
+
+RAG_INDEX_STREAM = "rag-index"
+RAG_INDEX_EVENTS_STREAM = "rag-index-events"
+RAG_INDEX_GROUP = "azuris_rag_index"
+
+# Progress events are rate limited per job; start, done and failed always go out.
+PROGRESS_EVENT_INTERVAL_SECONDS = 2.0
+
+# Jobs are acked only once they finish. A running job refreshes its pending entry every
+# heartbeat, so only entries left behind by a dead worker go idle long enough to reclaim.
+JOB_HEARTBEAT_SECONDS = 30.0
+RECLAIM_IDLE_MS = 120000
+RECLAIM_INTERVAL_SECONDS = 60.0
+
+
+class RagIndexWorker:
+    """Builds file indexes from the rag-index stream and reports progress on rag-index-events.
+
+    Jobs only carry the chunk manifest, so a worker process must see the same FILE_CHUNK_DIR
+    as the chat worker that chunked the upload. Several workers can share the consumer group;
+    a job is acked when it finishes, and one left pending by a dead worker is reclaimed.
+    """
+
+    def __init__(self, config: Config, concurrency: Optional[int] = None):
+        self.config = config
+        self.logger = logger
+        self.kafka_service = RedisStreamService(redis_url=self.config.REDIS_URL, client_id="rag-index")
+        self.concurrency = max(1, int(concurrency or self.config.RAG_INDEX_WORKERS))
+        self.db_repo = DatabaseRepository(self.config.DATABASE_URL)
+        self.api_router = get_api_router()
+        if self.api_router.db_repo is None:
+            self.api_router.set_db_repo(self.db_repo)
+        self.api_mgr = GeminiApiManager(config=self.config, api_router=self.api_router)
+        self.file_parser = FileParserService(cleanup_mgr=CleanupManager())
+        self.file_index_svc = FileIndexService(
+            config=self.config,
+            db_repo=self.db_repo,
+            file_parser=self.file_parser,
+            api_generate_fn=self.api_mgr._generate_gemini_content,
+            api_get_key_fn=self.api_mgr._get_best_api_key,
+            api_commit_key_fn=self.api_mgr._commit_selected_key,
+            api_throttle_fn=self.api_mgr._throttle_api_request,
+            api_acquire_quota_fn=self.api_mgr._acquire_gemini_quota,
+            api_log_exception_fn=self.api_mgr._log_gemini_exception,
+            reasoning_model_alias=DEFAULT_REASONING_MODEL_ALIAS,
+            final_model_alias=DEFAULT_FINAL_MODEL_ALIAS,
+            api_quota_headroom_fn=self.api_router.get_quota_headroom,
+        )
+        self._consumer: Optional[RedisStreamConsumer] = None
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._jobs: Set[asyncio.Task] = set()
+        self._active_entries: Set[str] = set()
+        self._reclaim_task: Optional[asyncio.Task] = None
+
+    async def start_worker(self) -> None:
+        self.logger.info(f"Starting RagIndexWorker ({self.concurrency} slots)...")
+        try:
+            await self.db_repo.init_db()
+            await self.kafka_service.start_producer()
+            self._consumer = await self.kafka_service.start_consumer(
+                RAG_INDEX_STREAM, group_id=RAG_INDEX_GROUP, read_pending=False
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to start RagIndexWorker services: {e}")
+            await self.shutdown()
+            return
+
+        await self._reclaim_idle_jobs()
+        self._reclaim_task = asyncio.create_task(self._reclaim_loop())
+
+        self.logger.info("RagIndexWorker started. Listening for rag-index jobs...")
+        try:
+            while True:
+                # Take a slot before reading so queued jobs stay in the stream for other workers.
+                await self._slots.acquire()
+                try:
+                    msg = await self._consumer.__anext__()
+                except BaseException:
+                    self._slots.release()
+                    raise
+                self._spawn(msg, holds_slot=True)
+        except StopAsyncIteration:
+            pass
+        except asyncio.CancelledError:
+            self.logger.info("RagIndexWorker task cancelled")
+            raise
+        except Exception as e:
+            self.logger.error(f"RagIndexWorker consumer loop error: {e}")
+        finally:
+            await self.shutdown()
+
+    async def _reclaim_idle_jobs(self) -> None:
+        if self._consumer is None:
+            return
+        for msg in await self._consumer.reclaim_pending(min_idle_ms=RECLAIM_IDLE_MS):
+            if msg.entry_id in self._active_entries:
+                continue
+            # Reclaimed entries bypass the slot limit; there are at most a handful.
+            self._spawn(msg, holds_slot=False)
+
+    async def _reclaim_loop(self) -> None:
+        while True:
+            await asyncio.sleep(RECLAIM_INTERVAL_SECONDS)
+            try:
+                await self._reclaim_idle_jobs()
+            except Exception as e:
+                self.logger.warning(f"RagIndexWorker reclaim failed: {e}")
+
+    def _spawn(self, msg: _RedisMsg, holds_slot: bool) -> None:
+        self._active_entries.add(msg.entry_id)
+        task = asyncio.create_task(self._run_and_ack(msg))
+        self._jobs.add(task)
+
+        def _done(finished: asyncio.Task) -> None:
+            self._jobs.discard(finished)
+            self._active_entries.discard(msg.entry_id)
+            if holds_slot:
+                self._slots.release()
+
+        task.add_done_callback(_done)
+
+    async def _heartbeat(self, msg: _RedisMsg) -> None:
+        assert self._consumer is not None
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            await self._consumer.touch(msg)
+
+    async def _run_and_ack(self, msg: _RedisMsg) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(msg))
+        try:
+            await self._run_job(msg.value or {})
+        finally:
+            heartbeat.cancel()
+        # _run_job handles its own failures, so reaching here means the job is finished
+        # either way. A cancelled job (shutdown) stays pending for another worker.
+        assert self._consumer is not None
+        await self._consumer.ack(msg)
+
+    async def _publish_event(self, job: Dict[str, Any], stage: str, **fields: Any) -> None:
+        event = {
+            "type": "rag_index_event",
+            "stage": stage,
+            "document_id": job.get("document_id"),
+            "user_id": job.get("user_id"),
+            "filename": job.get("filename"),
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        event.update(fields)
+        await self.kafka_service.publish(RAG_INDEX_EVENTS_STREAM, payload=event, key=str(job.get("user_id") or ""))
+
+    async def _notify_user(self, job: Dict[str, Any], content: str) -> None:
+        if not job.get("channel_id"):
+            return
+        await self.kafka_service.publish("discord-outgoing", payload={
+            "action": "reply",
+            "channel_id": job.get("channel_id"),
+            "user_id": job.get("user_id"),
+            "content": content,
+            "reference_message_id": job.get("reference_message_id"),
+        }, key=str(job.get("user_id") or ""))
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        document_id = str(job.get("document_id") or "")
+        user_id = str(job.get("user_id") or "")
+        file_meta = job.get("file_meta") or {}
+        filename = job.get("filename") or file_meta.get("filename") or "file"
+        if not document_id or not user_id or not file_meta.get("chunk_manifest"):
+            self.logger.warning(f"Dropping malformed rag-index job: document_id={document_id} user={user_id}")
+            return
+
+        started = time.monotonic()
+        last_progress = 0.0
+
+        async def on_progress(done: int, total: int) -> None:
+            nonlocal last_progress
+            now = time.monotonic()
+            if done < total and now - last_progress < PROGRESS_EVENT_INTERVAL_SECONDS:
+                return
+            last_progress = now
+            await self._publish_event(job, "progress", chunks_done=done, chunks_total=total)
+
+        try:
+            await self._publish_event(job, "started", chunks_total=len(file_meta.get("chunk_manifest", [])))
+            selected = await self.api_router.get_selected_model_aliases()
+            self.file_index_svc.set_model_aliases(
+                str(selected.get("reasoning") or DEFAULT_REASONING_MODEL_ALIAS),
+                str(selected.get("final") or DEFAULT_FINAL_MODEL_ALIAS),
+            )
+
+            index_data = await self.file_index_svc.build_file_index(
+                file_meta=file_meta,
+                document_id=document_id,
+                user_id=user_id,
+                on_progress=on_progress,
+            )
+            validation = await self.file_index_svc.validate_file_index(index_data, user_id)
+            status = str(validation.get("status") or "warn")
+            if status != "block":
+                await self.file_index_svc.register_indexed_content(
+                    file_meta.get("content_sha256", ""),
+                    document_id,
+                    chunk_count=index_data.get("chunk_count", 0),
+                    byte_size=file_meta.get("file_size", 0),
+                )
+                await self.file_index_svc.set_latest_index(
+                    user_id,
+                    document_id,
+                    filename,
+                    chunk_count=index_data.get("chunk_count", 0),
+                    byte_size=file_meta.get("file_size", 0),
+                    content_sha256=file_meta.get("content_sha256", ""),
+                )
+
+            await self._publish_event(
+                job,
+                "done",
+                status=status,
+                reason=str(validation.get("reason") or ""),
+                chunk_count=index_data.get("chunk_count", 0),
+                byte_size=file_meta.get("file_size", 0),
+                elapsed_ms=int((time.monotonic() - started) * 1000),
+            )
+            if status == "block":
+                await self._notify_user(job, f"⚠️ File `{filename}` đã bị chặn khi index: {validation.get('reason')}")
+            else:
+                await self._notify_user(
+                    job,
+                    f"📚 Đã index xong `{filename}` ({index_data.get('chunk_count', 0)} đoạn). Giờ bạn có thể hỏi chi tiết về file này.",
+                )
+        except Exception as e:
+            self.logger.error(f"RagIndexWorker job failed for doc {document_id}: {e}")
+            try:
+                await self._publish_event(job, "failed", error=str(e))
+                await self._notify_user(job, f"⚠️ Không thể index file `{filename}`. Bạn thử gửi lại sau nhé.")
+            except Exception:
+                pass
+
+    async def shutdown(self) -> None:
+        if self._reclaim_task and not self._reclaim_task.done():
+            self._reclaim_task.cancel()
+        for task in list(self._jobs):
+            task.cancel()
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+        await self.kafka_service.stop()
+        try:
+            await self.db_repo.close()
+        except Exception as e:
+            self.logger.warning(f"Failed to close RagIndexWorker DB pool cleanly: {e}")
@@ -24,11 +24,14 @@ class RedisStreamConsumer:
             payload = msg.value
     """
 
-    def __init__(self, redis: Redis, stream: str, group: str, consumer_name: str):
+    def __init__(self, redis: Redis, stream: str, group: str, consumer_name: str, read_pending: bool = True):
         self._redis = redis
         self._stream = stream
         self._group = group
         self._consumer_name = consumer_name
+        # With read_pending=False only new entries are delivered; unacked ones are left for
+        # reclaim_pending, so a consumer can hold the ack until a long job has finished.
+        self._read_pending = read_pending
         self._running = True
         self._logger = logger
 
@@ -38,12 +41,14 @@ class RedisStreamConsumer:
     async def __anext__(self) -> _RedisMsg:
         while self._running:
             try:
-                result = await self._redis.xreadgroup(
-                    self._group,
-                    self._consumer_name,
-                    {self._stream: '0'},
-                    count=1,
-                )
+                result = None
+                if self._read_pending:
+                    result = await self._redis.xreadgroup(
+                        self._group,
+                        self._consumer_name,
+                        {self._stream: '0'},
+                        count=1,
+                    )
                 if not result:
                     result = await self._redis.xreadgroup(
                         self._group,
@@ -104,11 +109,21 @@ class RedisStreamConsumer:
             self._logger.error(f"Failed to ACK entry '{entry_id}' on '{self._stream}': {e}")
             return False
 
+    async def touch(self, msg: _RedisMsg) -> bool:
+        """Reset an entry's idle time so reclaim_pending elsewhere leaves an in-progress job alone."""
+        try:
+            await self._redis.xclaim(self._stream, self._group, self._consumer_name, 0, [msg.entry_id], justid=True)
+            return True
+        except Exception as e:
+            self._logger.warning(f"Failed to refresh pending entry '{msg.entry_id}' on '{self._stream}': {e}")
+            return False
+
     async def reclaim_pending(self, min_idle_ms: int = 30000) -> list[_RedisMsg]:
         reclaimed: list[_RedisMsg] = []
         try:
             result = await self._redis.xpending(self._stream, self._group)
-            if not result or result[0] == 0:
+            pending = result.get('pending', 0) if isinstance(result, dict) else (result[0] if result else 0)
+            if not pending:
                 return reclaimed
 
             entries = await self._redis.xpending_range(
@@ -135,23 +150,23 @@ class RedisStreamConsumer:
                 self._stream, self._group, self._consumer_name, min_idle_ms, msg_ids
             )
 
-            for stream_entry in claimed:
-                _ = stream_entry[0]
-                entries_list = stream_entry[1]
-                for eid, fields in entries_list:
-                    raw_key = fields.get(b'key') or fields.get('key') or b''
-                    if isinstance(raw_key, bytes):
-                        key = raw_key.decode('utf-8')
-                    else:
-                        key = str(raw_key)
-                    raw_value = fields.get(b'value') or fields.get('value')
-                    if raw_value is None:
-                        continue
-                    if isinstance(raw_value, bytes):
-                        raw_value = raw_value.decode('utf-8')
-                    value = json.loads(str(raw_value))
-                    eid_str = eid.decode('utf-8') if isinstance(eid, bytes) else str(eid)
-                    reclaimed.append(_RedisMsg(value, key, eid_str))
+            # XCLAIM replies with (entry_id, fields) pairs; fields is empty for trimmed entries.
+            for eid, fields in claimed:
+                if not fields:
+                    continue
+                raw_key = fields.get(b'key') or fields.get('key') or b''
+                if isinstance(raw_key, bytes):
+                    key = raw_key.decode('utf-8')
+                else:
+                    key = str(raw_key)
+                raw_value = fields.get(b'value') or fields.get('value')
+                if raw_value is None:
+                    continue
+                if isinstance(raw_value, bytes):
+                    raw_value = raw_value.decode('utf-8')
+                value = json.loads(str(raw_value))
+                eid_str = eid.decode('utf-8') if isinstance(eid, bytes) else str(eid)
+                reclaimed.append(_RedisMsg(value, key, eid_str))
 
             self._logger.info(f"Reclaimed {len(reclaimed)} pending entries on '{self._stream}'")
         except Exception as e:
@@ -163,11 +178,58 @@ class RedisStreamConsumer:
         self._running = False
 
 
+class RedisStreamListener:
+    """Async iterable over new entries of a stream via plain XREAD, for fan-out events.
+
+    Every listener sees every entry published after it started. There is no consumer group,
+    so nothing is left behind in Redis when the process goes away and nothing needs acking.
+    """
+
+    def __init__(self, redis: Redis, stream: str, last_id: str = '0-0'):
+        self._redis = redis
+        self._stream = stream
+        self._last_id = last_id
+        self._running = True
+        self._logger = logger
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> _RedisMsg:
+        while self._running:
+            try:
+                result = await self._redis.xread({self._stream: self._last_id}, count=1, block=2000)
+                if not result:
+                    continue
+                for _, entries in result:
+                    for entry_id, fields in entries:
+                        eid = entry_id.decode('utf-8') if isinstance(entry_id, bytes) else str(entry_id)
+                        self._last_id = eid
+                        raw_value = fields.get(b'value') or fields.get('value')
+                        if raw_value is None:
+                            continue
+                        if isinstance(raw_value, bytes):
+                            raw_value = raw_value.decode('utf-8')
+                        raw_key = fields.get(b'key') or fields.get('key') or b''
+                        key = raw_key.decode('utf-8') if isinstance(raw_key, bytes) else str(raw_key)
+                        return _RedisMsg(json.loads(str(raw_value)), key, eid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._logger.error(f"RedisStreamListener error on '{self._stream}': {e}")
+                await asyncio.sleep(1)
+
+        raise StopAsyncIteration
+
+    async def stop(self):
+        self._running = False
+
+
 class RedisStreamService:
     """Central service managing Redis Streams producers, consumers, and message flows.
 
     Centralized message bus using Redis Streams.
-    Interface: publish(), start_producer(), start_consumer(), stop().
+    Interface: publish(), start_producer(), start_consumer(), start_listener(), stop().
     """
 
     def __init__(self, redis_url: str, client_id: str):
@@ -175,6 +237,7 @@ class RedisStreamService:
         self.client_id = client_id
         self._redis: Optional[Redis] = None
         self.consumers: Dict[str, RedisStreamConsumer] = {}
+        self.listeners: Dict[str, RedisStreamListener] = {}
         self._consumer_groups_created: set = set()
         self.logger = logger
 
@@ -198,7 +261,7 @@ class RedisStreamService:
             self._redis = None
             raise
 
-    async def start_consumer(self, stream: str, group_id: str) -> RedisStreamConsumer:
+    async def start_consumer(self, stream: str, group_id: str, read_pending: bool = True) -> RedisStreamConsumer:
         """Start a Redis Streams consumer with consumer group."""
         if self._redis is None:
             await self.start_producer()
@@ -217,11 +280,33 @@ class RedisStreamService:
             self._consumer_groups_created.add(stream)
 
         consumer_name = f"{self.client_id}-{stream}-{os.getpid()}"
-        consumer = RedisStreamConsumer(self._redis, stream, group_id, consumer_name)
+        consumer = RedisStreamConsumer(self._redis, stream, group_id, consumer_name, read_pending=read_pending)
         self.consumers[stream] = consumer
         self.logger.info(f"Redis Streams consumer started for {self.client_id} on stream '{stream}' (group: {group_id}, consumer: {consumer_name})")
         return consumer
 
+    async def start_listener(self, stream: str) -> RedisStreamListener:
+        """Start a group-less XREAD listener that sees every new entry on the stream."""
+        if self._redis is None:
+            await self.start_producer()
+            assert self._redis is not None
+
+        stream = str(stream)
+        # Pin the current tail now: '$' would be resolved on each XREAD and could skip
+        # entries published between two reads.
+        last_id = '0-0'
+        try:
+            tail = await self._redis.xrevrange(stream, count=1)
+            if tail:
+                entry_id = tail[0][0]
+                last_id = entry_id.decode('utf-8') if isinstance(entry_id, bytes) else str(entry_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to read the tail of stream '{stream}': {e}")
+        listener = RedisStreamListener(self._redis, stream, last_id=last_id)
+        self.listeners[stream] = listener
+        self.logger.info(f"Redis Streams listener started for {self.client_id} on stream '{stream}'")
+        return listener
+
     async def publish(self, stream: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
         """Publish a message to a Redis Stream with centralized logging and bounded retry."""
         if self._redis is None:
@@ -271,6 +356,9 @@ class RedisStreamService:
             except Exception as e:
                 self.logger.warning(f"Failed to stop Redis consumer for stream '{stream}': {e}")
         self.consumers.clear()
+        for listener in list(self.listeners.values()):
+            await listener.stop()
+        self.listeners.clear()
 
         if self._redis is not None:
             try:
@@ -15,15 +15,20 @@ class SearchSubtaskClient:
         self._consumer = None
         self._listener_task: Optional[asyncio.Task] = None
         self._pending: Dict[str, asyncio.Future] = {}
+        # Parallel tool calls can reach start() together; only one may create the listener.
+        self._start_lock = asyncio.Lock()
         self.logger = logger
 
     async def start(self) -> None:
         if self._listener_task and not self._listener_task.done():
             return
 
-        await self.kafka_service.start_producer()
-        self._consumer = await self.kafka_service.start_consumer("search-results", group_id=self.group_id)
-        self._listener_task = asyncio.create_task(self._listen_results())
+        async with self._start_lock:
+            if self._listener_task and not self._listener_task.done():
+                return
+            await self.kafka_service.start_producer()
+            self._consumer = await self.kafka_service.start_consumer("search-results", group_id=self.group_id)
+            self._listener_task = asyncio.create_task(self._listen_results())
 
     async def close(self) -> None:
         if self._listener_task and not self._listener_task.done():
@@ -26,6 +26,7 @@ class SearchSubtaskWorker:
             await self.shutdown()
             return
 
+        self.tools_mgr.search_engine.html_extractor.warm()
         self.logger.info("SearchSubtaskWorker started. Listening for search-subtasks...")
         try:
             async for msg in consumer:
@@ -67,4 +68,6 @@ class SearchSubtaskWorker:
         await self.kafka_service.publish("search-results", payload=response_payload, key=user_id or correlation_id)
 
     async def shutdown(self) -> None:
+        self.tools_mgr.search_engine.html_extractor.shutdown()
+        await self.tools_mgr.search_engine.shared_search_cache.close()
         await self.kafka_service.stop()
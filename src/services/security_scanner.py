@@ -0,0 +1,160 @@
+import re
+import sys
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+__all__ = ["INJECTION_PATTERNS", "SecurityScanner", "strip_hidden_chars"]
+
+INJECTION_PATTERNS = [
+    r"ignore (all|previous|prior) instructions",
+    r"disregard (all|previous|prior) instructions",
+    r"system prompt",
+    r"developer message",
+    r"tool (?:call|schema)",
+    r"jailbreak",
+    r"bypass",
+    r"role\s*:\s*system",
+    r"<system>",
+    r"</system>",
+    r"<assistant>",
+    r"</assistant>",
+    r"api key",
+    r"password",
+    r"token",
+    r"bỏ qua hướng dẫn",
+    r"bỏ qua chỉ dẫn",
+    r"bỏ qua mọi hướng dẫn",
+    r"quên (mọi )?hướng dẫn",
+    r"lệnh hệ thống",
+    r"cơ chế nội bộ",
+]
+
+SNIPPET_CHARS = 240
+COMMENT_SAMPLE_CHARS = 200
+COMMENT_SAMPLE_LIMIT = 3
+
+
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+
+def _char_class(codes: Sequence[int]) -> "re.Pattern[str]":
+    # Consecutive code points collapse into ranges, which sre matches much faster.
+    ranges: List[List[int]] = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return re.compile("[" + "".join(
+        re.escape(chr(low)) if low == high else f"{re.escape(chr(low))}-{re.escape(chr(high))}"
+        for low, high in ranges
+    ) + "]")
+
+
+@lru_cache(maxsize=1)
+def _hidden_chars() -> Tuple[Dict[int, None], "re.Pattern[str]", "re.Pattern[str]"]:
+    """Translate table plus BMP-only and full detectors for control (except \\n, \\t) and Cf characters."""
+    codes = [code for code in range(32) if chr(code) not in "\n\t"]
+    codes.extend(code for code in range(32, sys.maxunicode + 1) if unicodedata.category(chr(code)) == "Cf")
+    # A class that also holds astral code points falls back to a slow range walk per
+    # character, so text without astral characters (the common case) uses the BMP class.
+    return dict.fromkeys(codes), _char_class([c for c in codes if c <= 0xFFFF]), _char_class(codes)
+
+
+def _hidden_detector(text: str) -> Tuple[Dict[int, None], "re.Pattern[str]"]:
+    table, bmp_detector, full_detector = _hidden_chars()
+    return table, (full_detector if _ASTRAL_RE.search(text) else bmp_detector)
+
+
+def strip_hidden_chars(text: str) -> Tuple[str, int]:
+    """Remove hidden characters with a precomputed translate table; returns (cleaned, removed count)."""
+    table, detector = _hidden_detector(text)
+    if detector.search(text) is None:
+        return text, 0
+    cleaned = text.translate(table)
+    return cleaned, len(text) - len(cleaned)
+
+
+def _line_pattern(pattern: str) -> str:
+    # Blocks are newline-joined lines; whitespace classes must not let a marker span two lines.
+    return pattern.replace(r"\s", r"[^\S\n]")
+
+
+class SecurityScanner:
+    """Scans blocks of lines with one combined injection regex instead of one regex per line.
+
+    Matches are mapped back to line numbers by bisecting line start offsets, so callers still
+    get per-line labels (row, line, page) in their security reports.
+    """
+
+    def __init__(self, patterns: Iterable[str] = INJECTION_PATTERNS, max_scan_lines: int = 2000, max_suspicious_lines: int = 20):
+        unique = dict.fromkeys(_line_pattern(pattern) for pattern in patterns)
+        self._injection_re = re.compile("|".join(f"(?:{pattern})" for pattern in unique), re.IGNORECASE)
+        self._comment_re = re.compile(r"<!--[^\n]*?-->")
+        _hidden_chars()
+        self.max_scan_lines = max_scan_lines
+        self.max_suspicious_lines = max_suspicious_lines
+
+    def _matched_lines(self, pattern: "re.Pattern[str]", block: str, starts: List[int], limit: int) -> List[int]:
+        matched: List[int] = []
+        for match in pattern.finditer(block):
+            line_index = bisect_right(starts, match.start()) - 1
+            if matched and matched[-1] == line_index:
+                continue
+            matched.append(line_index)
+            if len(matched) >= limit:
+                break
+        return matched
+
+    def suspicious_line_indexes(self, lines: Sequence[str], limit: int) -> List[int]:
+        """Indexes of lines containing an injection marker, at most `limit` of them."""
+        if limit <= 0 or not lines:
+            return []
+        block = "\n".join(lines)
+        starts = [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+        return self._matched_lines(self._injection_re, block, starts, limit)
+
+    def scan_lines(self, lines: Sequence[str], label: Callable[[int], str], state: Dict[str, Any]) -> List[str]:
+        """Strip hidden characters from a block of lines and record findings in `state`.
+
+        `state` is the dict built by FileParserService._init_security_state; `label(i)` names
+        the i-th line of this block in report entries. Returns the cleaned lines.
+        """
+        cleaned_lines = list(lines)
+        block = "\n".join(lines)
+        table, detector = _hidden_detector(block)
+        if detector.search(block) is not None:
+            # Hidden characters are rare; only the lines that contain them are rewritten.
+            starts = [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+            for line_index in self._matched_lines(detector, block, starts, len(lines)):
+                cleaned = lines[line_index].translate(table)
+                state["hidden_removed"] += len(lines[line_index]) - len(cleaned)
+                cleaned_lines[line_index] = cleaned
+
+        remaining = self.max_scan_lines - state["scanned_lines"]
+        if remaining <= 0:
+            return cleaned_lines
+        scan = cleaned_lines[:remaining]
+        state["scanned_lines"] += len(scan)
+        scan_block = "\n".join(scan)
+        starts = [0, *accumulate(len(line) + 1 for line in scan[:-1])]
+
+        if "<!--" in scan_block:
+            for line_index in self._matched_lines(self._comment_re, scan_block, starts, len(scan)):
+                state["html_comment_count"] += 1
+                if len(state["html_comment_samples"]) < COMMENT_SAMPLE_LIMIT:
+                    state["html_comment_samples"].append(scan[line_index].strip()[:COMMENT_SAMPLE_CHARS])
+
+        room = self.max_suspicious_lines - len(state["suspicious_lines"])
+        if room > 0:
+            for line_index in self._matched_lines(self._injection_re, scan_block, starts, room):
+                snippet = scan[line_index].strip()
+                if len(snippet) > SNIPPET_CHARS:
+                    snippet = snippet[:SNIPPET_CHARS] + "..."
+                state["suspicious_lines"].append(f"{label(line_index)}: {snippet}")
+
+        return cleaned_lines
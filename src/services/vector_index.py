@@ -0,0 +1,245 @@
+import json
+import os
+import re
+import unicodedata
+import uuid
+import zlib
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from src.core.config import logger, RAG_VECTOR_DIR, RAG_VECTOR_DIM, RAG_VECTOR_INDEX_ENABLED
+from src.core.ttl_cache import TTLCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__all__ = ["HashingEmbedder", "VectorIndex", "get_vector_index", "reciprocal_rank_fusion"]
+
+# Rows scored per float16 -> float32 conversion, so huge shards never get copied whole.
+SCORE_BLOCK_ROWS = 8192
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold_text(text: str) -> str:
+    """Lowercase and strip diacritics, so 'tài liệu' and 'tai lieu' share features."""
+    lowered = (text or "").lower().replace("đ", "d")
+    return "".join(
+        ch for ch in unicodedata.normalize("NFD", lowered)
+        if unicodedata.category(ch) != "Mn"
+    )
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Merge several ranked id lists; ids ranked high in any list float to the top."""
+    scores = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item_id: -scores[item_id])
+
+
+class HashingEmbedder:
+    """Offline embedder: hashed word and character-trigram features, sublinear TF, L2 norm.
+
+    There is no model to load and nothing to fit, so vectors written by one process are
+    valid in every other process that uses the same name and dimension. Any object with
+    `name`, `dim` and `embed(texts) -> float32 matrix` can be swapped in.
+    """
+
+    WORD_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 0.5
+
+    def __init__(self, dim: int = 256):
+        self.dim = int(dim)
+        self.name = f"hashing-v1-{self.dim}"
+        self._token_features = lru_cache(maxsize=65536)(self._compute_token_features)
+
+    def _hash(self, feature: str) -> Tuple[int, float]:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        return digest % self.dim, sign
+
+    def _compute_token_features(self, token: str) -> Tuple[Tuple[int, float], ...]:
+        features = []
+        index, sign = self._hash(f"w:{token}")
+        features.append((index, sign * self.WORD_WEIGHT))
+        if len(token) >= 3:
+            padded = f" {token} "
+            for offset in range(len(padded) - 2):
+                index, sign = self._hash(f"c:{padded[offset:offset + 3]}")
+                features.append((index, sign * self.TRIGRAM_WEIGHT))
+        return tuple(features)
+
+    def embed(self, texts: Sequence[str]):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for token in _WORD_RE.findall(fold_text(text)):
+                counts[token] = counts.get(token, 0) + 1
+            vector = matrix[row]
+            for token, count in counts.items():
+                tf = 1.0 + np.log(count)
+                for index, weight in self._token_features(token):
+                    vector[index] += weight * tf
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                vector /= norm
+        return matrix
+
+
+class VectorIndex:
+    """One memory-mapped float16 matrix per document plus a JSON sidecar of chunk ids.
+
+    Shards are written once, after a document is indexed. Each write gets a new matrix file
+    and the sidecar names it, so replacing the sidecar swaps ids and vectors together. Search
+    is a blocked dot product against unit vectors (cosine similarity) with argpartition top-k.
+    """
+
+    def __init__(self, base_dir: str, embedder: HashingEmbedder, max_open_shards: int = 64):
+        self.base_dir = base_dir
+        self.embedder = embedder
+        self.logger = logger
+        os.makedirs(self.base_dir, exist_ok=True)
+        # Open memmaps cost only page cache, so bound them by count rather than bytes.
+        self._shards = TTLCache(
+            name="rag_vector_shards",
+            max_entries=max_open_shards,
+            default_ttl_seconds=1800,
+            sliding_ttl=True,
+            sizeof=lambda shard: 0,
+        )
+
+    def _meta_path(self, document_id: str) -> str:
+        return os.path.join(self.base_dir, f"{_SAFE_NAME_RE.sub('_', document_id)}.json")
+
+    def _read_meta(self, document_id: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(document_id), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _remove_matrix(self, meta: Optional[dict]) -> None:
+        matrix_name = os.path.basename(str((meta or {}).get("matrix") or ""))
+        if not matrix_name:
+            return
+        try:
+            os.remove(os.path.join(self.base_dir, matrix_name))
+        except FileNotFoundError:
+            pass
+
+    def write_document(self, document_id: str, chunk_ids: Sequence[str], texts: Sequence[str]) -> int:
+        if not chunk_ids:
+            return 0
+        vectors = self.embedder.embed(texts).astype(np.float16)
+        meta_path = self._meta_path(document_id)
+        # A fresh matrix name per write: readers holding the old sidecar keep the old matrix.
+        matrix_name = f"{_SAFE_NAME_RE.sub('_', document_id)}.{uuid.uuid4().hex[:12]}.f16"
+
+        matrix = np.memmap(os.path.join(self.base_dir, matrix_name), dtype=np.float16, mode="w+", shape=vectors.shape)
+        matrix[:] = vectors
+        matrix.flush()
+        del matrix
+
+        meta_tmp = f"{meta_path}.tmp"
+        with open(meta_tmp, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "embedder": self.embedder.name,
+                    "dim": self.embedder.dim,
+                    "rows": int(vectors.shape[0]),
+                    "matrix": matrix_name,
+                    "chunk_ids": list(chunk_ids),
+                },
+                handle,
+                ensure_ascii=False,
+            )
+
+        previous = self._read_meta(document_id)
+        self._shards.pop(document_id)
+        os.replace(meta_tmp, meta_path)
+        if previous and previous.get("matrix") != matrix_name:
+            self._remove_matrix(previous)
+        return len(chunk_ids)
+
+    def delete_document(self, document_id: str) -> None:
+        self._shards.pop(document_id)
+        meta = self._read_meta(document_id)
+        try:
+            os.remove(self._meta_path(document_id))
+        except FileNotFoundError:
+            pass
+        self._remove_matrix(meta)
+
+    def _load(self, document_id: str):
+        shard = self._shards.get(document_id)
+        if shard is not None:
+            return shard
+        meta = self._read_meta(document_id)
+        if meta is None:
+            return None
+        chunk_ids = meta.get("chunk_ids") or []
+        matrix_name = os.path.basename(str(meta.get("matrix") or ""))
+        if meta.get("embedder") != self.embedder.name or not chunk_ids or not matrix_name:
+            # Written by another embedder, dimension or shard layout; ignored until re-indexed.
+            return None
+        shape = (len(chunk_ids), self.embedder.dim)
+        matrix_path = os.path.join(self.base_dir, matrix_name)
+        try:
+            size = os.path.getsize(matrix_path)
+            if meta.get("rows") != shape[0] or size != shape[0] * shape[1] * np.dtype(np.float16).itemsize:
+                self.logger.warning(f"Vector shard for {document_id} does not match its sidecar; skipping")
+                return None
+            matrix = np.memmap(matrix_path, dtype=np.float16, mode="r", shape=shape)
+        except FileNotFoundError:
+            # Replaced by a concurrent write between reading the sidecar and opening the matrix.
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cannot open vector shard for {document_id}: {e}")
+            return None
+        shard = (chunk_ids, matrix)
+        self._shards.set(document_id, shard)
+        return shard
+
+    def search(self, query: str, document_ids: Iterable[str], top_k: int = 5) -> List[Tuple[str, float]]:
+        """Return (chunk_id, cosine) pairs for the best top_k chunks across the given documents."""
+        query_vector = self.embedder.embed([query])[0]
+        if not query_vector.any():
+            return []
+
+        all_ids: List[str] = []
+        all_scores = []
+        for document_id in document_ids:
+            shard = self._load(document_id)
+            if shard is None:
+                continue
+            chunk_ids, matrix = shard
+            for start in range(0, len(chunk_ids), SCORE_BLOCK_ROWS):
+                block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+                all_scores.append(block @ query_vector)
+            all_ids.extend(chunk_ids)
+
+        if not all_ids:
+            return []
+        scores = np.concatenate(all_scores)
+        k = min(max(1, top_k), len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(all_ids[i], float(scores[i])) for i in top]
+
+
+_vector_index_instance: Optional[VectorIndex] = None
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """Shared index, or None when the feature is disabled or NumPy is not installed."""
+    global _vector_index_instance
+    if not RAG_VECTOR_INDEX_ENABLED or np is None:
+        return None
+    if _vector_index_instance is None:
+        _vector_index_instance = VectorIndex(RAG_VECTOR_DIR, HashingEmbedder(dim=RAG_VECTOR_DIM))
+    return _vector_index_instance
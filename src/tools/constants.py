@@ -3,6 +3,11 @@ from typing import Dict, List, Set, Tuple
 
 CACHE_TTL_SECONDS = 3600
 MAX_CACHE_SIZE = 1000
+SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DEEP_READ_CACHE_MAX_ENTRIES = 512
+DEEP_READ_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEEP_READ_MAX_HTML_BYTES = 2 * 1024 * 1024
+IMAGE_RECOGNITION_CACHE_MAX_BYTES = 8 * 1024 * 1024
 MAX_FILE_SIZE_BYTES = 20 * 1024 * 1024
 MAX_TEXT_LENGTH = 10000
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
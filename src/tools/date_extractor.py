@@ -0,0 +1,164 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import dateparser
+
+from src.core.ttl_cache import TTLCache
+
+
+__all__ = ["FastDateExtractor", "get_date_extractor"]
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH_NAME = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+
+_UNIT_SECONDS = {
+    "giây": 1, "phút": 60, "giờ": 3600, "tiếng": 3600, "ngày": 86400,
+    "tuần": 7 * 86400, "tháng": 30 * 86400, "năm": 365 * 86400,
+    "sec": 1, "second": 1, "min": 60, "minute": 60, "hr": 3600, "hour": 3600,
+    "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400,
+}
+_RELATIVE_WORDS = {
+    "vừa xong": 0, "just now": 0, "hôm nay": 0, "today": 0,
+    "hôm qua": 86400, "yesterday": 86400, "hôm kia": 2 * 86400,
+    "tuần trước": 7 * 86400, "last week": 7 * 86400,
+    "tháng trước": 30 * 86400, "last month": 30 * 86400,
+    "năm ngoái": 365 * 86400, "last year": 365 * 86400,
+}
+
+# One alternation, so every date-like span in a snippet is found in a single scan.
+_DATE_RE = re.compile(
+    r"\b(?P<vi_rel>\d{1,3})\s*(?P<vi_unit>giây|phút|giờ|tiếng|ngày|tuần|tháng|năm)\s+trước"
+    r"|\b(?P<en_rel>\d{1,3}|an?|one)\s+(?P<en_unit>sec|second|min|minute|hr|hour|day|week|month|year)s?\s+ago"
+    r"|\b(?P<rel_word>" + "|".join(_RELATIVE_WORDS) + r")\b"
+    r"|\b(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})\b"
+    r"|\b(?P<num_a>\d{1,2})[/.-](?P<num_b>\d{1,2})[/.-](?P<num_y>\d{4})\b"
+    r"|\bngày\s+(?P<vi_d>\d{1,2})\s+tháng\s+(?P<vi_m>\d{1,2})(?:\s*(?:năm|,)\s*(?P<vi_y>\d{4}))?"
+    r"|\b(?P<vi_d2>\d{1,2})\s+tháng\s+(?P<vi_m2>\d{1,2}),?\s+(?P<vi_y2>\d{4})\b"
+    rf"|\b(?P<en_m>{_MONTH_NAME})\s+(?P<en_d>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<en_y>\d{{4}})\b"
+    rf"|\b(?P<en_d2>\d{{1,2}})\s+(?P<en_m2>{_MONTH_NAME}),?\s+(?P<en_y2>\d{{4}})\b",
+    re.IGNORECASE,
+)
+
+# dateparser parses whole strings; beyond this length it practically never finds a date
+# that the regex missed, so longer snippets skip the fallback.
+FALLBACK_MAX_CHARS = 80
+
+# A parsed span: ("abs", datetime) for calendar dates, ("rel", seconds before now) otherwise.
+_Spec = Tuple[str, object]
+
+
+def _calendar(year: int, month: int, day: int) -> Optional[_Spec]:
+    try:
+        return "abs", datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+def _spec_from_match(match: "re.Match[str]") -> Optional[_Spec]:
+    group = match.groupdict()
+    if group["vi_rel"]:
+        return "rel", int(group["vi_rel"]) * _UNIT_SECONDS[group["vi_unit"].lower()]
+    if group["en_rel"]:
+        amount = group["en_rel"].lower()
+        count = int(amount) if amount.isdigit() else 1
+        return "rel", count * _UNIT_SECONDS[group["en_unit"].lower()]
+    if group["rel_word"]:
+        return "rel", _RELATIVE_WORDS[group["rel_word"].lower()]
+    if group["iso_y"]:
+        return _calendar(int(group["iso_y"]), int(group["iso_m"]), int(group["iso_d"]))
+    if group["num_y"]:
+        first, second = int(group["num_a"]), int(group["num_b"])
+        # Day first (Vietnamese), unless only the month-first reading is a valid date.
+        if second > 12 >= first:
+            first, second = second, first
+        return _calendar(int(group["num_y"]), second, first)
+    if group["vi_d"]:
+        year = int(group["vi_y"]) if group["vi_y"] else datetime.now().year
+        return _calendar(year, int(group["vi_m"]), int(group["vi_d"]))
+    if group["vi_d2"]:
+        return _calendar(int(group["vi_y2"]), int(group["vi_m2"]), int(group["vi_d2"]))
+    if group["en_m"]:
+        return _calendar(int(group["en_y"]), _MONTHS[group["en_m"][:3].lower()], int(group["en_d"]))
+    if group["en_m2"]:
+        return _calendar(int(group["en_y2"]), _MONTHS[group["en_m2"][:3].lower()], int(group["en_d2"]))
+    return None
+
+
+@lru_cache(maxsize=8192)
+def _regex_spec(text: str) -> Optional[_Spec]:
+    # Calendar dates beat relative ones: "giá vàng hôm nay 12/3/2021" is dated 12/3/2021.
+    relative: Optional[_Spec] = None
+    for match in _DATE_RE.finditer(text):
+        spec = _spec_from_match(match)
+        if spec is None:
+            continue
+        if spec[0] == "abs":
+            return spec
+        if relative is None:
+            relative = spec
+    return relative
+
+
+class FastDateExtractor:
+    """Finds the first Vietnamese/English calendar date in a snippet with one precompiled
+    regex, or else the first relative one ("3 giờ trước", "hôm nay").
+
+    Matches are memoized as specs (calendar date, or seconds before now), so relative dates
+    stay correct however long they are cached. Short texts with no match fall back to
+    dateparser, whose answers are cached for a few minutes only since they may be relative.
+    """
+
+    def __init__(self, fallback: bool = True, fallback_max_chars: int = FALLBACK_MAX_CHARS):
+        self.fallback = fallback
+        self.fallback_max_chars = fallback_max_chars
+        self._fallback_cache = TTLCache(
+            "date_extractor.fallback", max_entries=2048, default_ttl_seconds=300, sizeof=lambda _: 0,
+        )
+
+    def parse_regex(self, text: str) -> Optional[datetime]:
+        spec = _regex_spec(text) if text else None
+        if spec is None:
+            return None
+        kind, value = spec
+        if kind == "rel":
+            return datetime.now() - timedelta(seconds=value)
+        return value
+
+    def _parse_fallback(self, text: str) -> Optional[datetime]:
+        cached = self._fallback_cache.get(text)
+        if cached is None:
+            try:
+                parsed = dateparser.parse(text, languages=['vi', 'en'])
+            except Exception:
+                parsed = None
+            cached = (parsed,)
+            self._fallback_cache.set(text, cached)
+        return cached[0]
+
+    def extract(self, text: str) -> Optional[datetime]:
+        if not text:
+            return None
+        parsed = self.parse_regex(text)
+        if parsed is not None:
+            return parsed
+        if self.fallback and len(text) <= self.fallback_max_chars and any(ch.isdigit() for ch in text):
+            return self._parse_fallback(text)
+        return None
+
+
+_date_extractor_instance: Optional[FastDateExtractor] = None
+
+
+def get_date_extractor() -> FastDateExtractor:
+    global _date_extractor_instance
+    if _date_extractor_instance is None:
+        _date_extractor_instance = FastDateExtractor()
+    return _date_extractor_instance
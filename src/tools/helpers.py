@@ -1,12 +1,14 @@
 import re
 import unicodedata
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 import dateparser
 
+from src.tools.date_extractor import get_date_extractor
 from src.tools.constants import (
     SEARCH_CACHE_PHRASE_ALIASES,
     SEARCH_CACHE_TOKEN_ALIASES,
@@ -15,21 +17,83 @@ from src.tools.constants import (
 )
 
 
+_HTML_BOILERPLATE_RE = re.compile(
+    r"\b(cookie policy|accept cookies|subscribe|advertisement|all rights reserved)\b",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_NON_KEY_CHARS_RE = re.compile(r"[^a-z0-9_\s]")
+
+
+def _phrases_interact(aliases: Sequence[Tuple[str, str]]) -> bool:
+    """True if applying the aliases one by one could differ from a single simultaneous pass.
+
+    That happens when one source phrase contains or overlaps another (word-wise), or when a
+    replacement introduces a word that some source phrase could then match.
+    """
+    sources = [tuple(src.split()) for src, _ in aliases]
+    source_words = {word for words in sources for word in words}
+    if any(word in source_words for _, dst in aliases for word in dst.split()):
+        return True
+    for a in sources:
+        for b in sources:
+            if a == b:
+                continue
+            if any(a[i:i + len(b)] == b for i in range(len(a) - len(b) + 1)):
+                return True
+            if any(a[-k:] == b[:k] for k in range(1, min(len(a), len(b)))):
+                return True
+    return False
+
+
+def _compile_phrase_aliases(aliases: Sequence[Tuple[str, str]]) -> Callable[[str], str]:
+    """One alternation regex plus a replacement dict for SEARCH_CACHE_PHRASE_ALIASES.
+
+    Falls back to the ordered per-alias substitutions (precompiled) when the aliases interact,
+    so the result always matches applying them in list order.
+    """
+    if not aliases:
+        return lambda text: text
+    if _phrases_interact(aliases):
+        compiled = [(re.compile(rf"\b{re.escape(src)}\b"), dst) for src, dst in aliases]
+
+        def _sequential(text: str) -> str:
+            for pattern, dst in compiled:
+                text = pattern.sub(dst, text)
+            return text
+
+        return _sequential
+    replacements: Dict[str, str] = {}
+    for src, dst in aliases:
+        replacements.setdefault(src, dst)
+    alternation = "|".join(re.escape(src) for src in sorted(replacements, key=len, reverse=True))
+    pattern = re.compile(rf"\b(?:{alternation})\b")
+    return lambda text: pattern.sub(lambda match: replacements[match.group(0)], text)
+
+
+_apply_phrase_aliases = _compile_phrase_aliases(SEARCH_CACHE_PHRASE_ALIASES)
+
+# Subtrees dropped before picking the main content element.
+HTML_SKIP_TAGS = ("script", "style", "noscript", "svg", "form", "button", "header", "footer", "nav", "aside")
+
+
 class HtmlParser:
     """Extract main text content from HTML using BeautifulSoup/lxml."""
 
+    @staticmethod
+    def clean_main_text(text: str) -> str:
+        text = _HTML_BOILERPLATE_RE.sub(" ", text)
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
     @staticmethod
     def extract_main_text(html_text: str) -> str:
         soup = BeautifulSoup(html_text, 'lxml')
-        for tag in soup(["script", "style", "noscript", "svg", "form", "button", "header", "footer", "nav", "aside"]):
+        for tag in soup(list(HTML_SKIP_TAGS)):
             tag.decompose()
         content = soup.find("article") or soup.find("main") or soup.body
         if not content:
             return ""
-        text = content.get_text(separator=' ')
-        text = re.sub(r"\b(cookie policy|accept cookies|subscribe|advertisement|all rights reserved)\b", " ", text, flags=re.IGNORECASE)
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        return HtmlParser.clean_main_text(content.get_text(separator=' '))
 
 
 class DateParser:
@@ -44,6 +108,11 @@ class DateParser:
         except Exception:
             return None
 
+    @staticmethod
+    def extract_date_cached(text: str) -> Optional[datetime]:
+        """First date in a snippet via the memoized regex extractor; dateparser only as a fallback."""
+        return get_date_extractor().extract(text)
+
 
 class TextProcessor:
     """Text normalization and matching utilities."""
@@ -55,15 +124,19 @@ class TextProcessor:
 
     @staticmethod
     def canonicalize_search_query(query: str) -> str:
+        """Order-insensitive cache key for a query; memoized since every cache get/set needs it."""
+        return _canonicalize_search_query(query or "")
+
+    @staticmethod
+    def _canonicalize_uncached(query: str) -> str:
         lowered = (query or "").strip().lower()
         lowered = lowered.replace("[force fallback]", " ")
         lowered = TextProcessor.remove_diacritics(lowered)
 
-        for src, dst in SEARCH_CACHE_PHRASE_ALIASES:
-            lowered = re.sub(rf"\b{re.escape(src)}\b", dst, lowered)
+        lowered = _apply_phrase_aliases(lowered)
 
-        lowered = re.sub(r"[^a-z0-9_\s]", " ", lowered)
-        lowered = re.sub(r"\s+", " ", lowered).strip()
+        lowered = _NON_KEY_CHARS_RE.sub(" ", lowered)
+        lowered = _WHITESPACE_RE.sub(" ", lowered).strip()
         if not lowered:
             return ""
 
@@ -115,6 +188,33 @@ class TextProcessor:
         overlap = len(set(q_tokens).intersection(set(t_tokens)))
         return round(overlap / len(q_tokens), 3)
 
+    @staticmethod
+    def split_message_text(text: str, limit: int = 1800) -> List[str]:
+        """Split text into Discord-sized chunks, preferring newline then space boundaries."""
+        chunks = []
+        current_text = (text or "").strip()
+
+        while len(current_text) > limit:
+            split_idx = current_text.rfind('\n', 0, limit)
+            if split_idx == -1:
+                split_idx = current_text.rfind(' ', 0, limit)
+            if split_idx == -1 or split_idx <= 0:
+                split_idx = limit
+
+            chunk = current_text[:split_idx].strip()
+            if chunk:
+                chunks.append(chunk)
+            current_text = current_text[split_idx:].strip()
+
+        if current_text:
+            chunks.append(current_text)
+        return chunks
+
+
+@lru_cache(maxsize=4096)
+def _canonicalize_search_query(query: str) -> str:
+    return TextProcessor._canonicalize_uncached(query)
+
 
 class UrlUtils:
     """URL and domain normalization utilities."""
@@ -0,0 +1,174 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+from src.core.config import logger
+from src.tools.helpers import HTML_SKIP_TAGS, HtmlParser
+
+EXTRACTION_BACKENDS = ("thread", "process")
+EXTRACTION_PARSERS = ("stream", "soup")
+
+FEED_CHUNK_CHARS = 32 * 1024
+# Extra characters collected past max_chars so boilerplate removal cannot leave us short.
+STREAM_MARGIN_CHARS = 256
+
+_SKIP_TAGS = frozenset(HTML_SKIP_TAGS)
+_SCOPES = ("article", "main", "body")
+
+
+class _MainTextTarget:
+    """lxml parser target that keeps article/main/body text and flags when parsing can stop.
+
+    Mirrors HtmlParser.extract_main_text: skipped subtrees are ignored and the first
+    <article> wins over the first <main>, which wins over <body>. Parsing stops once the
+    first article is complete or full. A <main> that completes or fills up before any
+    article is also accepted, so a later "related stories" <article> cannot outrank it;
+    that is the one deliberate difference from the soup parser. Once done, later tags are
+    ignored, and close() returns the highest-priority scope that actually collected text.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.skip_depth = 0
+        self.depth: Dict[str, int] = {scope: 0 for scope in _SCOPES}
+        self.seen: Dict[str, bool] = {scope: False for scope in _SCOPES}
+        self.closed: Dict[str, bool] = {scope: False for scope in _SCOPES}
+        self.parts: Dict[str, List[str]] = {scope: [] for scope in _SCOPES}
+        self.sizes: Dict[str, int] = {scope: 0 for scope in _SCOPES}
+        self.done = False
+
+    def start(self, tag, attrib) -> None:
+        if self.done:
+            return
+        if self.skip_depth or tag in _SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag in self.depth and not self.closed[tag]:
+            self.depth[tag] += 1
+            self.seen[tag] = True
+
+    def end(self, tag) -> None:
+        if self.done:
+            return
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        if tag in self.depth and self.depth[tag] > 0:
+            self.depth[tag] -= 1
+            if self.depth[tag] == 0:
+                self.closed[tag] = True
+                if tag == "article" or (tag == "main" and not self.seen["article"]):
+                    self.done = True
+
+    def data(self, text: str) -> None:
+        if self.skip_depth or self.done:
+            return
+        size = len(" ".join(text.split()))
+        if not size:
+            return
+        for scope in _SCOPES:
+            if self.depth[scope] > 0 and self.sizes[scope] < self.budget:
+                self.parts[scope].append(text)
+                self.sizes[scope] += size + 1
+        if self.sizes["article"] >= self.budget:
+            self.done = True
+        elif not self.seen["article"] and self.sizes["main"] >= self.budget:
+            self.done = True
+
+    def close(self) -> str:
+        for scope in _SCOPES:
+            if self.parts[scope]:
+                return HtmlParser.clean_main_text(" ".join(self.parts[scope]))
+        return ""
+
+
+def extract_main_text_streaming(html_text: str, max_chars: int) -> str:
+    """Feed the page to lxml incrementally and stop once max_chars of main text is known."""
+    target = _MainTextTarget(budget=max_chars + STREAM_MARGIN_CHARS)
+    parser = etree.HTMLParser(target=target, recover=True, no_network=True)
+    for offset in range(0, len(html_text), FEED_CHUNK_CHARS):
+        parser.feed(html_text[offset:offset + FEED_CHUNK_CHARS])
+        if target.done:
+            break
+    try:
+        text = parser.close()
+    except etree.LxmlError:
+        text = target.close()
+    return (text or "")[:max_chars]
+
+
+def extract_main_text(html_text: str, max_chars: int, parser: str = "stream") -> str:
+    """Module-level entry point so process-pool workers can unpickle it."""
+    if not html_text:
+        return ""
+    if parser == "soup":
+        return HtmlParser.extract_main_text(html_text)[:max_chars]
+    return extract_main_text_streaming(html_text, max_chars)
+
+
+def _warm_worker() -> None:
+    # Pay the import and first-parse cost when the worker starts, not on the first page.
+    extract_main_text("<html><body><article><p>warm</p></article></body></html>", 16)
+
+
+def _noop() -> None:
+    return None
+
+
+class HtmlExtractor:
+    """Runs main-text extraction on a thread or a pool of warm worker processes."""
+
+    def __init__(self, backend: str = "thread", parser: str = "stream", workers: int = 2):
+        self.logger = logger
+        if backend not in EXTRACTION_BACKENDS:
+            self.logger.warning(f"Unknown HTML extraction backend '{backend}', using 'thread'.")
+            backend = "thread"
+        if parser not in EXTRACTION_PARSERS:
+            self.logger.warning(f"Unknown HTML extraction parser '{parser}', using 'stream'.")
+            parser = "stream"
+        self.backend = backend
+        self.parser = parser
+        self.workers = max(1, int(workers))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.backend != "process":
+            return None
+        if self._executor is None:
+            # spawn, not fork: forking a process that runs an event loop and helper threads
+            # can copy held locks into the child.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def warm(self) -> None:
+        """Start every worker process now so the first search does not pay for spawning."""
+        executor = self._get_executor()
+        if executor is None:
+            return
+        for _ in range(self.workers):
+            executor.submit(_noop)
+
+    async def extract(self, html_text: str, max_chars: int) -> str:
+        executor = self._get_executor()
+        if executor is not None:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, extract_main_text, html_text, max_chars, self.parser)
+            except BrokenProcessPool as e:
+                self.logger.warning(f"HTML extraction process pool broke ({e}); switching to thread backend.")
+                self.shutdown()
+                self.backend = "thread"
+        return await asyncio.to_thread(extract_main_text, html_text, max_chars, self.parser)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
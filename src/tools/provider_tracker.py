@@ -0,0 +1,92 @@
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+
+__all__ = ["ProviderTracker"]
+
+
+class _ProviderWindow:
+    __slots__ = ("latencies", "success_rate", "calls", "failures", "last_seen")
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        # Optimistic start so an untried provider is not ranked below one that is failing.
+        self.success_rate = 1.0
+        self.calls = 0
+        self.failures = 0
+        self.last_seen = 0.0
+
+
+class ProviderTracker:
+    """Online latency/success stats per search provider.
+
+    Latency is the median of the last `window` calls; success is an exponentially weighted
+    rate. Both feed the hedge delay for the primary provider and the ranking of fallbacks.
+    """
+
+    def __init__(self, window: int = 50, success_alpha: float = 0.2, min_samples: int = 5, prior_latency_seconds: float = 2.0):
+        self.window = max(5, int(window))
+        self.success_alpha = min(1.0, max(0.01, float(success_alpha)))
+        self.min_samples = max(1, int(min_samples))
+        self.prior_latency_seconds = max(0.01, float(prior_latency_seconds))
+        self._providers: Dict[str, _ProviderWindow] = {}
+
+    def _get(self, provider: str) -> _ProviderWindow:
+        stats = self._providers.get(provider)
+        if stats is None:
+            stats = _ProviderWindow(self.window)
+            self._providers[provider] = stats
+        return stats
+
+    def record(self, provider: str, latency_seconds: float, success: bool) -> None:
+        stats = self._get(provider)
+        stats.latencies.append(max(0.0, latency_seconds))
+        stats.success_rate += self.success_alpha * ((1.0 if success else 0.0) - stats.success_rate)
+        stats.calls += 1
+        if not success:
+            stats.failures += 1
+        stats.last_seen = time.time()
+
+    def p50(self, provider: str) -> Optional[float]:
+        """Median latency, or None until min_samples calls have been recorded."""
+        stats = self._providers.get(provider)
+        if stats is None or len(stats.latencies) < self.min_samples:
+            return None
+        return statistics.median(stats.latencies)
+
+    def success_rate(self, provider: str) -> float:
+        stats = self._providers.get(provider)
+        return stats.success_rate if stats is not None else 1.0
+
+    def score(self, provider: str) -> float:
+        """Expected useful answers per second: success rate over median latency."""
+        latency = self.p50(provider)
+        if latency is None:
+            latency = self.prior_latency_seconds
+        return self.success_rate(provider) / max(0.05, latency)
+
+    def rank(self, providers: Iterable[str]) -> List[str]:
+        """Providers by descending score; ties keep the caller's order."""
+        ordered = list(providers)
+        return sorted(ordered, key=lambda name: (-self.score(name), ordered.index(name)))
+
+    def hedge_delay(self, provider: str, min_seconds: float, max_seconds: float) -> float:
+        """How long to wait on `provider` before hedging; max_seconds until its p50 is known."""
+        latency = self.p50(provider)
+        if latency is None:
+            return max_seconds
+        return min(max_seconds, max(min_seconds, latency))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "success_rate": round(stats.success_rate, 4),
+                "p50_ms": round(statistics.median(stats.latencies) * 1000, 1) if stats.latencies else None,
+                "score": round(self.score(name), 4),
+            }
+            for name, stats in self._providers.items()
+        }
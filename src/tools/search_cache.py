@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import struct
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from redis.asyncio import Redis  # type: ignore[reportMissingImports]
+
+from src.core.config import logger
+
+
+__all__ = ["RedisSearchCache"]
+
+
+def _ratio(hits: int, misses: int) -> float:
+    lookups = hits + misses
+    return round(hits / lookups, 4) if lookups else 0.0
+
+
+class RedisSearchCache:
+    """Second cache tier for formatted search results, shared by every worker through Redis.
+
+    Entries are (value, fresh_until, stale_until) like the in-process tier. The value is
+    zlib-compressed behind a fresh_until header and stored with SET PX until stale_until, so
+    Redis drops it exactly when the in-process copy would. Failed-query cooldowns are
+    mirrored as plain expiring keys.
+    While Redis is unreachable every call degrades to a miss / no-op for REDIS_RETRY_SECONDS.
+    """
+
+    REDIS_RETRY_SECONDS = 30.0
+    KEY_VERSION = "v2"
+    _HEADER = struct.Struct("!d")
+
+    def __init__(self, redis_url: str, namespace: str = "azuris:search_cache", enabled: bool = True, compress_level: int = 6):
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self.enabled = bool(enabled and redis_url)
+        self.compress_level = max(1, min(9, int(compress_level)))
+        self.logger = logger
+        self._redis: Optional[Redis] = None
+        self._connect_lock = asyncio.Lock()
+        self._redis_retry_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _key(self, kind: str, normalized_key: str) -> str:
+        # Normalized queries can be long; a digest keeps Redis keys short and uniform.
+        digest = hashlib.sha1(normalized_key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{self.KEY_VERSION}:{kind}:{digest}"
+
+    async def _client(self) -> Optional[Redis]:
+        if not self.enabled or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is not None:
+            return self._redis
+        async with self._connect_lock:
+            if self._redis is None:
+                client = Redis.from_url(
+                    self.redis_url,
+                    decode_responses=False,
+                    socket_connect_timeout=3,
+                    socket_timeout=5,
+                )
+                try:
+                    await asyncio.wait_for(client.ping(), timeout=5)
+                except BaseException:
+                    await client.close()
+                    raise
+                self._redis = client
+                self.logger.info(f"Search cache '{self.namespace}' using Redis tier")
+        return self._redis
+
+    async def _disable_redis(self, error: Exception) -> None:
+        self.errors += 1
+        self.logger.warning(
+            f"Search cache '{self.namespace}' Redis unavailable, using in-process cache only "
+            f"for {self.REDIS_RETRY_SECONDS:.0f}s: {error}"
+        )
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+        client, self._redis = self._redis, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    async def get(self, normalized_key: str) -> Optional[Tuple[str, float, float]]:
+        """(value, fresh_until, stale_until) for a cached result, or None on a miss."""
+        try:
+            client = await self._client()
+            if client is None:
+                return None
+            async with client.pipeline(transaction=False) as pipe:
+                key = self._key("result", normalized_key)
+                payload, ttl_ms = await pipe.get(key).pttl(key).execute()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._disable_redis(e)
+            return None
+        # PTTL is -1 for keys without expiry and -2 if the key vanished between the two reads.
+        if payload is None or int(ttl_ms) <= 0:
+            self.misses += 1
+            return None
+        try:
+            (fresh_until,) = self._HEADER.unpack_from(payload)
+            value = zlib.decompress(payload[self._HEADER.size:]).decode("utf-8")
+        except (struct.error, zlib.error, UnicodeDecodeError) as e:
+            self.logger.warning(f"Dropping unreadable search cache entry for key={normalized_key[:80]}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, fresh_until, time.time() + int(ttl_ms) / 1000.0
+
+    async def set(self, normalized_key: str, entry: Tuple[str, float, float]) -> None:
+        value, fresh_until, stale_until = entry
+        ttl_ms = int((stale_until - time.time()) * 1000)
+        if ttl_ms <= 0 or not value:
+            return
+        raw = value.encode("utf-8")
+        payload = self._HEADER.pack(fresh_until) + zlib.compress(raw, self.compress_level)
+        try:
+            client = await self._client()
+            if client is None:
+                return
+            await client.set(self._key("result", normalized_key), payload, px=ttl_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._disable_redis(e)
+            return
+        self.writes += 1
+        self.raw_bytes += len(raw)
+        self.stored_bytes += len(payload)
+
+    async def get_cooldown(self, normalized_key: str) -> float:
+        """Wall-clock time until which the query is cooling down in any worker, 0 if none."""
+        try:
+            client = await self._client()
+            if client is None:
+                return 0.0
+            ttl_ms = int(await client.pttl(self._key("cooldown", normalized_key)))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._disable_redis(e)
+            return 0.0
+        return time.time() + ttl_ms / 1000.0 if ttl_ms > 0 else 0.0
+
+    async def set_cooldown(self, normalized_key: str, seconds: int) -> None:
+        if seconds <= 0:
+            return
+        try:
+            client = await self._client()
+            if client is not None:
+                await client.set(self._key("cooldown", normalized_key), b"1", px=int(seconds * 1000))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._disable_redis(e)
+
+    async def clear_cooldown(self, normalized_key: str) -> None:
+        try:
+            client = await self._client()
+            if client is not None:
+                await client.delete(self._key("cooldown", normalized_key))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._disable_redis(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "available": self.enabled and time.monotonic() >= self._redis_retry_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": _ratio(self.hits, self.misses),
+            "writes": self.writes,
+            "errors": self.errors,
+            "compression_ratio": round(self.stored_bytes / self.raw_bytes, 4) if self.raw_bytes else 0.0,
+        }
+
+    async def close(self) -> None:
+        client, self._redis = self._redis, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception:
+                pass
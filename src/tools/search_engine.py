@@ -4,9 +4,9 @@ import os
 import re
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Set, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 try:
     from ddgs import DDGS
@@ -15,12 +15,85 @@ except ImportError:
 
 from src.core.config import logger, SERPAPI_API_KEY, TAVILY_API_KEY, EXA_API_KEY
 from src.tools.helpers import (
-    HtmlParser,
     DateParser,
     TextProcessor,
     UrlUtils,
 )
-from src.tools.constants import SEARCH_TOPICS, MAX_CACHE_SIZE
+from src.core.ttl_cache import TTLCache
+from src.core.http_client import get_http_client
+from src.tools.search_cache import RedisSearchCache
+from src.tools.provider_tracker import ProviderTracker
+from src.tools.html_extractor import HtmlExtractor
+from src.tools.constants import (
+    SEARCH_TOPICS,
+    MAX_CACHE_SIZE,
+    SEARCH_CACHE_MAX_BYTES,
+    DEEP_READ_CACHE_MAX_ENTRIES,
+    DEEP_READ_CACHE_MAX_BYTES,
+    DEEP_READ_MAX_HTML_BYTES,
+)
+
+_HIGH_REPUTATION_DOMAINS = frozenset({
+    "reuters.com", "apnews.com", "bbc.com", "bbc.co.uk", "nytimes.com",
+    "wsj.com", "bloomberg.com", "npr.org", "theguardian.com",
+    "nature.com", "science.org", "sciencedaily.com",
+    "who.int", "cdc.gov", "nih.gov",
+    "wikipedia.org", "britannica.com",
+})
+_MEDIUM_REPUTATION_DOMAINS = frozenset({
+    "forbes.com", "cnn.com", "washingtonpost.com", "economist.com",
+    "techcrunch.com", "theverge.com", "wired.com", "arstechnica.com",
+    "ign.com", "gamespot.com", "polygon.com",
+    "imdb.com", "rottentomatoes.com",
+    "github.com", "stackoverflow.com",
+    "medium.com", "substack.com",
+})
+_BARE_SCHEME_RE = re.compile(r'https?://(?!www\.)')
+_SOCIAL_DOMAINS = ("pinterest", "facebook", "instagram", "tiktok")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PIPE_SPACING_RE = re.compile(r"\s*\|\s*")
+
+
+@lru_cache(maxsize=256)
+def _query_terms(query: str) -> Tuple[str, ...]:
+    return tuple(t for t in query.lower().strip().split() if len(t) > 2)
+
+
+def _keyword_matcher(keywords: Tuple[str, ...]):
+    """Count of keywords occurring in a text, like sum(kw in text) but in one regex scan.
+
+    A lookahead alternation reports every keyword occurrence at every position as long as no
+    keyword starts with another one; otherwise two keywords could share a start and the
+    shorter would be missed, so those sets keep the per-keyword loop.
+    """
+    if not keywords:
+        return lambda text: 0
+    if any(a != b and b.startswith(a) for a in keywords for b in keywords):
+        return lambda text: sum(1 for kw in keywords if kw in text)
+    pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+    return lambda text: len({match.group(1) for match in pattern.finditer(text)})
+
+
+class _RecordFeatures:
+    """Per-record text features shared by scoring, reranking and quality checks."""
+
+    __slots__ = ("title", "snippet", "domain", "combined")
+
+    def __init__(self, record: Dict[str, str]):
+        self.snippet = (record.get("snippet") or "").strip().lower()
+        self.title = (record.get("title") or "").strip().lower()
+        self.domain = (record.get("domain") or "").lower()
+        self.combined = f"{self.title} {self.snippet}"
+
+    def combined_for_date(self) -> str:
+        return f"{self.snippet} {self.title}"
+
+
+_DEEP_READ_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (ChadGibitiBot/1.0)",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.8,vi;q=0.7",
+}
 
 
 class SearchEngine:
@@ -45,6 +118,18 @@ class SearchEngine:
         time_sensitive_min_quality_sources: int = 2,
         exa_use_autoprompt: bool = False,
         google_search_streams: int = 1,
+        html_extraction_backend: str = "thread",
+        html_extraction_parser: str = "stream",
+        html_extraction_workers: int = 2,
+        search_redis_cache_enabled: bool = False,
+        search_redis_cache_url: str = "",
+        search_redis_cache_prefix: str = "azuris:search_cache",
+        search_stale_while_revalidate: bool = True,
+        search_general_fresh_ttl_seconds: int = 1800,
+        search_time_sensitive_fresh_ttl_seconds: int = 60,
+        search_hedge_enabled: bool = True,
+        search_hedge_min_delay_ms: int = 300,
+        search_hedge_max_delay_ms: int = 3000,
     ):
         self.logger = logger_override or logger
         self.search_web_mode = search_web_mode
@@ -57,19 +142,49 @@ class SearchEngine:
         self.search_time_sensitive_cache_ttl_seconds = search_time_sensitive_cache_ttl_seconds
         self.search_failed_query_cooldown_seconds = search_failed_query_cooldown_seconds
         self.search_empty_evidence_cache_ttl_seconds = search_empty_evidence_cache_ttl_seconds
+        self.search_stale_while_revalidate = search_stale_while_revalidate
+        self.search_general_fresh_ttl_seconds = search_general_fresh_ttl_seconds
+        self.search_time_sensitive_fresh_ttl_seconds = search_time_sensitive_fresh_ttl_seconds
+        self.search_hedge_enabled = search_hedge_enabled
+        self.search_hedge_min_delay_ms = search_hedge_min_delay_ms
+        self.search_hedge_max_delay_ms = max(search_hedge_min_delay_ms, search_hedge_max_delay_ms)
+        self.provider_tracker = ProviderTracker()
+        # Hedge losers keep running to completion so their latency is still recorded.
+        self._background_tasks: Set[asyncio.Task] = set()
         self.fallback_provider_limit = fallback_provider_limit
         self.intent_batch_size = intent_batch_size
         self.min_quality_sources = min_quality_sources
         self.time_sensitive_min_quality_sources = time_sensitive_min_quality_sources
         self.exa_use_autoprompt = exa_use_autoprompt
         self.google_search_streams = google_search_streams
+        self.html_extractor = HtmlExtractor(
+            backend=html_extraction_backend,
+            parser=html_extraction_parser,
+            workers=html_extraction_workers,
+        )
 
-        self.web_search_cache: Dict[str, Any] = {}
-        self.deep_read_cache: Dict[str, Any] = {}
+        self.web_search_cache = TTLCache(
+            "search_engine.web_search",
+            max_entries=MAX_CACHE_SIZE,
+            default_ttl_seconds=search_general_cache_ttl_seconds,
+            max_bytes=SEARCH_CACHE_MAX_BYTES,
+        )
+        self.deep_read_cache = TTLCache(
+            "search_engine.deep_read",
+            max_entries=DEEP_READ_CACHE_MAX_ENTRIES,
+            default_ttl_seconds=7200,
+            max_bytes=DEEP_READ_CACHE_MAX_BYTES,
+        )
         self.cache_lock = asyncio.Lock()
         self.search_lock = asyncio.Lock()
         self.inflight_search_tasks: Dict[str, asyncio.Task] = {}
         self.failed_search_cooldowns: Dict[str, float] = {}
+        # Second tier behind web_search_cache/failed_search_cooldowns, shared by all workers.
+        self.shared_search_cache = RedisSearchCache(
+            redis_url=search_redis_cache_url,
+            namespace=search_redis_cache_prefix,
+            enabled=search_redis_cache_enabled,
+        )
 
         self._time_sensitive_rx = re.compile(
             r'\b(?:hôm nay|today|hôm qua|yesterday|vừa qua|just released?|just now|mới ra mắt|'
@@ -78,6 +193,10 @@ class SearchEngine:
             re.IGNORECASE
         )
         self._year_rx = re.compile(r'\b(20\d{2})\b')
+        self._topic_keyword_matchers = {
+            topic: _keyword_matcher(tuple(dict.fromkeys(config.get("keywords", []))))
+            for topic, config in SEARCH_TOPICS.items()
+        }
         self._time_sensitive_suffixes = [
             "latest", "mới nhất", "hôm nay", "today", "this week", "this month",
             "current", "hiện tại", "just", "breaking", "update",
@@ -87,8 +206,8 @@ class SearchEngine:
 
     def _normalize_search_cache_key(self, query: str) -> str:
         normalized = (query or "").strip().lower()
-        normalized = re.sub(r"\s+", " ", normalized)
-        normalized = re.sub(r"\s*\|\s*", "|", normalized)
+        normalized = _WHITESPACE_RE.sub(" ", normalized)
+        normalized = _PIPE_SPACING_RE.sub("|", normalized)
         mode = "general"
         payload = normalized
         if "|" in normalized:
@@ -102,52 +221,75 @@ class SearchEngine:
         return f"{mode}|{payload}"
 
     def get_web_search_cache(self, query: str):
-        key = self._normalize_search_cache_key(query)
-        if key in self.web_search_cache:
-            cached_item = self.web_search_cache[key]
-            expires_at = cached_item.get("expires_at")
-            if isinstance(expires_at, datetime):
-                if datetime.now() <= expires_at:
-                    return cached_item.get("data")
-                del self.web_search_cache[key]
-                return None
-            if datetime.now() - cached_item['timestamp'] < timedelta(hours=6):
-                return cached_item['data']
-            del self.web_search_cache[key]
-        return None
+        entry = self._get_local_search_entry(self._normalize_search_cache_key(query))
+        return entry[0] if entry else None
 
     def set_web_search_cache(self, query: str, data: str, time_sensitive: bool = False):
         key = self._normalize_search_cache_key(query)
-        if len(self.web_search_cache) >= MAX_CACHE_SIZE:
-            oldest_key = min(self.web_search_cache, key=lambda k: self.web_search_cache[k]['timestamp'])
-            del self.web_search_cache[oldest_key]
-        now = datetime.now()
-        ttl_seconds = self.search_time_sensitive_cache_ttl_seconds if time_sensitive else self.search_general_cache_ttl_seconds
-        self.web_search_cache[key] = {
-            'data': data,
-            'timestamp': now,
-            'expires_at': now + timedelta(seconds=ttl_seconds),
-            'ttl_seconds': ttl_seconds,
-            'time_sensitive': time_sensitive,
-        }
+        self._set_local_search_entry(key, self._new_search_entry(data, time_sensitive), time_sensitive)
 
-    def _get_deep_read_cache(self, url: str) -> Optional[str]:
-        item = self.deep_read_cache.get(url)
-        if not item:
+    def _search_cache_ttl(self, time_sensitive: bool) -> int:
+        return self.search_time_sensitive_cache_ttl_seconds if time_sensitive else self.search_general_cache_ttl_seconds
+
+    def _search_fresh_ttl(self, time_sensitive: bool) -> int:
+        if not self.search_stale_while_revalidate:
+            return self._search_cache_ttl(time_sensitive)
+        fresh = self.search_time_sensitive_fresh_ttl_seconds if time_sensitive else self.search_general_fresh_ttl_seconds
+        return min(fresh, self._search_cache_ttl(time_sensitive))
+
+    def _new_search_entry(self, data: str, time_sensitive: bool) -> Tuple[str, float, float]:
+        """(value, fresh_until, stale_until): served as-is until fresh_until, served and refreshed until stale_until."""
+        now = time.time()
+        return data, now + self._search_fresh_ttl(time_sensitive), now + self._search_cache_ttl(time_sensitive)
+
+    def _get_local_search_entry(self, normalized_key: str) -> Optional[Tuple[str, float, float]]:
+        entry = self.web_search_cache.get(normalized_key)
+        if entry is None or entry[2] <= time.time():
             return None
-        ttl_seconds = int(item.get("ttl_seconds", 7200))
-        if datetime.now() - item["timestamp"] > timedelta(seconds=ttl_seconds):
-            del self.deep_read_cache[url]
+        return entry
+
+    def _set_local_search_entry(self, normalized_key: str, entry: Tuple[str, float, float], time_sensitive: bool) -> None:
+        # The TTLCache TTL stays one of two fixed values (one expiry queue each); the entry's own
+        # stale_until is what decides validity, so promoted Redis hits keep their remaining lifetime.
+        self.web_search_cache.set(normalized_key, entry, ttl_seconds=self._search_cache_ttl(time_sensitive))
+
+    async def _get_shared_search_entry(self, normalized_key: str, time_sensitive: bool) -> Optional[Tuple[str, float, float]]:
+        """Look an entry up in the Redis tier and promote a hit into the in-process cache."""
+        entry = await self.shared_search_cache.get(normalized_key)
+        if entry is None:
             return None
-        return item.get("text", "")
+        async with self.cache_lock:
+            self._set_local_search_entry(normalized_key, entry, time_sensitive)
+        return entry
 
-    def _set_deep_read_cache(self, url: str, text: str, ttl_seconds: int = 7200):
-        self.deep_read_cache[url] = {
-            "text": text,
-            "timestamp": datetime.now(),
-            "ttl_seconds": max(60, ttl_seconds),
+    async def _get_search_cooldown(self, normalized_key: str) -> float:
+        async with self.cache_lock:
+            cooldown_until = self.failed_search_cooldowns.get(normalized_key, 0)
+        if cooldown_until > time.time():
+            return cooldown_until
+        return await self.shared_search_cache.get_cooldown(normalized_key)
+
+    def get_search_cache_stats(self) -> Dict[str, Any]:
+        """Hit ratios for the in-process tier, the Redis tier and both combined."""
+        local = self.web_search_cache.stats()
+        shared = self.shared_search_cache.stats()
+        # Every local miss that reached Redis is counted there, so combined misses are Redis misses
+        # plus local misses that never got that far (Redis disabled or unavailable).
+        lookups = local["hits"] + local["misses"]
+        hits = local["hits"] + shared["hits"]
+        return {
+            "local": local,
+            "redis": shared,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "cooldowns": len(self.failed_search_cooldowns),
         }
 
+    def _get_deep_read_cache(self, url: str) -> Optional[str]:
+        return self.deep_read_cache.get(url)
+
+    def _set_deep_read_cache(self, url: str, text: str, ttl_seconds: int = 7200):
+        self.deep_read_cache.set(url, text, ttl_seconds=max(60, ttl_seconds))
+
     # ── Query utilities ────────────────────────────────────
 
     def _is_time_sensitive_query(self, query: str) -> bool:
@@ -422,14 +564,42 @@ class SearchEngine:
             self.logger.warning(f"Exa search error: {e}")
             return []
 
-    async def _run_fallback_search_records(self, query: str) -> List[Dict[str, str]]:
-        provider_funcs: List[Tuple[str, Any]] = []
+    def _fallback_providers(self) -> List[Tuple[str, Any]]:
+        """Configured fallback providers, best tracker score first."""
+        provider_funcs: Dict[str, Any] = {}
         if SERPAPI_API_KEY:
-            provider_funcs.append(("serpapi", self._search_serpapi_records))
+            provider_funcs["serpapi"] = self._search_serpapi_records
         if TAVILY_API_KEY:
-            provider_funcs.append(("tavily", self._search_tavily_records))
+            provider_funcs["tavily"] = self._search_tavily_records
         if EXA_API_KEY:
-            provider_funcs.append(("exa", self._search_exa_records))
+            provider_funcs["exa"] = self._search_exa_records
+        return [(name, provider_funcs[name]) for name in self.provider_tracker.rank(provider_funcs)]
+
+    async def _tracked_provider_call(self, provider: str, call) -> List[Dict[str, str]]:
+        """Await one provider call and feed its latency and outcome to the tracker."""
+        started = time.perf_counter()
+        try:
+            records = await call
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.provider_tracker.record(provider, time.perf_counter() - started, False)
+            raise
+        self.provider_tracker.record(provider, time.perf_counter() - started, bool(records))
+        return records
+
+    def _detach_task(self, task: "asyncio.Future") -> None:
+        self._background_tasks.add(task)
+
+        def _done(done: "asyncio.Future") -> None:
+            self._background_tasks.discard(done)
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(_done)
+
+    async def _run_fallback_search_records(self, query: str, exclude: Optional[Set[str]] = None) -> List[Dict[str, str]]:
+        provider_funcs = [(name, func) for name, func in self._fallback_providers() if name not in (exclude or set())]
 
         if not provider_funcs:
             return []
@@ -438,7 +608,7 @@ class SearchEngine:
         names = [name for name, _ in selected]
         self.logger.info(f"Running fallback providers: {', '.join(names)}")
 
-        tasks = [func(query) for _, func in selected]
+        tasks = [self._tracked_provider_call(name, func(query)) for name, func in selected]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         merged: List[Dict[str, str]] = []
         success_count = 0
@@ -457,6 +627,48 @@ class SearchEngine:
         self.logger.info(f"AB_METRIC search_fallback providers={len(selected)} success={1 if success_count else 0} results={success_count}")
         return merged
 
+    async def _hedged_primary_search(
+        self, q_sub: str, primary: "asyncio.Future", topic: str, required_sources: int,
+    ) -> Tuple[List[Dict[str, str]], Set[str]]:
+        """Wait for the primary provider up to its learned p50, then race it against the best fallback.
+
+        Returns the records of whichever task first makes the result sufficient (merged with any
+        earlier insufficient answer) and the fallback providers already used.
+        """
+        fallbacks = self._fallback_providers()
+        if not self.search_hedge_enabled or not fallbacks:
+            return await primary, set()
+
+        delay = self.provider_tracker.hedge_delay(
+            "duckduckgo", self.search_hedge_min_delay_ms / 1000.0, self.search_hedge_max_delay_ms / 1000.0,
+        )
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result(), set()
+
+        hedge_name, hedge_func = fallbacks[0]
+        self.logger.info(f"DuckDuckGo slower than {delay:.2f}s; hedging with {hedge_name} for '{q_sub[:60]}'")
+        hedge = asyncio.ensure_future(self._tracked_provider_call(hedge_name, hedge_func(q_sub)))
+        names = {primary: "duckduckgo", hedge: hedge_name}
+        pending = {primary, hedge}
+        records: List[Dict[str, str]] = []
+        winner = ""
+        try:
+            while pending and not winner:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        self.logger.warning(f"Hedged {names[task]} error: {task.exception()}")
+                        continue
+                    records = self._dedupe_records(records + task.result())
+                    if not winner and self._is_search_result_sufficient(records, topic, q_sub, required_sources):
+                        winner = names[task]
+        finally:
+            for task in pending:
+                self._detach_task(task)
+        self.logger.info(f"AB_METRIC search_hedge provider={hedge_name} winner={winner or 'none'} delay_ms={delay * 1000:.0f}")
+        return records, {hedge_name}
+
     # ── Evidence (Deep Read) ─────────────────────────────
 
     async def _fetch_page_evidence(self, url: str) -> str:
@@ -464,26 +676,26 @@ class SearchEngine:
         if cached is not None:
             return cached
 
-        def _fetch_once(timeout_sec: float) -> str:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (ChadGibitiBot/1.0)",
-                "Accept": "text/html,application/xhtml+xml",
-                "Accept-Language": "en-US,en;q=0.8,vi;q=0.7",
-            }
-            response = requests.get(url, headers=headers, timeout=timeout_sec)
-            if response.status_code != 200 or not response.text:
+        async def _fetch_once(timeout_sec: float) -> str:
+            # Pages past the cap are cut rather than rejected; the main text is near the top.
+            result = await get_http_client().fetch(
+                url,
+                headers=_DEEP_READ_HEADERS,
+                timeout=timeout_sec,
+                max_bytes=DEEP_READ_MAX_HTML_BYTES,
+                truncate=True,
+            )
+            if result.status != 200 or not result.body:
                 return ""
-            if not response.encoding:
-                response.encoding = response.apparent_encoding or "utf-8"
-            parsed = HtmlParser.extract_main_text(response.text)
+            parsed = await self.html_extractor.extract(result.text(), self.deep_read_max_chars)
             if len(parsed) < 120:
                 return ""
-            return parsed[:self.deep_read_max_chars].strip()
+            return parsed.strip()
 
         for attempt in range(2):
             timeout_sec = 3.0 if attempt == 0 else 5.0
             try:
-                text = await asyncio.to_thread(_fetch_once, timeout_sec)
+                text = await _fetch_once(timeout_sec)
                 if text:
                     self._set_deep_read_cache(url, text, ttl_seconds=7200)
                     return text
@@ -510,7 +722,8 @@ class SearchEngine:
         return deduped
 
     def _count_quality_sources(self, records: List[Dict[str, str]], topic: str, query: str = "") -> int:
-        return sum(1 for r in records if self._is_quality_record(topic, query, r))
+        query_terms = _query_terms(query)
+        return sum(1 for r in records if self._is_quality_features(query_terms, _RecordFeatures(r)))
 
     def _is_search_result_sufficient(self, records: List[Dict[str, str]], topic: str, query: str, required_sources: int, min_chars: int = 220) -> bool:
         quality_count = self._count_quality_sources(records, topic, query)
@@ -520,26 +733,30 @@ class SearchEngine:
     # ── Scoring & Ranking ───────────────────────────────
 
     def _score_record(self, topic: str, query: str, record: Dict[str, str]) -> float:
-        score = 0.0
-        snippet = (record.get("snippet") or "").strip().lower()
-        title = (record.get("title") or "").strip().lower()
-        domain = (record.get("domain") or "").lower()
-        combined_text = f"{title} {snippet}"
+        features = _RecordFeatures(record)
+        pub_date = DateParser.extract_date_cached(features.combined_for_date())
+        return self._score_features(topic, _query_terms(query), self._is_time_sensitive_query(query), features, pub_date)
 
-        query_lower = query.lower().strip()
-        query_terms = [t for t in query_lower.split() if len(t) > 2]
+    def _score_features(
+        self,
+        topic: str,
+        query_terms: Tuple[str, ...],
+        is_time_sensitive: bool,
+        features: _RecordFeatures,
+        pub_date: Optional[datetime],
+    ) -> float:
+        score = 0.0
+        title = features.title
+        snippet = features.snippet
 
         title_overlap = sum(1 for t in query_terms if t in title)
         snippet_overlap = sum(1 for t in query_terms if t in snippet)
         score += title_overlap * 0.30
         score += snippet_overlap * 0.20
 
-        if any(t in title for t in query_terms):
+        if title_overlap:
             score += 0.50
 
-        freshness_bonus = 0.20
-        pub_date = DateParser.extract_date(snippet + " " + title)
-        is_time_sensitive = self._is_time_sensitive_query(query)
         if pub_date and is_time_sensitive:
             days_ago = (datetime.now() - pub_date).days
             if days_ago <= 1:
@@ -550,14 +767,12 @@ class SearchEngine:
                 score += 0.3
 
         freshness_bonus = -0.05
-        if is_time_sensitive and not pub_date and not self._contains_year(combined_text):
+        if is_time_sensitive and not pub_date and not self._contains_year(features.combined):
             score -= 0.3
 
-        topic_lower = topic.lower()
-        topic_keywords = set(SEARCH_TOPICS.get(topic_lower, {}).get("keywords", []))
-        if topic_keywords:
-            topic_match = sum(1 for kw in topic_keywords if kw in combined_text)
-            score += topic_match * 0.10
+        matcher = self._topic_keyword_matchers.get(topic.lower())
+        if matcher is not None:
+            score += matcher(features.combined) * 0.10
 
         snippet_len = len(snippet)
         if snippet_len < 20:
@@ -565,59 +780,40 @@ class SearchEngine:
         elif snippet_len < 40:
             score -= 0.10
 
+        domain = features.domain
         if domain:
-            if any(d in domain for d in ["wiki", "wikipedia"]):
+            if "wiki" in domain:
                 score += 0.15
-            if any(d in domain for d in [".gov", ".edu"]):
+            if ".gov" in domain or ".edu" in domain:
                 score += 0.20
 
         score += freshness_bonus
         return round(max(-0.5, min(3.0, score)), 3)
 
     def _is_quality_record(self, topic: str, query: str, record: Dict[str, str]) -> bool:
-        snippet = (record.get("snippet") or "").strip().lower()
-        title = (record.get("title") or "").strip().lower()
-        domain = (record.get("domain") or "").lower()
-        combined = f"{title} {snippet}"
-        query_terms = [t for t in query.lower().strip().split() if len(t) > 2]
+        return self._is_quality_features(_query_terms(query), _RecordFeatures(record))
 
+    def _is_quality_features(self, query_terms: Tuple[str, ...], features: _RecordFeatures) -> bool:
         if not query_terms:
-            return len(snippet) >= 40
+            return len(features.snippet) >= 40
 
-        if not any(t in combined for t in query_terms):
+        if not any(t in features.combined for t in query_terms):
             return False
-        if len(snippet) < 30:
+        if len(features.snippet) < 30:
             return False
-        if any(d in domain for d in ["pinterest", "facebook", "instagram", "tiktok"]):
+        if any(d in features.domain for d in _SOCIAL_DOMAINS):
             return False
         return True
 
     def _dynamic_reputation_score(self, topic: str, query: str, record: Dict[str, str]) -> float:
         domain = (record.get("domain") or "").lower()
-        snippet = (record.get("snippet") or "").strip().lower()
-
-        high_reputation = {
-            "reuters.com", "apnews.com", "bbc.com", "bbc.co.uk", "nytimes.com",
-            "wsj.com", "bloomberg.com", "npr.org", "theguardian.com",
-            "nature.com", "science.org", "sciencedaily.com",
-            "who.int", "cdc.gov", "nih.gov",
-            "wikipedia.org", "britannica.com",
-        }
-        medium_reputation = {
-            "forbes.com", "cnn.com", "washingtonpost.com", "economist.com",
-            "techcrunch.com", "theverge.com", "wired.com", "arstechnica.com",
-            "ign.com", "gamespot.com", "polygon.com",
-            "imdb.com", "rottentomatoes.com",
-            "github.com", "stackoverflow.com",
-            "medium.com", "substack.com",
-        }
 
-        if domain in high_reputation:
+        if domain in _HIGH_REPUTATION_DOMAINS:
             return 0.30
-        if domain in medium_reputation:
+        if domain in _MEDIUM_REPUTATION_DOMAINS:
             return 0.15
 
-        if re.search(r'https?://(?!www\.)', domain):
+        if _BARE_SCHEME_RE.search(domain):
             return -0.05
         return 0.0
 
@@ -644,16 +840,36 @@ class SearchEngine:
         return diversified[:limit]
 
     def _lightweight_rerank(self, topic: str, query: str, records: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        is_time_sensitive = self._is_time_sensitive_query(query)
         scored = []
         for rec in records:
             base_score = float(rec.get("score", 0))
             rep_score = self._dynamic_reputation_score(topic, query, rec)
-            is_time_sensitive = self._is_time_sensitive_query(query)
-            pub_date = DateParser.extract_date(
-                (rec.get("snippet") or "") + " " + (rec.get("title") or "")
-            )
+            pub_date = DateParser.extract_date_cached(_RecordFeatures(rec).combined_for_date())
             decay = self._calculate_time_decay_penalty(topic, pub_date, is_time_sensitive)
-            total = base_score + rep_score + decay
+            scored.append((base_score + rep_score + decay, rec))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [rec for _, rec in scored]
+
+    def _score_and_rank_records(self, topic: str, query: str, records: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Score (sets rec["score"]) and rerank all records of one intent in a single pass.
+
+        Query terms and time sensitivity are computed once, and each record's text features and
+        publication date are shared between the base score and the rerank decay.
+        """
+        query_terms = _query_terms(query)
+        is_time_sensitive = self._is_time_sensitive_query(query)
+        scored = []
+        for rec in records:
+            features = _RecordFeatures(rec)
+            pub_date = DateParser.extract_date_cached(features.combined_for_date())
+            base_score = self._score_features(topic, query_terms, is_time_sensitive, features, pub_date)
+            rec["score"] = str(base_score)
+            total = (
+                base_score
+                + self._dynamic_reputation_score(topic, query, rec)
+                + self._calculate_time_decay_penalty(topic, pub_date, is_time_sensitive)
+            )
             scored.append((total, rec))
         scored.sort(key=lambda x: x[0], reverse=True)
         return [rec for _, rec in scored]
@@ -723,6 +939,26 @@ class SearchEngine:
 
     # ── Main Pipeline ──────────────────────────────────
 
+    async def _collect_primary_records(
+        self, primary_queries: List[str], timelimit: Optional[str], transformed_query: str,
+    ) -> List[Dict[str, str]]:
+        primary_results = await asyncio.gather(
+            *(
+                self._tracked_provider_call(
+                    "duckduckgo",
+                    self._search_duckduckgo_records(p_query, idx, timelimit=timelimit, query_effective=transformed_query),
+                )
+                for idx, p_query in enumerate(primary_queries)
+            ),
+            return_exceptions=True,
+        )
+        records: List[Dict[str, str]] = []
+        for result in primary_results:
+            if isinstance(result, BaseException):
+                continue
+            records.extend(result)
+        return self._dedupe_records(records)
+
     async def _search_single_intent(self, q_sub: str, force_fallback: bool = False) -> str:
         selected_topic = self._classify_topic(q_sub)
         q1 = q_sub.strip()
@@ -730,34 +966,21 @@ class SearchEngine:
         transformed_query, timelimit = self._transform_temporal_query(q1)
         primary_queries = [transformed_query or q1]
 
-        primary_tasks = [
-            asyncio.create_task(self._search_duckduckgo_records(p_query, idx, timelimit=timelimit, query_effective=transformed_query))
-            for idx, p_query in enumerate(primary_queries)
-        ]
-        primary_results = await asyncio.gather(*primary_tasks, return_exceptions=True)
-
-        records: List[Dict[str, str]] = []
-        for result in primary_results:
-            if isinstance(result, BaseException):
-                continue
-            records.extend(result)
-
-        records = self._dedupe_records(records)
+        primary = asyncio.ensure_future(self._collect_primary_records(primary_queries, timelimit, transformed_query))
         required_sources = self._required_quality_sources(q_sub)
-        has_enough = self._is_search_result_sufficient(records, selected_topic, q_sub, required_sources)
 
-        should_fallback = force_fallback or not has_enough
-        if should_fallback:
-            fallback_records = await self._run_fallback_search_records(q_sub)
-            records.extend(fallback_records)
-            records = self._dedupe_records(records)
+        if force_fallback:
+            # The fallback runs regardless, so both providers go out together.
+            primary_records, fallback_records = await asyncio.gather(primary, self._run_fallback_search_records(q_sub))
+            records = self._dedupe_records(primary_records + fallback_records)
+        else:
+            records, used_fallbacks = await self._hedged_primary_search(q_sub, primary, selected_topic, required_sources)
+            if not self._is_search_result_sufficient(records, selected_topic, q_sub, required_sources):
+                fallback_records = await self._run_fallback_search_records(q_sub, exclude=used_fallbacks)
+                records.extend(fallback_records)
+                records = self._dedupe_records(records)
 
-        scored = []
-        for rec in records:
-            rec["score"] = str(self._score_record(selected_topic, q_sub, rec))
-            scored.append(rec)
-
-        ranked = self._lightweight_rerank(selected_topic, q_sub, scored)
+        ranked = self._score_and_rank_records(selected_topic, q_sub, records)
 
         if self.search_web_mode == "grounded":
             top_records = ranked[:self.search_grounded_top_links]
@@ -796,45 +1019,28 @@ class SearchEngine:
 
         return "\n\n".join(final_sections).strip() if final_sections else ""
 
-    async def run_search_apis(self, query: str, mode: str = "general"):
-        raw_query = query or ""
-        force_fallback = "[FORCE FALLBACK]" in raw_query.upper()
-        clean_query = raw_query.replace("[FORCE FALLBACK]", "").strip()
-        if not clean_query:
-            return ""
-
-        cache_key = f"{mode}|{clean_query}"
-        normalized_key = self._normalize_search_cache_key(cache_key)
-        time_sensitive = self._is_time_sensitive_query(clean_query)
-        bypass_cache = time_sensitive and not force_fallback
-
-        inflight_task: Optional[asyncio.Task] = None
-        async with self.cache_lock:
-            cached_result = None if (force_fallback or bypass_cache) else self.get_web_search_cache(cache_key)
-            if not cached_result:
-                inflight_task = self.inflight_search_tasks.get(normalized_key)
+    def _start_search_task(self, normalized_key: str, coro) -> asyncio.Task:
+        """Register a search/refresh under its cache key so concurrent callers join it. Call under cache_lock."""
+        task = asyncio.create_task(coro)
+        self.inflight_search_tasks[normalized_key] = task
 
-        if cached_result:
-            self.logger.info(f"Web search result from cache for query: {clean_query[:50]}...")
-            return cached_result
-
-        if inflight_task:
-            self.logger.info(f"Web search joined inflight task for key={normalized_key[:80]}")
-            return await inflight_task
-
-        if not force_fallback and not time_sensitive and self.search_failed_query_cooldown_seconds > 0:
-            async with self.cache_lock:
-                cooldown_until = self.failed_search_cooldowns.get(normalized_key, 0)
-            if cooldown_until > time.time():
-                self.logger.info(f"Search cooldown active for key={normalized_key[:80]}")
-                return "⚠️ Nguồn tìm kiếm đang tạm quá tải, vui lòng thử lại sau ít giây."
+        def _forget(done: asyncio.Task) -> None:
+            if self.inflight_search_tasks.get(normalized_key) is done:
+                self.inflight_search_tasks.pop(normalized_key, None)
 
-        task = asyncio.create_task(self._execute_search_pipeline(clean_query, force_fallback))
-        async with self.cache_lock:
-            self.inflight_search_tasks[normalized_key] = task
+        task.add_done_callback(_forget)
+        return task
 
+    async def _search_and_store(
+        self,
+        clean_query: str,
+        normalized_key: str,
+        force_fallback: bool,
+        time_sensitive: bool,
+        store: bool,
+    ) -> str:
         try:
-            output = await task
+            output = await self._execute_search_pipeline(clean_query, force_fallback)
             if not output and time_sensitive and not force_fallback:
                 absolute_date = datetime.now().strftime("%d %B %Y")
                 forced_query = f"{clean_query} ngay {absolute_date}"
@@ -844,23 +1050,84 @@ class SearchEngine:
                 output = await self._execute_search_pipeline(forced_query, True)
 
             if output:
+                entry = self._new_search_entry(output, time_sensitive)
                 async with self.cache_lock:
-                    if not bypass_cache:
-                        self.set_web_search_cache(cache_key, output, time_sensitive=time_sensitive)
-                    self.failed_search_cooldowns.pop(normalized_key, None)
-                if bypass_cache:
-                    self.logger.info(f"Completed fresh search for time-sensitive query='{clean_query[:60]}'.")
-                else:
+                    if store:
+                        self._set_local_search_entry(normalized_key, entry, time_sensitive)
+                    had_cooldown = self.failed_search_cooldowns.pop(normalized_key, None) is not None
+                if store:
+                    await self.shared_search_cache.set(normalized_key, entry)
+                if had_cooldown:
+                    await self.shared_search_cache.clear_cooldown(normalized_key)
+                if store:
                     self.logger.info(f"Completed search for query='{clean_query[:60]}' and cached.")
+                else:
+                    self.logger.info(f"Completed fresh search for time-sensitive query='{clean_query[:60]}'.")
                 return output
 
             if not time_sensitive and self.search_failed_query_cooldown_seconds > 0:
                 async with self.cache_lock:
                     self.failed_search_cooldowns[normalized_key] = time.time() + self.search_failed_query_cooldown_seconds
+                await self.shared_search_cache.set_cooldown(normalized_key, self.search_failed_query_cooldown_seconds)
                 self.logger.info(f"Search failed, cooldown set for key={normalized_key[:60]}")
             return ""
         except Exception as e:
             self.logger.error(f"Search pipeline error: {e}")
-            async with self.cache_lock:
-                self.inflight_search_tasks.pop(normalized_key, None)
             return ""
+
+    async def run_search_apis(self, query: str, mode: str = "general"):
+        raw_query = query or ""
+        force_fallback = "[FORCE FALLBACK]" in raw_query.upper()
+        clean_query = raw_query.replace("[FORCE FALLBACK]", "").strip()
+        if not clean_query:
+            return ""
+
+        cache_key = f"{mode}|{clean_query}"
+        normalized_key = self._normalize_search_cache_key(cache_key)
+        time_sensitive = self._is_time_sensitive_query(clean_query)
+        # Without stale-while-revalidate, time-sensitive queries always search fresh.
+        bypass_cache = time_sensitive and not force_fallback and not self.search_stale_while_revalidate
+        use_cache = not (force_fallback or bypass_cache)
+
+        inflight_task: Optional[asyncio.Task] = None
+        async with self.cache_lock:
+            entry = self._get_local_search_entry(normalized_key) if use_cache else None
+            if entry is None:
+                inflight_task = self.inflight_search_tasks.get(normalized_key)
+
+        if use_cache and entry is None and inflight_task is None:
+            entry = await self._get_shared_search_entry(normalized_key, time_sensitive)
+
+        if entry is not None:
+            value, fresh_until, _ = entry
+            if fresh_until > time.time():
+                self.logger.info(f"Web search result from cache for query: {clean_query[:50]}...")
+                return value
+            async with self.cache_lock:
+                if normalized_key not in self.inflight_search_tasks:
+                    self._start_search_task(
+                        normalized_key,
+                        self._search_and_store(clean_query, normalized_key, False, time_sensitive, True),
+                    )
+                    self.logger.info(f"Serving stale search result and refreshing in background for key={normalized_key[:80]}")
+            return value
+
+        if inflight_task is None:
+            async with self.cache_lock:
+                inflight_task = self.inflight_search_tasks.get(normalized_key)
+        if inflight_task is not None:
+            self.logger.info(f"Web search joined inflight task for key={normalized_key[:80]}")
+            return await asyncio.shield(inflight_task)
+
+        if not force_fallback and not time_sensitive and self.search_failed_query_cooldown_seconds > 0:
+            cooldown_until = await self._get_search_cooldown(normalized_key)
+            if cooldown_until > time.time():
+                self.logger.info(f"Search cooldown active for key={normalized_key[:80]}")
+                return "⚠️ Nguồn tìm kiếm đang tạm quá tải, vui lòng thử lại sau ít giây."
+
+        async with self.cache_lock:
+            task = self.inflight_search_tasks.get(normalized_key) or self._start_search_task(
+                normalized_key,
+                self._search_and_store(clean_query, normalized_key, force_fallback, time_sensitive, not bypass_cache),
+            )
+        return await asyncio.shield(task)
@@ -2,10 +2,9 @@ import asyncio
 import json
 import os
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Set
 
-import requests
 from google import genai
 from google.genai import types as genai_types
 
@@ -13,8 +12,11 @@ from src.core.config import logger, GEMINI_API_KEYS
 import src.core.config as config
 from src.core.api_router import get_api_router
 from src.core.api_config import VISION_MODEL_ALIAS
+from src.core.ttl_cache import TTLCache
+from src.core.http_client import get_http_client, ResponseTooLargeError
 from src.tools.constants import (
     MAX_CACHE_SIZE,
+    IMAGE_RECOGNITION_CACHE_MAX_BYTES,
     MAX_FILE_SIZE_BYTES,
     MAX_TEXT_LENGTH,
 )
@@ -52,7 +54,12 @@ class ToolsManager:
             self.search_subtasks_enabled = bool(enable_search_subtasks)
         self.search_subtask_timeout_seconds = int(os.getenv("SEARCH_SUBTASK_TIMEOUT_SEC", "18"))
         self._allowed_mentions: Dict[str, Set[str]] = {}
-        self.image_recognition_cache = {}
+        self.image_recognition_cache = TTLCache(
+            "tools.image_recognition",
+            max_entries=MAX_CACHE_SIZE,
+            default_ttl_seconds=self.CACHE_TTL_SECONDS,
+            max_bytes=IMAGE_RECOGNITION_CACHE_MAX_BYTES,
+        )
         self.weather = WeatherService()
         self.calculator = CalculatorService()
         self.search_lock = asyncio.Lock()
@@ -78,6 +85,18 @@ class ToolsManager:
             time_sensitive_min_quality_sources=self._load_time_sensitive_min_quality_sources(),
             exa_use_autoprompt=self._load_exa_autoprompt(),
             google_search_streams=self._load_google_search_streams(),
+            html_extraction_backend=self._load_html_extraction_backend(),
+            html_extraction_parser=self._load_html_extraction_parser(),
+            html_extraction_workers=self._load_html_extraction_workers(),
+            search_redis_cache_enabled=self._load_search_redis_cache_enabled(),
+            search_redis_cache_url=self._load_search_redis_cache_url(),
+            search_redis_cache_prefix=self._load_search_redis_cache_prefix(),
+            search_stale_while_revalidate=self._load_search_stale_while_revalidate(),
+            search_general_fresh_ttl_seconds=self._load_search_general_fresh_ttl_seconds(),
+            search_time_sensitive_fresh_ttl_seconds=self._load_search_time_sensitive_fresh_ttl_seconds(),
+            search_hedge_enabled=self._load_search_hedge_enabled(),
+            search_hedge_min_delay_ms=self._load_search_hedge_min_delay_ms(),
+            search_hedge_max_delay_ms=self._load_search_hedge_max_delay_ms(),
         )
 
         if GEMINI_API_KEYS:
@@ -91,7 +110,13 @@ class ToolsManager:
                 f"semantic_cache={self.search_engine.search_semantic_cache_enabled} "
                 f"general_ttl={self.search_engine.search_general_cache_ttl_seconds}s "
                 f"time_ttl={self.search_engine.search_time_sensitive_cache_ttl_seconds}s "
-                f"cooldown={self.search_engine.search_failed_query_cooldown_seconds}s"
+                f"cooldown={self.search_engine.search_failed_query_cooldown_seconds}s "
+                f"redis_cache={self.search_engine.shared_search_cache.enabled} "
+                f"swr={self.search_engine.search_stale_while_revalidate} "
+                f"fresh_ttl={self.search_engine.search_general_fresh_ttl_seconds}s/"
+                f"{self.search_engine.search_time_sensitive_fresh_ttl_seconds}s "
+                f"hedge={self.search_engine.search_hedge_enabled} "
+                f"hedge_delay={self.search_engine.search_hedge_min_delay_ms}-{self.search_engine.search_hedge_max_delay_ms}ms"
             )
         else:
             self.logger.warning("Không có Gemini API key cho tools; web_search/image_recognition sẽ failback.")
@@ -171,6 +196,20 @@ class ToolsManager:
             value = 2
         return max(1, min(5, value))
 
+    def _load_html_extraction_backend(self) -> str:
+        return (os.getenv("SEARCH_HTML_EXTRACT_BACKEND", "thread") or "thread").strip().lower()
+
+    def _load_html_extraction_parser(self) -> str:
+        return (os.getenv("SEARCH_HTML_EXTRACT_PARSER", "stream") or "stream").strip().lower()
+
+    def _load_html_extraction_workers(self) -> int:
+        raw = os.getenv("SEARCH_HTML_EXTRACT_WORKERS", "2").strip()
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 2
+        return max(1, min(8, value))
+
     def _load_deep_read_max_chars(self) -> int:
         raw = os.getenv("SEARCH_DEEP_READ_MAX_CHARS", "1800").strip()
         try:
@@ -217,6 +256,53 @@ class ToolsManager:
             value = 600
         return max(60, min(7200, value))
 
+    def _load_search_redis_cache_enabled(self) -> bool:
+        return (os.getenv("SEARCH_REDIS_CACHE_ENABLED", "true") or "true").strip().lower() in {"1", "true", "yes", "on"}
+
+    def _load_search_redis_cache_url(self) -> str:
+        return (os.getenv("SEARCH_REDIS_CACHE_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")).strip()
+
+    def _load_search_redis_cache_prefix(self) -> str:
+        return (os.getenv("SEARCH_REDIS_CACHE_PREFIX", "azuris:search_cache") or "").strip() or "azuris:search_cache"
+
+    def _load_search_stale_while_revalidate(self) -> bool:
+        return (os.getenv("SEARCH_STALE_WHILE_REVALIDATE", "true") or "true").strip().lower() in {"1", "true", "yes", "on"}
+
+    def _load_search_general_fresh_ttl_seconds(self) -> int:
+        raw = os.getenv("SEARCH_GENERAL_FRESH_TTL_SEC", "1800").strip()
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 1800
+        return max(30, min(self._load_search_general_cache_ttl_seconds(), value))
+
+    def _load_search_time_sensitive_fresh_ttl_seconds(self) -> int:
+        raw = os.getenv("SEARCH_TIME_SENSITIVE_FRESH_TTL_SEC", "60").strip()
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 60
+        return max(10, min(self._load_search_time_sensitive_cache_ttl_seconds(), value))
+
+    def _load_search_hedge_enabled(self) -> bool:
+        return (os.getenv("SEARCH_HEDGE_ENABLED", "true") or "true").strip().lower() in {"1", "true", "yes", "on"}
+
+    def _load_search_hedge_min_delay_ms(self) -> int:
+        raw = os.getenv("SEARCH_HEDGE_MIN_DELAY_MS", "300").strip()
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 300
+        return max(50, min(10000, value))
+
+    def _load_search_hedge_max_delay_ms(self) -> int:
+        raw = os.getenv("SEARCH_HEDGE_MAX_DELAY_MS", "3000").strip()
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 3000
+        return max(self._load_search_hedge_min_delay_ms(), min(20000, value))
+
     # ── Gemini key rotation ────────────────────────────────
 
     def _next_gemini_api_key(self) -> str:
@@ -416,20 +502,10 @@ class ToolsManager:
     # ── Image recognition ─────────────────────────────────
 
     def _get_image_recognition_cache(self, image_url: str, question: str):
-        key = f"{image_url}|{question[:50]}"
-        item = self.image_recognition_cache.get(key)
-        if item:
-            if datetime.now() - item["timestamp"] < timedelta(hours=1):
-                return item["data"]
-            del self.image_recognition_cache[key]
-        return None
+        return self.image_recognition_cache.get(f"{image_url}|{question[:50]}")
 
     def _set_image_recognition_cache(self, image_url: str, question: str, data: str):
-        key = f"{image_url}|{question[:50]}"
-        if len(self.image_recognition_cache) >= MAX_CACHE_SIZE:
-            oldest = min(self.image_recognition_cache, key=lambda k: self.image_recognition_cache[k]["timestamp"])
-            del self.image_recognition_cache[oldest]
-        self.image_recognition_cache[key] = {"data": data, "timestamp": datetime.now()}
+        self.image_recognition_cache.set(f"{image_url}|{question[:50]}", data)
 
     def _guess_mime_type(self, image_url: str) -> str:
         return CityNameHelper.guess_mime_type(image_url)
@@ -446,11 +522,13 @@ class ToolsManager:
         attempt_budget = max(1, min(5, len(GEMINI_API_KEYS) if GEMINI_API_KEYS else 1))
         last_error = ""
         try:
-            image_bytes = await asyncio.to_thread(lambda: requests.get(image_url, timeout=12).content)
+            try:
+                image_result = await get_http_client().fetch(image_url, timeout=12, max_bytes=MAX_FILE_SIZE_BYTES)
+            except ResponseTooLargeError:
+                return "Lỗi: Ảnh vượt quá giới hạn 20MB cho inline image understanding."
+            image_bytes = image_result.body if image_result.status == 200 else b""
             if not image_bytes:
                 return "Lỗi: Không tải được dữ liệu hình ảnh từ URL."
-            if len(image_bytes) > MAX_FILE_SIZE_BYTES:
-                return "Lỗi: Ảnh vượt quá giới hạn 20MB cho inline image understanding."
 
             mime_type = self._guess_mime_type(image_url)
             image_part = genai_types.Part.from_bytes(data=image_bytes, mime_type=mime_type)